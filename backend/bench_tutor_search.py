@@ -0,0 +1,186 @@
+"""Latency benchmark for catalog search on GET /api/tutors.
+
+Seeds synthetic tutor cards into a scratch database at growing sizes and times the
+route's own query builder, sort orders and pagination against each size, for every
+filter combination the Find Tutors page can send under every sort, plus selective and
+empty fee ranges. A flat p99 from the smallest to the largest size means every query
+shape is served by an index. The explain check runs the first page with
+executionStats and flags any shape that scans the collection or examines many more
+cards than it returns, which is what a residual filter over a long index walk costs.
+
+Usage: python bench_tutor_search.py --mongo-url mongodb://localhost:27017 --db tutormaven_bench
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+
+SUBJECTS = ["Mathematics", "Physics", "Chemistry", "Biology", "English", "Hindi",
+            "History", "Geography", "Computer Science", "Economics", "Accountancy", "Sanskrit"]
+BOARDS = ["CBSE", "ICSE", "STATE BOARD", "NIOS"]
+
+# (label, filters) beyond the sampled combinations: fee ranges that match few or no cards
+SELECTIVE_QUERIES = [
+    ("fee above catalog", {"min_fee": 100000}),
+    ("verified fee above catalog", {"verified_only": True, "min_fee": 100000}),
+    ("narrow fee band", {"min_fee": 1000, "max_fee": 1050}),
+    ("subject narrow fee band", {"subject": "Physics", "min_fee": 1000, "max_fee": 1050}),
+    ("class verified narrow fee band", {"class_level": 9, "verified_only": True, "min_fee": 1000, "max_fee": 1050}),
+]
+
+def synthetic_card(index):
+    low = random.randint(1, 12)
+    high = random.randint(low, min(12, low + 3))
+    review_count = random.randint(0, 60)
+    rating_sum = sum(random.randint(1, 5) for _ in range(review_count))
+    subjects = random.sample(SUBJECTS, random.randint(1, 3))
+    return {
+        "id": f"bench-profile-{index}",
+        "user_id": f"bench-tutor-{index:07d}",
+        "subjects": subjects,
+        "boards": random.sample(BOARDS, random.randint(1, 2)),
+        "monthly_fee": float(random.randrange(300, 6000, 50)),
+        "is_verified": random.random() < 0.3,
+        "reach_count": random.randint(0, 5000),
+        "user": {"id": f"bench-tutor-{index:07d}", "name": f"Tutor {index}", "profile_picture": None},
+        "classes_taught": [{"class_range": f"{low}-{high}", "subjects": subjects, "min_class": low, "max_class": high}],
+        "class_levels": list(range(low, high + 1)),
+        "review_count": review_count,
+        "rating_sum": rating_sum,
+        "avg_rating": rating_sum / review_count if review_count else 0,
+    }
+
+
+class TutorSearchBenchmark:
+    """Time every catalog query shape against a seeded tutor_cards collection"""
+
+    def __init__(self, server, sizes, repeats, page_size, max_examined_ratio):
+        self.server = server
+        self.sizes = sizes
+        self.repeats = repeats
+        self.page_size = page_size
+        self.max_examined_ratio = max_examined_ratio
+        self.results = {}
+        self.examined = {}
+        self.unindexed = set()
+        # (label, filters, sort) for every filter combination under every sort
+        labelled = [("+".join(filters) or "all", filters) for filters in server.tutor_search_combinations()]
+        self.queries = [
+            (label, filters, sort)
+            for label, filters in labelled + SELECTIVE_QUERIES
+            for sort in server.TUTOR_SORTS
+        ]
+
+    async def seed(self, size):
+        cards = self.server.db.tutor_cards
+        current = await cards.count_documents({})
+        batch = []
+        for index in range(current, size):
+            card = synthetic_card(index)
+            card["subject_keys"] = self.server.subject_keys(card["subjects"])
+            card["subject_classes"] = self.server.subject_classes(card["classes_taught"])
+            batch.append(card)
+            if len(batch) == 5000:
+                await cards.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await cards.insert_many(batch, ordered=False)
+
+    async def check_plan(self, size, label, sort, query, order):
+        explain = await self.server.db.command(
+            "explain",
+            {"find": "tutor_cards", "filter": query, "sort": dict(order), "limit": self.page_size + 1},
+            verbosity="executionStats"
+        )
+        stats = explain["executionStats"]
+        examined, returned = stats["totalDocsExamined"], stats["nReturned"]
+        self.examined[(size, label, sort)] = (examined, returned)
+        # A blocking sort is fine over a small range; reading far more than the page is not
+        if "COLLSCAN" in str(explain["queryPlanner"]["winningPlan"]) or examined > self.max_examined_ratio * max(returned, 1):
+            self.unindexed.add((label, sort))
+
+    async def time_query(self, size, label, filters, sort):
+        query = self.server.tutor_search_query(**filters)
+        order = self.server.TUTOR_SORTS[sort]
+        projection = self.server.tutor_projection(self.server.TUTOR_CARD_FIELDS)
+        await self.check_plan(size, label, sort, query, order)
+
+        timings = []
+        cursor = None
+        for _ in range(self.repeats):
+            started = time.perf_counter()
+            page = await self.server.paginate(
+                self.server.db.tutor_cards, query, order, self.page_size, cursor, projection=projection
+            )
+            timings.append(time.perf_counter() - started)
+            # Walk forward through the result so deep pages are measured too
+            cursor = page["next_cursor"]
+        timings.sort()
+        self.results[(size, label, sort)] = (
+            timings[len(timings) // 2] * 1000,
+            timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000,
+        )
+
+    async def run(self):
+        await self.server.db.tutor_cards.drop()
+        await self.server.ensure_indexes()
+        for size in self.sizes:
+            print(f"🌱 Seeding {size} tutor cards")
+            await self.seed(size)
+            for label, filters, sort in self.queries:
+                await self.time_query(size, label, filters, sort)
+        await self.server.db.tutor_cards.drop()
+
+    def report(self):
+        print("\n📊 p50 / p99 latency (ms) per query shape")
+        header = "".join(f"{size:>18}" for size in self.sizes)
+        print(f"   {'filters':<58}{'sort':<9}{header}")
+        worst = 0.0
+        for label, _, sort in self.queries:
+            timings = [self.results[(size, label, sort)] for size in self.sizes]
+            worst = max(worst, max(p99 for _, p99 in timings))
+            row = "".join(f"{p50:>8.2f} / {p99:<7.2f}" for p50, p99 in timings)
+            print(f"   {label:<58}{sort:<9}{row}")
+        print(f"\n   {len(self.queries)} shapes, worst p99 {worst:.2f} ms")
+
+        for label, sort in sorted(self.unindexed):
+            counts = ", ".join(
+                f"{size}: {self.examined[(size, label, sort)][0]} examined / {self.examined[(size, label, sort)][1]} returned"
+                for size in self.sizes
+            )
+            print(f"❌ {label} by {sort}: collection scan or too many cards examined ({counts})")
+        if self.unindexed:
+            return False
+        print(f"✅ Every query shape is indexed and examines at most {self.max_examined_ratio}x the cards it returns")
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog search across catalog sizes")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="tutormaven_bench", help="Scratch database; its tutor_cards is dropped")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated catalog sizes")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed requests per query shape and size")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--max-examined-ratio", type=float, default=50,
+                        help="Fail a shape whose first page examines more than this many cards per card returned")
+    args = parser.parse_args()
+
+    # server.py connects at import time, so point it at the scratch database first
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db
+    import server
+
+    random.seed(42)
+    benchmark = TutorSearchBenchmark(
+        server, [int(size) for size in args.sizes.split(",")], args.repeats, args.page_size, args.max_examined_ratio
+    )
+    print(f"🚀 Benchmarking catalog search in {args.db} at sizes {args.sizes}")
+    asyncio.run(benchmark.run())
+    return 0 if benchmark.report() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
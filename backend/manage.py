@@ -0,0 +1,110 @@
+"""Maintenance commands for the TutorMaven backend.
+
+Usage: python manage.py <command>
+"""
+import argparse
+import asyncio
+import sys
+
+import server
+
+COMMANDS = {}
+
+def command(name: str):
+    def register(fn):
+        COMMANDS[name] = fn
+        return fn
+    return register
+
+@command("ensure-indexes")
+async def ensure_indexes():
+    await server.ensure_indexes()
+    print(f"Applied {len(server.INDEXES)} indexes")
+
+@command("check-indexes")
+async def check_indexes():
+    uncovered = server.uncovered_query_shapes()
+    for route, collection, fields in uncovered:
+        print(f"{route}: {collection} {fields} has no supporting index")
+    if uncovered:
+        sys.exit(1)
+    print(f"All {len(server.QUERY_SHAPES)} query shapes are indexed")
+
+@command("rebuild-tutor-cards")
+async def rebuild_tutor_cards():
+    await server.ensure_indexes()
+    count = await server.rebuild_tutor_cards()
+    print(f"Rebuilt {count} tutor cards")
+
+@command("rebuild-unread-counters")
+async def rebuild_unread_counters():
+    await server.ensure_indexes()
+    count = await server.rebuild_unread_counters()
+    print(f"Rebuilt unread counters for {count} users")
+
+@command("archive-notifications")
+async def archive_notifications():
+    await server.ensure_indexes()
+    count = await server.archive_notifications()
+    print(f"Archived {count} notifications")
+
+@command("migrate-attendance-buckets")
+async def migrate_attendance_buckets():
+    await server.ensure_indexes()
+    count = await server.migrate_attendance_buckets()
+    print(f"attendance_buckets now holds {count} monthly buckets")
+
+@command("migrate-media")
+async def migrate_media():
+    await server.ensure_indexes()
+    count = await server.migrate_inline_media()
+    print(f"Moved {count} inline images into the media store")
+    # Cards embed profile pictures and profile images, so rebuild them from the new references
+    cards = await server.rebuild_tutor_cards()
+    print(f"Rebuilt {cards} tutor cards")
+
+@command("backfill-thumbnails")
+async def backfill_thumbnails():
+    if server.render_thumbnails is None:
+        print("Pillow is not installed; no thumbnails can be generated")
+        sys.exit(1)
+    await server.ensure_indexes()
+    try:
+        count = await server.backfill_thumbnails()
+    finally:
+        server.shutdown_thumbnail_pool()
+    print(f"Generated thumbnails for {count} images")
+    cards = await server.rebuild_tutor_cards()
+    print(f"Rebuilt {cards} tutor cards")
+
+@command("backfill-class-ranges")
+async def backfill_class_ranges():
+    await server.ensure_indexes()
+    updated, invalid = await server.backfill_class_ranges()
+    print(f"Parsed class ranges on {updated} classes")
+    for taught in invalid:
+        print(f"  unparseable class_range {taught.get('class_range')!r} on class {taught['id']} (tutor {taught['tutor_id']})")
+    cards = await server.rebuild_tutor_cards()
+    print(f"Rebuilt {cards} tutor cards")
+
+@command("rebuild-rating-aggregates")
+async def rebuild_rating_aggregates():
+    await server.ensure_indexes()
+    count = await server.recompute_rating_aggregates()
+    print(f"Recomputed rating totals for {count} tutors")
+    cards = await server.rebuild_tutor_cards()
+    print(f"Rebuilt {cards} tutor cards")
+    rated = await server.top_tutors_ranking.refresh()
+    print(f"Ranked {rated} rated tutors across {server.top_tutors_ranking.subjects} subjects")
+
+def main():
+    parser = argparse.ArgumentParser(description="TutorMaven maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    try:
+        asyncio.run(COMMANDS[args.command]())
+    finally:
+        server.client.close()
+
+if __name__ == "__main__":
+    main()
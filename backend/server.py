@@ -1,15 +1,38 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.responses import Response, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from pymongo import ReplaceOne, UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
+import asyncio
+import base64
+import binascii
+import bisect
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
 import logging
+import multiprocessing
+import re
+import time
+import unicodedata
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
+from collections import Counter, OrderedDict
 import uuid
+from abc import ABC, abstractmethod
 from datetime import datetime, timezone, timedelta
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 import jwt
 from enum import Enum
@@ -22,8 +45,6 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-# Create the main app
-app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # Security
@@ -31,6 +52,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.environ.get('JWT_SECRET', 'tutormaven_secret_key_2025')
 ALGORITHM = "HS256"
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Helper functions
 def hash_password(password: str) -> str:
@@ -39,28 +61,1688 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(data: dict) -> str:
+# Password hashing pool
+# bcrypt takes ~200-300 ms per call, so it runs on a bounded thread pool instead of
+# the event loop. A semaphore caps concurrent hashes per worker; callers queue behind
+# it, and once PASSWORD_HASH_MAX_QUEUE are waiting new ones get a 503 instead of
+# piling up, so a login storm cannot starve the rest of the API.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', str(PASSWORD_HASH_WORKERS)))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '64'))
+
+class PasswordHasher:
+    def __init__(self, workers: int, concurrency: int, max_queue: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, fn, *args):
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+        
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.semaphore.release()
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.waiting,
+            "peak_queue_depth": self.peak_waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "max_queue": self.max_queue
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_CONCURRENCY, PASSWORD_HASH_MAX_QUEUE)
+
+# Notification streams authenticate with their own short-lived token in the query
+# string, so the 30-day access token never lands in access logs or browser history
+STREAM_TOKEN_TTL = int(os.environ.get('STREAM_TOKEN_TTL', '60'))  # seconds
+
+def create_access_token(data: dict, expires: timedelta = timedelta(days=30)) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=30)
+    expire = datetime.now(timezone.utc) + expires
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# In-process caches
+# Bounded LRU with a per-entry TTL. Caches are per worker process, so entries on
+# other workers only disappear when their TTL runs out. A load that started before
+# an invalidation passes the generation it read at the start to set(), and its
+# stale result is dropped instead of resurrecting the invalidated entry.
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._generation = 0
+        self._tombstones = OrderedDict()  # key -> (generation, expires_at)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key, value, generation: Optional[int] = None):
+        if generation is not None:
+            tombstone = self._tombstones.get(key)
+            if tombstone and tombstone[0] > generation and tombstone[1] >= time.monotonic():
+                return
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+        self._generation += 1
+        now = time.monotonic()
+        self._tombstones[key] = (self._generation, now + self.ttl)
+        self._tombstones.move_to_end(key)
+        # Oldest first; a tombstone only has to outlive any load that could still be in flight
+        while self._tombstones and next(iter(self._tombstones.values()))[1] < now:
+            self._tombstones.popitem(last=False)
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0
+        }
+
+# Authenticated principals by user id. Writes to a user (profile updates, deletion)
+# must call principal_cache.invalidate so the next request reloads it.
+principal_cache = TTLCache(
+    maxsize=int(os.environ.get('PRINCIPAL_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('PRINCIPAL_CACHE_TTL', '60'))
+)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await authenticate_token(credentials.credentials)
+
+async def get_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    # EventSource cannot send an Authorization header, so streams also accept ?token=,
+    # but only a stream token from POST /notifications/stream-token
+    if credentials:
+        return await authenticate_token(credentials.credentials)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await authenticate_token(token, scope="stream")
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[dict]:
+    # Public routes that return more to signed-in admins or owners. A bad or expired
+    # token is served anonymously, as these routes were before they read the user.
+    if not credentials:
+        return None
+    try:
+        return await authenticate_token(credentials.credentials)
+    except HTTPException:
+        return None
+
+async def authenticate_token(token: str, scope: Optional[str] = None) -> dict:
+    # Access tokens carry no scope; a scoped token is only good where that scope is asked for
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("scope") != scope:
             raise HTTPException(status_code=401, detail="Invalid token")
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
+        user = principal_cache.get(user_id)
         if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
+            generation = principal_cache.generation()
+            user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
+            if user is None:
+                raise HTTPException(status_code=401, detail="User not found")
+            principal_cache.set(user_id, user, generation)
+        # Handlers get their own copy so nothing can mutate the cached entry
+        return dict(user)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+# Batching loaders
+# A DataLoader coalesces every load() issued during the same event-loop tick into
+# a single `{key: {"$in": [...]}}` query and memoizes results, so handlers can
+# look up related documents per row without paying one round trip per row.
+class DataLoader:
+    def __init__(self, collection, key: str, projection: Optional[dict] = None, many: bool = False):
+        self.collection = collection
+        self.key = key
+        self.projection = {"_id": 0, **(projection or {})}
+        if any(v for k, v in self.projection.items() if k != "_id"):
+            # Inclusion projection: the key is needed to route results back
+            self.projection[key] = 1
+        self.many = many
+        self._cache = {}
+        self._queue = []
+        self._tasks = set()
+
+    def load(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        if not self._queue:
+            loop.call_soon(self._schedule_dispatch)
+        self._queue.append(key)
+        return future
+
+    async def load_many(self, keys) -> list:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _schedule_dispatch(self):
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self):
+        keys, self._queue = self._queue, []
+        try:
+            docs = await self.collection.find({self.key: {"$in": keys}}, self.projection).to_list(None)
+        except Exception as e:
+            for key in keys:
+                self._cache.pop(key).set_exception(e)
+            return
+        
+        found = {}
+        for doc in docs:
+            if self.many:
+                found.setdefault(doc[self.key], []).append(doc)
+            else:
+                found[doc[self.key]] = doc
+        for key in keys:
+            self._cache[key].set_result(found.get(key, [] if self.many else None))
+
+class Loaders:
+    # One instance per request (see get_loaders), so cached results never leak across requests
+    def __init__(self, database):
+        self.users = DataLoader(database.users, "id", {"password_hash": 0})
+        self.tutor_profiles = DataLoader(database.tutor_profiles, "user_id", {field: 0 for field in PRIVATE_TUTOR_FIELDS})
+        self.classes = DataLoader(database.classes_taught, "tutor_id", many=True)
+
+async def get_loaders() -> Loaders:
+    return Loaders(db)
+
+# Keyset pagination
+# List routes page with an opaque cursor holding the sort-key values of the last
+# item returned; the next page starts strictly after it, so cost per page stays
+# constant regardless of depth. Sort keys must be unique (add a tie-breaker).
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_filter(sort: List[tuple], values: list) -> dict:
+    # (a, b) after (va, vb)  <=>  a > va  OR  (a == va AND b > vb), with < for descending keys
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: values[j] for j, (f, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+async def paginate(
+    collection,
+    query: dict,
+    sort: List[tuple],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+    pipeline: Optional[List[dict]] = None
+) -> dict:
+    if cursor:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor, len(sort)))]}
+    # Fetch one extra document to learn whether another page exists
+    if pipeline is None:
+        docs = await collection.find(query, projection or {"_id": 0}).sort(sort).limit(limit + 1).to_list(limit + 1)
+    else:
+        # Aggregation variant: select the page first, then run the extra stages on just that page
+        docs = await collection.aggregate([
+            {"$match": query},
+            {"$sort": dict(sort)},
+            {"$limit": limit + 1},
+            *pipeline
+        ]).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor([docs[-1].get(field) for field, _ in sort])
+    return {"items": docs, "next_cursor": next_cursor}
+
+# Conditional GET
+# Public read routes answer with an ETag hashed from the serialized body and return
+# 304 with no body when the client already holds that representation. Weak and
+# strong tags compare equal, since compression below weakens the tag it sends.
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+def json_etag_response(request: Request, payload, vary: Optional[str] = None) -> Response:
+    body = json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    # no-cache: clients may store it but must revalidate, which is what makes the 304 cheap
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if vary:
+        headers["Vary"] = vary
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Response compression
+# Complete (non-streaming) text and JSON bodies of at least COMPRESSION_MIN_SIZE
+# bytes are compressed with brotli when the client and server support it, else gzip.
+# Streaming responses (the SSE endpoint) and images pass through untouched.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+def accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0
+        if name and quality > 0:
+            accepted.add(name.lower())
+    return accepted
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+        
+        start = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether the response is complete
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            passthrough = True
+            start["headers"] = list(start.get("headers", []))
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body")
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+            
+            body = brotli.compress(body, quality=5) if encoding == "br" else gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+
+# Read notifications expire this many days after read_at (a native BSON date). The
+# archive job moves them out well before that; the TTL only catches what it missed.
+NOTIFICATION_READ_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_READ_RETENTION_DAYS', '30'))
+
+# Index manifest
+# (collection, keys, options) for every index the API relies on. Applied at startup;
+# create_index is a no-op when an identical index already exists.
+
+INDEXES = [
+    ("users", [("id", 1)], {"unique": True}),
+    ("users", [("email", 1)], {"unique": True}),
+    ("users", [("role", 1)], {}),
+    ("users", [("created_at", -1), ("id", 1)], {}),
+    ("tutor_profiles", [("user_id", 1)], {"unique": True}),
+    ("tutor_profiles", [("verification_status", 1), ("user_id", 1)], {}),
+    ("tutor_profiles", [("is_verified", 1)], {}),
+    ("tutor_cards", [("user_id", 1)], {"unique": True}),
+    ("tutor_cards", [("subject_keys", 1), ("user_id", 1)], {}),
+    # Catalog search: leading filter, then the sort keys (see tutor_search_indexes).
+    # Every (lead, sort) pair has one; subject_classes, subject_keys, boards and class_levels
+    # are arrays, so no index may combine two of them.
+    ("tutor_cards", [("avg_rating", -1), ("user_id", 1)], {}),
+    ("tutor_cards", [("monthly_fee", 1), ("user_id", 1)], {}),
+    ("tutor_cards", [("reach_count", -1), ("user_id", 1)], {}),
+    ("tutor_cards", [("subject_keys", 1), ("avg_rating", -1), ("user_id", 1)], {}),
+    ("tutor_cards", [("subject_keys", 1), ("monthly_fee", 1), ("user_id", 1)], {}),
+    ("tutor_cards", [("subject_keys", 1), ("reach_count", -1), ("user_id", 1)], {}),
+    ("tutor_cards", [("class_levels", 1), ("user_id", 1)], {}),
+    ("tutor_cards", [("class_levels", 1), ("avg_rating", -1), ("user_id", 1)], {}),
+    ("tutor_cards", [("class_levels", 1), ("monthly_fee", 1), ("user_id", 1)], {}),
+    ("tutor_cards", [("class_levels", 1), ("reach_count", -1), ("user_id", 1)], {}),
+    ("tutor_cards", [("subject_classes", 1), ("user_id", 1)], {}),
+    ("tutor_cards", [("subject_classes", 1), ("avg_rating", -1), ("user_id", 1)], {}),
+    ("tutor_cards", [("subject_classes", 1), ("monthly_fee", 1), ("user_id", 1)], {}),
+    ("tutor_cards", [("subject_classes", 1), ("reach_count", -1), ("user_id", 1)], {}),
+    ("student_profiles", [("user_id", 1)], {"unique": True}),
+    ("student_profiles", [("parent_code", 1)], {"unique": True}),
+    ("subscriptions", [("id", 1)], {"unique": True}),
+    ("subscriptions", [("student_id", 1), ("tutor_id", 1), ("status", 1)], {}),
+    ("subscriptions", [("student_id", 1), ("status", 1)], {}),
+    ("subscriptions", [("student_id", 1), ("created_at", -1), ("id", 1)], {}),
+    ("subscriptions", [("tutor_id", 1), ("created_at", -1), ("id", 1)], {}),
+    ("subscriptions", [("tutor_id", 1), ("status", 1)], {}),
+    ("subscriptions", [("status", 1), ("created_at", -1), ("id", 1)], {}),
+    ("reviews", [("id", 1)], {"unique": True}),
+    ("reviews", [("tutor_id", 1), ("created_at", -1), ("id", 1)], {}),
+    ("reviews", [("student_id", 1)], {}),
+    ("classes_taught", [("id", 1)], {"unique": True}),
+    ("classes_taught", [("tutor_id", 1)], {}),
+    ("fee_records", [("subscription_id", 1), ("year", -1), ("month", -1)], {"unique": True}),
+    ("attendance_buckets", [("subscription_id", 1), ("month", 1)], {"unique": True}),
+    ("notifications", [("id", 1)], {"unique": True}),
+    ("notifications", [("user_id", 1), ("read", 1), ("created_at", -1)], {}),
+    ("notifications", [("user_id", 1), ("created_at", -1), ("id", 1)], {}),
+    ("notifications", [("read_at", 1)], {
+        "expireAfterSeconds": NOTIFICATION_READ_RETENTION_DAYS * 86400,
+        "partialFilterExpression": {"read": True}
+    }),
+    ("notification_counters", [("user_id", 1)], {"unique": True}),
+    ("notification_archives", [("user_id", 1), ("month", 1)], {"unique": True}),
+    ("media", [("hash", 1)], {"unique": True}),
+    ("top_tutors", [("subject", 1)], {"unique": True}),
+]
+
+# Filter shapes issued by the routes: (route, collection, fields). Every shape must be
+# served by an index in INDEXES; add the shape here together with any new query.
+# Catalog search shapes are generated from its query builder (tutor_search_shapes).
+QUERY_SHAPES = [
+    ("get_current_user", "users", ["id"]),
+    ("register", "users", ["email"]),
+    ("login", "users", ["email"]),
+    ("admin_login", "users", ["role"]),
+    ("parent_login", "student_profiles", ["parent_code"]),
+    ("parent_login", "subscriptions", ["student_id", "status"]),
+    ("parent_login", "fee_records", ["subscription_id", "year", "month"]),
+    ("parent_login", "attendance_buckets", ["subscription_id", "month"]),
+    ("invalidate_parent_snapshot", "student_profiles", ["user_id"]),
+    ("invalidate_tutor_parent_snapshots", "subscriptions", ["tutor_id", "status"]),
+    ("upload_banner", "tutor_profiles", ["user_id"]),
+    ("get_banners", "tutor_profiles", ["is_verified"]),
+    ("update_student_profile", "student_profiles", ["user_id"]),
+    ("get_student_profile", "student_profiles", ["user_id"]),
+    ("get_tutor", "tutor_cards", ["user_id"]),
+    ("refresh_tutor_card", "tutor_cards", ["user_id"]),
+    ("get_tutor_stats", "subscriptions", ["tutor_id", "status"]),
+    ("create_subscription", "subscriptions", ["student_id", "tutor_id"]),
+    ("accept_subscription", "subscriptions", ["id"]),
+    ("get_my_subscriptions", "subscriptions", ["tutor_id", "created_at", "id"]),
+    ("get_my_subscriptions", "subscriptions", ["student_id", "created_at", "id"]),
+    ("create_review", "subscriptions", ["student_id", "tutor_id", "status"]),
+    ("apply_rating_change", "tutor_profiles", ["user_id"]),
+    ("recompute_rating_aggregates", "reviews", ["tutor_id"]),
+    ("get_top_tutors", "top_tutors", ["subject"]),
+    ("get_tutor_reviews", "reviews", ["tutor_id", "created_at", "id"]),
+    ("delete_review", "reviews", ["id"]),
+    ("delete_user", "reviews", ["student_id"]),
+    ("delete_user", "subscriptions", ["tutor_id", "status"]),
+    ("delete_user", "student_profiles", ["user_id"]),
+    ("get_fees", "fee_records", ["subscription_id", "year", "month"]),
+    ("update_fee", "fee_records", ["subscription_id", "month", "year"]),
+    ("get_attendance", "attendance_buckets", ["subscription_id", "month"]),
+    ("mark_attendance", "attendance_buckets", ["subscription_id", "month"]),
+    ("update_fees_bulk", "subscriptions", ["id", "tutor_id"]),
+    ("update_fees_bulk", "fee_records", ["subscription_id", "month", "year"]),
+    ("mark_attendance_bulk", "subscriptions", ["id", "tutor_id"]),
+    ("mark_attendance_bulk", "attendance_buckets", ["subscription_id", "month"]),
+    ("get_classes", "classes_taught", ["tutor_id"]),
+    ("delete_class", "classes_taught", ["id", "tutor_id"]),
+    ("get_notifications", "notifications", ["user_id", "created_at", "id"]),
+    ("mark_notifications_read", "notifications", ["user_id", "read"]),
+    ("mark_notifications_read", "notifications", ["user_id", "read", "id"]),
+    ("get_unread_count", "notification_counters", ["user_id"]),
+    ("get_unread_count", "notifications", ["user_id", "read"]),
+    ("seed_unread_counter", "notification_counters", ["user_id", "unread"]),
+    ("archive_notifications", "notifications", ["read_at"]),
+    ("archive_notifications", "notification_archives", ["user_id", "month"]),
+    ("get_notification_archive", "notification_archives", ["user_id", "month"]),
+    ("get_media", "media", ["hash"]),
+    ("store_media", "media", ["hash"]),
+    ("migrate_inline_media", "media", ["hash"]),
+    ("get_verification_proof", "tutor_profiles", ["user_id"]),
+    ("get_pending_verifications", "tutor_profiles", ["verification_status", "user_id"]),
+    ("reconcile_platform_stats", "subscriptions", ["status"]),
+    ("reconcile_platform_stats", "users", ["role"]),
+    ("reconcile_platform_stats", "tutor_profiles", ["verification_status"]),
+    ("get_admin_subscriptions", "subscriptions", ["status", "created_at", "id"]),
+    ("get_all_users", "users", ["created_at", "id"]),
+]
+
+def index_supports(keys: list, options: dict, fields: list) -> bool:
+    # A shape is supported by an index whose leading keys are exactly the shape's
+    # fields, or by a unique index whose keys are all pinned by the shape
+    names = [name for name, _ in keys]
+    if set(names[:len(fields)]) == set(fields):
+        return True
+    return bool(options.get("unique")) and set(names) <= set(fields)
+
+def uncovered_query_shapes() -> List[tuple]:
+    return [
+        (route, collection, fields)
+        for route, collection, fields in QUERY_SHAPES
+        if not any(
+            index_collection == collection and index_supports(keys, options, fields)
+            for index_collection, keys, options in INDEXES
+        )
+    ]
+
+async def ensure_indexes():
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            if e.code == 85 and "expireAfterSeconds" in options:
+                # TTL changed through configuration: update the existing index in place
+                await db.command("collMod", collection, index={
+                    "keyPattern": dict(keys),
+                    "expireAfterSeconds": options["expireAfterSeconds"]
+                })
+                continue
+            # Typically existing duplicates blocking a unique index; keep serving and surface it
+            logger.error(f"Could not create index {keys} on {collection}: {e}")
+
+# Media store
+# Images are stored once, addressed by the sha256 of their bytes, and documents hold
+# only a URL of the form {MEDIA_BASE_URL}/{hash}. The bytes live in a BlobStore
+# (GridFS by default, or a local directory); the media collection records content
+# type and size for every hash. Content addressing makes the objects immutable, so
+# /api/media/{hash} can be cached forever by browsers and any CDN in front of it.
+# Private media (verification proofs) share the store but are flagged in the media
+# collection: the public route refuses them and only the admin proof route serves
+# them. MEDIA_BASE_URL is relative by default and the frontend prefixes it with the
+# backend origin; set it to an absolute CDN origin to serve media from elsewhere.
+MEDIA_STORE = os.environ.get('MEDIA_STORE', 'gridfs')  # gridfs | local
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', str(ROOT_DIR / 'media')))
+MEDIA_BASE_URL = os.environ.get('MEDIA_BASE_URL', '/api/media').rstrip('/')
+MEDIA_MAX_BYTES = int(os.environ.get('MEDIA_MAX_BYTES', str(5 * 1024 * 1024)))
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Media is served from the API origin and can be opened as a document, so only raster
+# formats are accepted, identified by their leading bytes rather than the type the
+# client claims (an SVG or HTML body would otherwise run script next to the token)
+MEDIA_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+MEDIA_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+MEDIA_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "Content-Security-Policy": "default-src 'none'; sandbox"
+}
+
+class BlobStore(ABC):
+    @abstractmethod
+    async def put(self, key: str, data: bytes):
+        ...
+    
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+class GridFSBlobStore(BlobStore):
+    def __init__(self, database, bucket_name: str = "media"):
+        self.bucket = AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name)
+    
+    async def put(self, key: str, data: bytes):
+        try:
+            await self.bucket.upload_from_stream_with_id(key, key, data)
+        except DuplicateKeyError:
+            # Same content uploaded concurrently; the stored bytes are identical
+            pass
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            stream = await self.bucket.open_download_stream(key)
+        except NoFile:
+            return None
+        return await stream.read()
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: Path):
+        self.root = root
+    
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+    
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        tmp = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        return path.read_bytes() if path.exists() else None
+    
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self._write, key, data)
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, key)
+
+blob_store = LocalBlobStore(MEDIA_ROOT) if MEDIA_STORE == "local" else GridFSBlobStore(db)
+
+def media_url(media_hash: str) -> str:
+    return f"{MEDIA_BASE_URL}/{media_hash}"
+
+def media_hash_of(value: Optional[str]) -> Optional[str]:
+    # Inverse of media_url; None for data URLs, external URLs and empty values
+    prefix = f"{MEDIA_BASE_URL}/"
+    if value and value.startswith(prefix):
+        return value[len(prefix):]
+    return None
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return next((content_type for magic, content_type in MEDIA_SIGNATURES if data.startswith(magic)), None)
+
+def decode_data_url(value: str) -> tuple:
+    # "data:image/png;base64,...." -> (content_type, bytes), typed by the bytes themselves
+    header, _, payload = value.partition(",")
+    if not header.startswith("data:") or not header.endswith(";base64"):
+        raise HTTPException(status_code=400, detail="Images must be base64 data URLs")
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except binascii.Error:
+        raise HTTPException(status_code=400, detail="Invalid image data")
+    content_type = sniff_image_type(data)
+    if content_type is None:
+        raise HTTPException(status_code=400, detail="Images must be PNG, JPEG, WebP or GIF")
+    return content_type, data
+
+async def store_media(content_type: str, data: bytes, private: bool = False) -> str:
+    if len(data) > MEDIA_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    media_hash = hashlib.sha256(data).hexdigest()
+    if not await db.media.find_one({"hash": media_hash}, {"_id": 1}):
+        # Bytes first, then the record, so a hash in media always has content behind it
+        await blob_store.put(media_hash, data)
+        await db.media.update_one(
+            {"hash": media_hash},
+            {"$setOnInsert": {
+                "hash": media_hash,
+                "content_type": content_type,
+                "size": len(data),
+                "private": private,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }},
+            upsert=True
+        )
+    return media_url(media_hash)
+
+async def store_image(value: Optional[str], private: bool = False) -> Optional[str]:
+    # Inline data URLs become media references; URLs and empty values pass through
+    if not value or not value.startswith("data:"):
+        return value
+    return await store_media(*decode_data_url(value), private=private)
+
+# Thumbnails
+# Avatars and catalog cards only need small images, so profile pictures and coaching
+# photos also get fixed-size derivatives, stored in the media store like any other
+# image and listed under <field>_variants as {"avatar": url, "card": url}. Decoding
+# and resizing are CPU-bound and run on a spawned process pool, created on first use
+# so importing this module (from the app, manage.py or a spawned worker) never
+# starts processes. Spawned workers re-import the parent's __main__ module: under
+# uvicorn that is the server entry point, under manage.py it is manage.py, which
+# imports this module without side effects. Without Pillow, or for an image it
+# cannot decode, the field has no variants and clients fall back to the original.
+try:
+    from thumbnails import render_thumbnails
+except ImportError:
+    render_thumbnails = None
+
+THUMBNAIL_SIZES = {"avatar": (64, True), "card": (320, False)}  # name: (px, square crop)
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', '2'))
+_thumbnail_pool = None
+
+def get_thumbnail_pool() -> ProcessPoolExecutor:
+    global _thumbnail_pool
+    if _thumbnail_pool is None:
+        _thumbnail_pool = ProcessPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _thumbnail_pool
+
+def shutdown_thumbnail_pool():
+    global _thumbnail_pool
+    if _thumbnail_pool is not None:
+        _thumbnail_pool.shutdown()
+        _thumbnail_pool = None
+
+# (collection, key, image field) whose images get variants
+THUMBNAIL_FIELDS = [
+    ("users", "id", "profile_picture"),
+    ("tutor_profiles", "user_id", "coaching_photo"),
+]
+
+async def make_variants(data: bytes) -> Optional[dict]:
+    if render_thumbnails is None:
+        return None
+    try:
+        rendered = await asyncio.get_running_loop().run_in_executor(
+            get_thumbnail_pool(), render_thumbnails, data, THUMBNAIL_SIZES
+        )
+    except Exception as e:
+        logger.warning(f"Thumbnail generation failed: {e}")
+        return None
+    return {name: await store_media(content_type, body) for name, (content_type, body) in rendered.items()}
+
+async def image_updates(field: str, value: Optional[str]) -> dict:
+    # $set fields for an image write: a new upload gets fresh variants, a reference
+    # already in the media store (clients echo it back on every save) keeps its
+    # existing ones, and anything else (external URL, empty) clears them
+    if value and value.startswith("data:"):
+        content_type, data = decode_data_url(value)
+        return {field: await store_media(content_type, data), f"{field}_variants": await make_variants(data)}
+    if value and value.startswith(f"{MEDIA_BASE_URL}/"):
+        return {field: value}
+    return {field: value, f"{field}_variants": None}
+
+async def backfill_thumbnails(batch_size: int = 100) -> int:
+    # Generate variants for stored images that have none yet
+    prefix = f"{MEDIA_BASE_URL}/"
+    generated = 0
+    for collection, key, field in THUMBNAIL_FIELDS:
+        variants_field = f"{field}_variants"
+        query = {field: {"$regex": f"^{re.escape(prefix)}"}, variants_field: None}
+        async for doc in db[collection].find(query, {"_id": 0, key: 1, field: 1}).batch_size(batch_size):
+            data = await blob_store.get(doc[field][len(prefix):])
+            variants = await make_variants(data) if data else None
+            if variants:
+                await db[collection].update_one({key: doc[key]}, {"$set": {variants_field: variants}})
+                generated += 1
+    return generated
+
+# Tutor catalog read model
+# tutor_cards holds one denormalized document per tutor (profile fields, display
+# name/picture, classes and rating totals) so the public catalog is a single query.
+# Write paths that change any of those inputs call refresh_tutor_card.
+# School classes a tutor can list, and the accepted class_range forms: "7", "7-8", "7 to 8"
+MIN_CLASS = 1
+MAX_CLASS = 12
+CLASS_RANGE_PATTERN = re.compile(r"^\s*(\d{1,2})\s*(?:(?:-|–|to)\s*(\d{1,2})\s*)?$", re.IGNORECASE)
+
+def parse_class_range(class_range: str) -> Optional[tuple]:
+    # (min_class, max_class), or None when the text is not a valid range
+    match = CLASS_RANGE_PATTERN.match(class_range or "")
+    if not match:
+        return None
+    low = int(match.group(1))
+    high = int(match.group(2) or low)
+    if not MIN_CLASS <= low <= high <= MAX_CLASS:
+        return None
+    return low, high
+
+def class_bounds(taught: dict) -> Optional[tuple]:
+    if taught.get('min_class') is not None:
+        return taught['min_class'], taught['max_class']
+    # Rows written before ranges were parsed at write time
+    return parse_class_range(taught.get('class_range'))
+
+def class_levels(classes: List[dict]) -> List[int]:
+    # Every class number covered by any of the tutor's class ranges
+    levels = set()
+    for taught in classes:
+        bounds = class_bounds(taught)
+        if bounds:
+            levels.update(range(bounds[0], bounds[1] + 1))
+    return sorted(levels)
+
+def subject_keys(subjects: List[str]) -> List[str]:
+    # Normalized like autocomplete terms, so "physics" and "Physics " find the same tutors
+    return sorted({key for key in map(normalize_term, subjects or []) if key})
+
+def subject_class_key(subject_key: str, class_level: int) -> str:
+    return f"{subject_key}|{class_level}"
+
+def subject_classes(classes: List[dict]) -> List[str]:
+    # "subject|class" for every subject and class of each class entry, so "teaches
+    # Physics to class 11" is one equality on the card rather than a classes_taught lookup
+    keys = set()
+    for taught in classes:
+        bounds = class_bounds(taught)
+        if bounds:
+            keys.update(
+                subject_class_key(key, level)
+                for key in subject_keys(taught.get('subjects'))
+                for level in range(bounds[0], bounds[1] + 1)
+            )
+    return sorted(keys)
+
+async def backfill_class_ranges() -> tuple:
+    # Parse class_range into min_class/max_class on rows that predate it;
+    # returns (updated count, rows whose class_range could not be parsed)
+    updated = 0
+    invalid = []
+    async for taught in db.classes_taught.find({"min_class": None}, {"_id": 0, "id": 1, "tutor_id": 1, "class_range": 1}):
+        bounds = parse_class_range(taught.get('class_range'))
+        if not bounds:
+            invalid.append(taught)
+            continue
+        await db.classes_taught.update_one(
+            {"id": taught['id']},
+            {"$set": {"min_class": bounds[0], "max_class": bounds[1]}}
+        )
+        updated += 1
+    return updated, invalid
+
+# Rating aggregates
+# review_count, rating_sum, avg_rating and a per-star histogram live on the tutor profile
+# and change by one review at a time in a single pipeline update, so concurrent reviews
+# never lose an increment and no read ever re-scans a tutor's reviews. Cards copy them
+# from the profile. recompute_rating_aggregates rebuilds them from the reviews themselves,
+# for bulk deletions and, at startup, for profiles that predate them.
+RATING_STARS = ["1", "2", "3", "4", "5"]
+
+def average_rating_expr() -> dict:
+    return {"$cond": [
+        {"$gt": ["$review_count", 0]},
+        {"$divide": ["$rating_sum", "$review_count"]},
+        0
+    ]}
+
+async def apply_rating_change(tutor_id: str, rating: int, delta: int):
+    # delta is +1 for a new review and -1 for a deleted one
+    await db.tutor_profiles.update_one({"user_id": tutor_id}, [
+        {"$set": {
+            "review_count": {"$add": [{"$ifNull": ["$review_count", 0]}, delta]},
+            "rating_sum": {"$add": [{"$ifNull": ["$rating_sum", 0]}, delta * rating]},
+            f"rating_histogram.{rating}": {"$add": [{"$ifNull": [f"$rating_histogram.{rating}", 0]}, delta]}
+        }},
+        {"$set": {"avg_rating": average_rating_expr()}}
+    ])
+    top_tutors_ranking.mark_dirty()
+
+def rating_totals(histogram: dict) -> dict:
+    histogram = {star: histogram.get(star, 0) for star in RATING_STARS}
+    review_count = sum(histogram.values())
+    rating_sum = sum(int(star) * count for star, count in histogram.items())
+    return {
+        "review_count": review_count,
+        "rating_sum": rating_sum,
+        "avg_rating": rating_sum / review_count if review_count else 0,
+        "rating_histogram": histogram
+    }
+
+async def recompute_rating_aggregates(tutor_ids: Optional[List[str]] = None, batch_size: int = 1000) -> int:
+    # All tutors when tutor_ids is None; tutors without reviews are reset to zero
+    match = {"tutor_id": {"$in": tutor_ids}} if tutor_ids is not None else {}
+    histograms = {}
+    async for row in db.reviews.aggregate([
+        {"$match": match},
+        {"$group": {"_id": {"tutor_id": "$tutor_id", "rating": "$rating"}, "count": {"$sum": 1}}}
+    ]):
+        histograms.setdefault(row['_id']['tutor_id'], {})[str(row['_id']['rating'])] = row['count']
+    
+    if tutor_ids is None:
+        tutor_ids = await db.tutor_profiles.distinct("user_id")
+    for i in range(0, len(tutor_ids), batch_size):
+        await db.tutor_profiles.bulk_write([
+            UpdateOne({"user_id": tutor_id}, {"$set": rating_totals(histograms.get(tutor_id, {}))})
+            for tutor_id in tutor_ids[i:i + batch_size]
+        ], ordered=False)
+    if tutor_ids:
+        top_tutors_ranking.mark_dirty()
+    return len(tutor_ids)
+
+async def backfill_rating_aggregates(batch_size: int = 1000) -> int:
+    # Profiles that predate the aggregates get them from their reviews, and their cards
+    # are rebuilt. Run at startup: apply_rating_change counts from zero on a profile
+    # without them, and cards would show no rating until a manual rebuild.
+    backfilled = 0
+    while True:
+        tutor_ids = [profile['user_id'] for profile in await db.tutor_profiles.find(
+            {"rating_histogram": {"$exists": False}}, {"_id": 0, "user_id": 1}
+        ).limit(batch_size).to_list(batch_size)]
+        if not tutor_ids:
+            return backfilled
+        await recompute_rating_aggregates(tutor_ids)
+        await _write_tutor_cards(
+            await db.tutor_profiles.find({"user_id": {"$in": tutor_ids}}, {"_id": 0}).to_list(batch_size)
+        )
+        backfilled += len(tutor_ids)
+
+async def build_tutor_cards(profiles: List[dict]) -> List[dict]:
+    loaders = Loaders(db)
+    tutor_ids = [profile['user_id'] for profile in profiles]
+    users, all_classes = await asyncio.gather(
+        loaders.users.load_many(tutor_ids),
+        loaders.classes.load_many(tutor_ids)
+    )
+    
+    cards = []
+    for profile, user, classes in zip(profiles, users, all_classes):
+        if not user:
+            continue
+        review_count = profile.get('review_count', 0)
+        rating_sum = profile.get('rating_sum', 0)
+        cards.append({
+            **profile,
+            "user": {
+                "id": user['id'],
+                "name": user['name'],
+                "profile_picture": user.get('profile_picture'),
+                "profile_picture_variants": user.get('profile_picture_variants')
+            },
+            "classes_taught": classes,
+            "subject_keys": subject_keys(profile.get('subjects')),
+            "class_levels": class_levels(classes),
+            "subject_classes": subject_classes(classes),
+            "review_count": review_count,
+            "rating_sum": rating_sum,
+            "avg_rating": rating_sum / review_count if review_count else 0
+        })
+    return cards
+
+async def refresh_tutor_card(tutor_id: str):
+    profile = await db.tutor_profiles.find_one({"user_id": tutor_id}, {"_id": 0})
+    cards = await build_tutor_cards([profile]) if profile else []
+    if cards:
+        await db.tutor_cards.replace_one({"user_id": tutor_id}, cards[0], upsert=True)
+        autocomplete_index.upsert_tutor(cards[0])
+    else:
+        await db.tutor_cards.delete_one({"user_id": tutor_id})
+        autocomplete_index.remove_tutor(tutor_id)
+
+async def rebuild_tutor_cards(batch_size: int = 500) -> int:
+    # Full backfill/recovery: rebuild every card from source collections, then drop orphans
+    seen = set()
+    cursor = db.tutor_profiles.find({}, {"_id": 0}).batch_size(batch_size)
+    batch = []
+    async for profile in cursor:
+        batch.append(profile)
+        if len(batch) >= batch_size:
+            seen.update(await _write_tutor_cards(batch))
+            batch = []
+    if batch:
+        seen.update(await _write_tutor_cards(batch))
+    
+    orphans = [tutor_id for tutor_id in await db.tutor_cards.distinct("user_id") if tutor_id not in seen]
+    for i in range(0, len(orphans), batch_size):
+        await db.tutor_cards.delete_many({"user_id": {"$in": orphans[i:i + batch_size]}})
+    return len(seen)
+
+# Card fields that searches filter on and that older cards may predate
+TUTOR_CARD_REQUIRED_FIELDS = ["subject_keys", "class_levels", "subject_classes"]
+
+async def refresh_outdated_tutor_cards(batch_size: int = 500) -> int:
+    # Rebuild only the cards missing a required field; run at startup so a deploy that
+    # adds one never serves searches that silently skip the older cards
+    outdated = {"$or": [{field: {"$exists": False}} for field in TUTOR_CARD_REQUIRED_FIELDS]}
+    refreshed = 0
+    while True:
+        tutor_ids = [card['user_id'] for card in await db.tutor_cards.find(
+            outdated, {"_id": 0, "user_id": 1}
+        ).limit(batch_size).to_list(batch_size)]
+        if not tutor_ids:
+            return refreshed
+        profiles = await db.tutor_profiles.find({"user_id": {"$in": tutor_ids}}, {"_id": 0}).to_list(batch_size)
+        written = set(await _write_tutor_cards(profiles))
+        # Cards with no profile or user left behind are orphans
+        orphans = [tutor_id for tutor_id in tutor_ids if tutor_id not in written]
+        if orphans:
+            await db.tutor_cards.delete_many({"user_id": {"$in": orphans}})
+        refreshed += len(written)
+
+async def _write_tutor_cards(profiles: List[dict]) -> List[str]:
+    cards = await build_tutor_cards(profiles)
+    if cards:
+        await db.tutor_cards.bulk_write(
+            [ReplaceOne({"user_id": card['user_id']}, card, upsert=True) for card in cards],
+            ordered=False
+        )
+    return [card['user_id'] for card in cards]
+
+# Autocomplete
+# Tutor names and subjects live in an in-process sorted array of (term, kind, ref)
+# tuples, so a prefix is one bisect plus a scan of the matching slice and never
+# touches Mongo. Names are indexed from every word ("sharma" finds "Rahul Sharma");
+# subjects are normalized (case, accents, spacing) and shown in their most common
+# spelling. Suggestions are ranked by reach_count, summed over tutors for a subject.
+# Card writes on this worker update the index immediately; a periodic rebuild picks
+# up other workers' writes and accumulated reach. Writes made while a rebuild is
+# reading are replayed onto its result, so the swap never rolls them back.
+AUTOCOMPLETE_REBUILD_INTERVAL = float(os.environ.get('AUTOCOMPLETE_REBUILD_INTERVAL', '600'))
+AUTOCOMPLETE_MAX_LIMIT = 25
+# Prefixes this short match large slices; their results are memoized until a write
+# touches a term starting with them
+AUTOCOMPLETE_MEMO_PREFIX_LENGTH = 2
+
+def normalize_term(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+class AutocompleteIndex:
+    def __init__(self):
+        self.entries = []  # sorted (term, kind, ref)
+        self.tutors = {}  # tutor_id -> {"name", "weight", "terms", "subjects"}
+        self.subjects = {}  # normalized subject -> {"spellings": Counter, "weight", "tutors"}
+        self.memo = {}  # short prefix -> top AUTOCOMPLETE_MAX_LIMIT suggestions
+        self.journals = []  # one list of writes per rebuild in progress
+        self.built_at = None
+        self.build_ms = 0.0
+    
+    @staticmethod
+    def _name_terms(name_key: str) -> List[str]:
+        words = name_key.split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+    
+    def _insert(self, entry: tuple):
+        bisect.insort(self.entries, entry)
+    
+    def _delete(self, entry: tuple):
+        i = bisect.bisect_left(self.entries, entry)
+        if i < len(self.entries) and self.entries[i] == entry:
+            del self.entries[i]
+    
+    def _add_subject(self, tutor_id: str, spelling: str, weight: int, bulk: bool = False):
+        key = normalize_term(spelling)
+        if not key:
+            return None
+        subject = self.subjects.get(key)
+        if subject is None:
+            subject = self.subjects[key] = {"spellings": Counter(), "weight": 0, "tutors": set()}
+            if bulk:
+                self.entries.append((key, "subject", key))
+            else:
+                self._insert((key, "subject", key))
+        subject["spellings"][spelling.strip()] += 1
+        subject["weight"] += weight
+        subject["tutors"].add(tutor_id)
+        return key, spelling.strip()
+    
+    def _add_tutor(self, card: dict, bulk: bool = False):
+        tutor_id = card['user_id']
+        name = (card.get('user') or {}).get('name') or ""
+        weight = card.get('reach_count', 0)
+        terms = [(term, "tutor", tutor_id) for term in self._name_terms(normalize_term(name))]
+        for entry in terms:
+            if bulk:
+                self.entries.append(entry)
+            else:
+                self._insert(entry)
+        subjects = [
+            added for added in (self._add_subject(tutor_id, spelling, weight, bulk) for spelling in card.get('subjects') or [])
+            if added
+        ]
+        self.tutors[tutor_id] = {"name": name, "weight": weight, "terms": terms, "subjects": subjects}
+    
+    def _remove_tutor(self, tutor_id: str) -> List[str]:
+        tutor = self.tutors.pop(tutor_id, None)
+        if tutor is None:
+            return []
+        for entry in tutor["terms"]:
+            self._delete(entry)
+        for key, spelling in tutor["subjects"]:
+            subject = self.subjects[key]
+            subject["spellings"][spelling] -= 1
+            subject["weight"] -= tutor["weight"]
+            subject["tutors"].discard(tutor_id)
+            if not subject["tutors"]:
+                del self.subjects[key]
+                self._delete((key, "subject", key))
+        return self._terms_of(tutor)
+    
+    @staticmethod
+    def _terms_of(tutor: dict) -> List[str]:
+        return [term for term, _, _ in tutor["terms"]] + [key for key, _ in tutor["subjects"]]
+    
+    def _forget(self, terms: List[str]):
+        # Only memoized prefixes of a changed term can hold a changed suggestion
+        for term in terms:
+            for length in range(1, AUTOCOMPLETE_MEMO_PREFIX_LENGTH + 1):
+                self.memo.pop(term[:length], None)
+    
+    def remove_tutor(self, tutor_id: str):
+        for journal in self.journals:
+            journal.append(("remove", tutor_id))
+        self._forget(self._remove_tutor(tutor_id))
+    
+    def upsert_tutor(self, card: dict):
+        for journal in self.journals:
+            journal.append(("upsert", card))
+        removed = self._remove_tutor(card['user_id'])
+        self._add_tutor(card)
+        self._forget(removed + self._terms_of(self.tutors[card['user_id']]))
+    
+    async def rebuild(self) -> int:
+        started = time.perf_counter()
+        fresh = AutocompleteIndex()
+        journal = []
+        self.journals.append(journal)
+        try:
+            cursor = db.tutor_cards.find({}, {"_id": 0, "user_id": 1, "user.name": 1, "subjects": 1, "reach_count": 1})
+            async for card in cursor.batch_size(1000):
+                fresh._add_tutor(card, bulk=True)
+            fresh.entries.sort()
+        finally:
+            self.journals.remove(journal)
+        # The cursor may have read a card before a write this worker made during the
+        # rebuild; replay those writes, in order, on top of what it read
+        for write, arg in journal:
+            if write == "upsert":
+                fresh.upsert_tutor(arg)
+            else:
+                fresh.remove_tutor(arg)
+        # Swap in one step so queries never see a half-built index
+        self.entries, self.tutors, self.subjects = fresh.entries, fresh.tutors, fresh.subjects
+        self.memo = {}
+        self.built_at = datetime.now(timezone.utc).isoformat()
+        self.build_ms = (time.perf_counter() - started) * 1000
+        return len(self.tutors)
+    
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        key = normalize_term(prefix)
+        if not key:
+            return []
+        memoized = len(key) <= AUTOCOMPLETE_MEMO_PREFIX_LENGTH
+        if memoized and key in self.memo:
+            return self.memo[key][:limit]
+        
+        low = bisect.bisect_left(self.entries, (key,))
+        high = bisect.bisect_left(self.entries, (key + "\uffff",))
+        # One candidate per tutor or subject, however many of its terms matched
+        candidates = {(kind, ref) for _, kind, ref in self.entries[low:high]}
+        # Memoized prefixes are ranked once for the largest limit and sliced per request
+        best = heapq.nlargest(AUTOCOMPLETE_MAX_LIMIT if memoized else limit, candidates, key=self._weight)
+        suggestions = [self._suggestion(kind, ref) for kind, ref in best]
+        if memoized:
+            self.memo[key] = suggestions
+        return suggestions[:limit]
+    
+    def subject_label(self, key: str) -> str:
+        subject = self.subjects.get(key)
+        return subject["spellings"].most_common(1)[0][0] if subject else key
+    
+    def _weight(self, candidate: tuple):
+        kind, ref = candidate
+        if kind == "subject":
+            return self.subjects[ref]["weight"], len(self.subjects[ref]["tutors"])
+        return self.tutors[ref]["weight"], 0
+    
+    def _suggestion(self, kind: str, ref: str) -> dict:
+        if kind == "subject":
+            subject = self.subjects[ref]
+            return {
+                "type": "subject",
+                "label": self.subject_label(ref),
+                "tutor_count": len(subject["tutors"])
+            }
+        return {"type": "tutor", "id": ref, "label": self.tutors[ref]["name"]}
+    
+    def metrics(self) -> dict:
+        return {
+            "tutors": len(self.tutors),
+            "subjects": len(self.subjects),
+            "entries": len(self.entries),
+            "built_at": self.built_at,
+            "build_ms": round(self.build_ms, 2)
+        }
+
+autocomplete_index = AutocompleteIndex()
+
+# Fields holding images, per collection, and the key identifying each document
+INLINE_MEDIA_FIELDS = [
+    ("users", "id", ["profile_picture"]),
+    ("tutor_profiles", "user_id", ["coaching_photo", "verification_proof", "verification_banner"]),
+]
+# Stored as private media, never served by the public media route
+PRIVATE_MEDIA_FIELDS = {"verification_proof"}
+
+async def migrate_inline_media(batch_size: int = 100) -> int:
+    # Move every remaining data URL into the media store and keep only its reference
+    migrated = 0
+    for collection, key, fields in INLINE_MEDIA_FIELDS:
+        query = {"$or": [{field: {"$regex": "^data:"}} for field in fields]}
+        projection = {"_id": 0, key: 1, **{field: 1 for field in fields}}
+        async for doc in db[collection].find(query, projection).batch_size(batch_size):
+            updates = {}
+            for field in fields:
+                value = doc.get(field)
+                if not value or not value.startswith("data:"):
+                    continue
+                try:
+                    updates[field] = await store_image(value, private=field in PRIVATE_MEDIA_FIELDS)
+                except HTTPException as e:
+                    logger.error(f"Skipping {collection}.{field} of {doc[key]}: {e.detail}")
+            if updates:
+                await db[collection].update_one({key: doc[key]}, {"$set": updates})
+                migrated += len(updates)
+    
+    # Proofs moved before private media existed are public media records; flag them
+    proof_hashes = [
+        media_hash_of(value)
+        for value in await db.tutor_profiles.distinct("verification_proof")
+        if media_hash_of(value)
+    ]
+    if proof_hashes:
+        await db.media.update_many({"hash": {"$in": proof_hashes}}, {"$set": {"private": True}})
+    return migrated
+
+# Background tasks
+async def run_periodically(interval: float, fn, name: str):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await fn()
+        except Exception:
+            logger.exception(f"Periodic task {name} failed")
+
+# Profile view counters
+# Views of a tutor profile are aggregated in memory per tutor and written as one
+# unordered bulk_write of $inc operations: every VIEW_FLUSH_INTERVAL seconds, as soon
+# as VIEW_BUFFER_MAX distinct tutors are pending, and on graceful shutdown. Views
+# still buffered when a worker crashes are lost; reach_count is a popularity
+# signal, so losing at most one interval of views is accepted. Profiles are written
+# first and cards second, each tracked separately: a view that reached the profile
+# but not the card is retried against the card only, and anything unconfirmed when a
+# flush fails or is cancelled goes back into the buffer.
+VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', '10'))
+VIEW_BUFFER_MAX = int(os.environ.get('VIEW_BUFFER_MAX', '1000'))
+
+class ViewCounterBuffer:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.counts = {}  # not yet on profiles or cards
+        self.card_counts = {}  # on profiles, not yet on cards
+        self.flushed_views = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self._flush_task = None
+
+    def record(self, tutor_id: str):
+        self.counts[tutor_id] = self.counts.get(tutor_id, 0) + 1
+        if len(self.counts) >= self.max_size and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.ensure_future(self.flush())
+            self._flush_task.add_done_callback(self._log_flush_error)
+
+    def _log_flush_error(self, task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"View counter flush failed: {task.exception()}")
+
+    @staticmethod
+    def _merge(target: dict, counts: dict):
+        for tutor_id, n in counts.items():
+            target[tutor_id] = target.get(tutor_id, 0) + n
+
+    @staticmethod
+    async def _increment(collection, counts: dict) -> dict:
+        # Returns the counts whose update failed; the rest were applied
+        tutor_ids = list(counts)
+        try:
+            await collection.bulk_write(
+                [UpdateOne({"user_id": tutor_id}, {"$inc": {"reach_count": counts[tutor_id]}}) for tutor_id in tutor_ids],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            logger.warning(f"{len(e.details['writeErrors'])} view count updates on {collection.name} failed")
+            return {tutor_ids[error['index']]: counts[tutor_ids[error['index']]] for error in e.details['writeErrors']}
+        return {}
+
+    async def flush(self):
+        if not self.counts and not self.card_counts:
+            return
+        counts, self.counts = self.counts, {}
+        card_counts, self.card_counts = self.card_counts, {}
+        started = time.perf_counter()
+        unconfirmed_profiles, unconfirmed_cards = counts, card_counts
+        try:
+            if counts:
+                unconfirmed_profiles = await self._increment(db.tutor_profiles, counts)
+                # Views now on the profile join the card backlog
+                unconfirmed_cards = dict(card_counts)
+                self._merge(unconfirmed_cards, {
+                    tutor_id: n for tutor_id, n in counts.items() if tutor_id not in unconfirmed_profiles
+                })
+            if unconfirmed_cards:
+                unconfirmed_cards = await self._increment(db.tutor_cards, unconfirmed_cards)
+        finally:
+            # Also runs on cancellation, so a shutdown flush still writes these
+            self._merge(self.counts, unconfirmed_profiles)
+            self._merge(self.card_counts, unconfirmed_cards)
+            self.flushed_views += sum(counts.values()) - sum(unconfirmed_profiles.values())
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+
+    def metrics(self) -> dict:
+        return {
+            "pending_tutors": len(self.counts),
+            "pending_views": sum(self.counts.values()),
+            "pending_card_views": sum(self.card_counts.values()),
+            "flushed_views": self.flushed_views,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms
+        }
+
+view_counters = ViewCounterBuffer(VIEW_BUFFER_MAX)
+
+# Notification push
+# In-process pub/sub feeding the SSE stream: every open stream owns a bounded queue
+# registered under its user id. With NOTIFICATION_PUSH_SOURCE=local (default) the
+# dispatcher publishes each batch it writes, which only reaches streams held by the
+# same worker. With NOTIFICATION_PUSH_SOURCE=changestream every worker instead tails
+# the notifications change stream (requires a replica set), so a notification written
+# anywhere reaches streams on all workers.
+NOTIFICATION_PUSH_SOURCE = os.environ.get('NOTIFICATION_PUSH_SOURCE', 'local')
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get('SSE_HEARTBEAT_INTERVAL', '15'))
+SSE_STREAM_QUEUE_SIZE = int(os.environ.get('SSE_STREAM_QUEUE_SIZE', '100'))
+
+class NotificationHub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[user_id]
+
+    def publish(self, user_id: str, event: str, data: dict):
+        for queue in self.subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait((event, data))
+                self.published += 1
+            except asyncio.QueueFull:
+                # A client that stopped reading loses events rather than buffering forever
+                self.dropped += 1
+
+    def metrics(self) -> dict:
+        return {
+            "source": NOTIFICATION_PUSH_SOURCE,
+            "streams": sum(len(queues) for queues in self.subscribers.values()),
+            "users": len(self.subscribers),
+            "published": self.published,
+            "dropped": self.dropped
+        }
+
+notification_hub = NotificationHub(SSE_STREAM_QUEUE_SIZE)
+
+def publish_notifications(docs: List[dict]):
+    for doc in docs:
+        notification_hub.publish(doc['user_id'], "notification", {k: v for k, v in doc.items() if k != "_id"})
+
+async def watch_notification_inserts():
+    while True:
+        try:
+            async with db.notifications.watch([{"$match": {"operationType": "insert"}}]) as stream:
+                async for change in stream:
+                    publish_notifications([change['fullDocument']])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Notification change stream failed; reconnecting")
+            await asyncio.sleep(5)
+
+# Unread notification counters
+# notification_counters keeps one {user_id, unread, seeded} document per user,
+# incremented when notifications are written and decremented by exactly the number of
+# documents a mark-read actually flipped, so reading the badge count is a point lookup.
+# An increment for a user without a counter creates one flagged seeded=False: it holds
+# only the notifications since, so the next read seeds it from count_documents.
+UNREAD_SEED_ATTEMPTS = 5
+
+async def increment_unread(docs: List[dict]):
+    per_user = {}
+    for doc in docs:
+        per_user[doc['user_id']] = per_user.get(doc['user_id'], 0) + 1
+    if per_user:
+        await db.notification_counters.bulk_write(
+            [
+                UpdateOne({"user_id": user_id}, {"$inc": {"unread": n}, "$setOnInsert": {"seeded": False}}, upsert=True)
+                for user_id, n in per_user.items()
+            ],
+            ordered=False
+        )
+
+def unread_counter_usable(counter: Optional[dict]) -> bool:
+    # Counters written before the flag existed were all seeded
+    return counter is not None and counter.get('seeded', True) and counter['unread'] >= 0
+
+async def decrement_unread(user_id: str, n: int) -> int:
+    counter = await db.notification_counters.find_one_and_update(
+        {"user_id": user_id},
+        {"$inc": {"unread": -n}},
+        projection={"_id": 0, "unread": 1, "seeded": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not unread_counter_usable(counter):
+        return await seed_unread_counter(user_id)
+    return counter['unread']
+
+async def seed_unread_counter(user_id: str) -> int:
+    # The count replaces the counter only if the counter has not moved since it was
+    # read before counting; a notification written or read in between moves it, and
+    # a plain $set would overwrite that change, so the count is taken again
+    for _ in range(UNREAD_SEED_ATTEMPTS):
+        counter = await db.notification_counters.find_one({"user_id": user_id}, {"_id": 0, "unread": 1})
+        count = await db.notifications.count_documents({"user_id": user_id, "read": False})
+        if counter is None:
+            try:
+                await db.notification_counters.insert_one({"user_id": user_id, "unread": count, "seeded": True})
+                return count
+            except DuplicateKeyError:
+                continue  # created by an increment meanwhile
+        result = await db.notification_counters.update_one(
+            {"user_id": user_id, "unread": counter['unread']},
+            {"$set": {"unread": count, "seeded": True}}
+        )
+        if result.matched_count:
+            return count
+    # Still contended: answer with the last count and leave the counter for the next read
+    logger.warning(f"Unread counter for {user_id} kept moving; not seeded")
+    return count
+
+async def rebuild_unread_counters() -> int:
+    # Backfill/repair: recount unread notifications for every user
+    counts = await db.notifications.aggregate([
+        {"$match": {"read": False}},
+        {"$group": {"_id": "$user_id", "unread": {"$sum": 1}}}
+    ]).to_list(None)
+    await db.notification_counters.update_many({}, {"$set": {"unread": 0, "seeded": True}})
+    if counts:
+        await db.notification_counters.bulk_write(
+            [UpdateOne({"user_id": c['_id']}, {"$set": {"unread": c['unread'], "seeded": True}}, upsert=True) for c in counts],
+            ordered=False
+        )
+    return len(counts)
+
+# Notification archival
+# Notifications read more than NOTIFICATION_ARCHIVE_AFTER_DAYS ago are compacted into
+# one notification_archives document per user and month (of created_at), keeping the
+# hot collection small. The threshold is measured from read_at like the TTL and must
+# leave at least one archive interval before the TTL deletes the notification;
+# startup refuses a configuration where it does not. Unread notifications are never
+# archived, however old: they stay in the inbox until the user reads them. Items are
+# stored under their id, so overlapping or repeated runs overwrite rather than
+# duplicate them.
+NOTIFICATION_ARCHIVE_AFTER_DAYS = float(os.environ.get('NOTIFICATION_ARCHIVE_AFTER_DAYS', '7'))
+NOTIFICATION_ARCHIVE_INTERVAL = float(os.environ.get('NOTIFICATION_ARCHIVE_INTERVAL', '3600'))
+NOTIFICATION_ARCHIVE_BATCH = 1000
+
+def notification_archive_margin() -> float:
+    # Seconds between a notification becoming due for archival and its TTL expiry,
+    # less the worst-case wait for the next archive run
+    return (NOTIFICATION_READ_RETENTION_DAYS - NOTIFICATION_ARCHIVE_AFTER_DAYS) * 86400 - NOTIFICATION_ARCHIVE_INTERVAL
+
+async def archive_notifications() -> int:
+    now = datetime.now(timezone.utc)
+    # Read before read_at was recorded: neither the TTL nor the cutoff below sees them,
+    # so their retention starts now
+    await db.notifications.update_many({"read": True, "read_at": None}, {"$set": {"read_at": now}})
+    cutoff = now - timedelta(days=NOTIFICATION_ARCHIVE_AFTER_DAYS)
+    archived = 0
+    while True:
+        docs = await db.notifications.find(
+            {"read": True, "read_at": {"$lt": cutoff}},
+            {"_id": 0, "read_at": 0}
+        ).sort("read_at", 1).limit(NOTIFICATION_ARCHIVE_BATCH).to_list(NOTIFICATION_ARCHIVE_BATCH)
+        if not docs:
+            return archived
+        
+        buckets = {}
+        for doc in docs:
+            buckets.setdefault((doc['user_id'], doc['created_at'][:7]), []).append(doc)
+        await db.notification_archives.bulk_write(
+            [
+                UpdateOne(
+                    {"user_id": user_id, "month": month},
+                    {"$set": {
+                        f"items.{doc['id']}": {k: v for k, v in doc.items() if k != "user_id"} for doc in items
+                    }},
+                    upsert=True
+                )
+                for (user_id, month), items in buckets.items()
+            ],
+            ordered=False
+        )
+        await db.notifications.delete_many({"id": {"$in": [doc['id'] for doc in docs]}})
+        archived += len(docs)
+
+# Notification dispatcher
+# Producers enqueue notification documents and return without waiting on Mongo. One
+# background worker drains the queue and writes batches with insert_many, flushing
+# once NOTIFICATION_BATCH_SIZE documents are collected or NOTIFICATION_FLUSH_INTERVAL
+# seconds after the first document of a batch arrived. The queue is bounded: when it
+# is full, enqueue waits (backpressure) instead of growing memory. stop() drains
+# everything already queued before returning.
+NOTIFICATION_QUEUE_SIZE = int(os.environ.get('NOTIFICATION_QUEUE_SIZE', '10000'))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', '100'))
+NOTIFICATION_FLUSH_INTERVAL = float(os.environ.get('NOTIFICATION_FLUSH_INTERVAL', '0.5'))
+
+class NotificationDispatcher:
+    _STOP = object()
+
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.delivered = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._worker = None
+
+    def start(self):
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        await self.queue.put(self._STOP)
+        await self._worker
+        self._worker = None
+
+    async def enqueue(self, doc: dict):
+        await self.queue.put(doc)
+
+    async def deliver(self, docs: List[dict]):
+        # Write one batch; also usable directly by callers that already hold a batch
+        if not docs:
+            return
+        started = time.perf_counter()
+        try:
+            await db.notifications.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: everything not listed in writeErrors was inserted, and only that is counted
+            failed = {error['index'] for error in e.details['writeErrors']}
+            logger.error(f"Failed to write {len(failed)} of {len(docs)} notifications")
+            self.failed += len(failed)
+            docs = [doc for i, doc in enumerate(docs) if i not in failed]
+        await increment_unread(docs)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self.delivered += len(docs)
+        self.batches += 1
+        if NOTIFICATION_PUSH_SOURCE == "local":
+            publish_notifications(docs)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            doc = await self.queue.get()
+            if doc is self._STOP:
+                break
+            batch = [doc]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    doc = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if doc is self._STOP:
+                    stopping = True
+                    break
+                batch.append(doc)
+            try:
+                await self.deliver(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception(f"Failed to write {len(batch)} notifications")
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms
+        }
+
+notification_dispatcher = NotificationDispatcher(NOTIFICATION_QUEUE_SIZE, NOTIFICATION_BATCH_SIZE, NOTIFICATION_FLUSH_INTERVAL)
+
+# Platform statistics
+# platform_stats holds one counters document, kept current with $inc on the write
+# paths that change a count. A periodic reconciliation recounts from the source
+# collections to repair drift (a crash between two writes, manual data fixes).
+PLATFORM_STATS_ID = "platform"
+PLATFORM_STAT_FIELDS = ["total_users", "total_tutors", "total_students", "total_subscriptions", "pending_verifications"]
+STATS_RECONCILE_INTERVAL = float(os.environ.get('STATS_RECONCILE_INTERVAL', '900'))
+
+async def bump_stats(**deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if deltas:
+        await db.platform_stats.update_one({"_id": PLATFORM_STATS_ID}, {"$inc": deltas}, upsert=True)
+
+def role_stat_field(role: str) -> Optional[str]:
+    return {"tutor": "total_tutors", "student": "total_students"}.get(role)
+
+async def reconcile_platform_stats() -> dict:
+    counts = await asyncio.gather(
+        db.users.count_documents({}),
+        db.users.count_documents({"role": UserRole.TUTOR}),
+        db.users.count_documents({"role": UserRole.STUDENT}),
+        db.subscriptions.count_documents({"status": SubscriptionStatus.ACTIVE}),
+        db.tutor_profiles.count_documents({"verification_status": VerificationStatus.PENDING})
+    )
+    stats = dict(zip(PLATFORM_STAT_FIELDS, counts))
+    stats['reconciled_at'] = datetime.now(timezone.utc).isoformat()
+    await db.platform_stats.update_one({"_id": PLATFORM_STATS_ID}, {"$set": stats}, upsert=True)
+    return stats
+
 # Enums
 class UserRole(str, Enum):
     TUTOR = "tutor"
@@ -107,6 +1789,7 @@ class User(BaseModel):
     name: str
     role: UserRole
     profile_picture: Optional[str] = None
+    profile_picture_variants: Optional[dict] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class TutorProfileUpdate(BaseModel):
@@ -143,6 +1826,10 @@ class TutorProfile(BaseModel):
     verification_banner: Optional[str] = None  # Banner for verified tutors
     reach_count: int = 0
     subscriber_count: int = 0
+    # Maintained by apply_rating_change; never set from profile updates
+    review_count: int = 0
+    rating_sum: int = 0
+    rating_histogram: Dict[str, int] = Field(default_factory=lambda: {star: 0 for star in RATING_STARS})
 
 class ClassTaught(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -150,6 +1837,9 @@ class ClassTaught(BaseModel):
     tutor_id: str
     class_range: str  # e.g., "7-8" or "1-5"
     subjects: List[str]
+    # Parsed from class_range at write time, for "teaches class N" interval queries
+    min_class: Optional[int] = None
+    max_class: Optional[int] = None
 
 class SubscriptionCreate(BaseModel):
     tutor_id: str
@@ -165,7 +1855,7 @@ class Subscription(BaseModel):
 
 class ReviewCreate(BaseModel):
     tutor_id: str
-    rating: int  # 1-5
+    rating: int = Field(..., ge=1, le=5)
     comment: str
 
 class Review(BaseModel):
@@ -186,14 +1876,6 @@ class FeeRecord(BaseModel):
     status: FeeStatus = FeeStatus.UNPAID
     marked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-class AttendanceRecord(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    subscription_id: str
-    date: str  # YYYY-MM-DD
-    status: AttendanceStatus
-    marked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
 class Notification(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -210,49 +1892,202 @@ class VerificationProof(BaseModel):
 class ParentLogin(BaseModel):
     parent_code: str
 
-@api_router.post("/parents/login")
-async def parent_login(credentials: ParentLogin):
-    # Find student by parent code
-    student_profile = await db.student_profiles.find_one({"parent_code": credentials.parent_code}, {"_id": 0})
-    if not student_profile:
-        raise HTTPException(status_code=401, detail="Invalid parent code")
-    
-    # Get student user data
-    student = await db.users.find_one({"id": student_profile['user_id']}, {"_id": 0, "password_hash": 0})
-    
-    # Get subscriptions with fees and attendance
-    subscriptions = await db.subscriptions.find(
-        {"student_id": student_profile['user_id'], "status": SubscriptionStatus.ACTIVE},
-        {"_id": 0}
-    ).to_list(1000)
+# Attendance buckets
+# One attendance_buckets document per subscription per month:
+#   {subscription_id, month: "YYYY-MM", days: {"DD": status}, present, absent, updated_at}
+# Writes are a single pipeline upsert that sets the day and recomputes both counts
+# from the (at most 31) entries, so re-marking a day never double counts and a
+# month's or a subscription's percentage is read from the counts alone.
+def attendance_status_count(status: AttendanceStatus) -> dict:
+    return {"$size": {"$filter": {
+        "input": {"$objectToArray": "$days"},
+        "cond": {"$eq": ["$$this.v", status.value]}
+    }}}
+
+ATTENDANCE_BUCKET_COUNTS = {
+    "present": attendance_status_count(AttendanceStatus.PRESENT),
+    "absent": attendance_status_count(AttendanceStatus.ABSENT)
+}
+
+# Summed counts across a subscription's buckets, for $lookup pipelines
+ATTENDANCE_TOTALS = [{"$group": {"_id": None, "present": {"$sum": "$present"}, "absent": {"$sum": "$absent"}}}]
+
+def parse_attendance_date(date: str) -> tuple:
+    # "YYYY-MM-DD" -> (bucket month, day key)
+    try:
+        parsed = datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Date must be YYYY-MM-DD")
+    return parsed.strftime("%Y-%m"), parsed.strftime("%d")
+
+def attendance_bucket_update(subscription_id: str, date: str, status: AttendanceStatus) -> UpdateOne:
+    month, day = parse_attendance_date(date)
+    return UpdateOne(
+        {"subscription_id": subscription_id, "month": month},
+        [
+            {"$set": {
+                "days": {"$mergeObjects": [{"$ifNull": ["$days", {}]}, {day: status.value}]},
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }},
+            {"$set": ATTENDANCE_BUCKET_COUNTS}
+        ],
+        upsert=True
+    )
+
+def bucket_days(bucket: dict, since: Optional[str] = None) -> List[dict]:
+    # Expand a bucket into per-day {date, status} rows, oldest first
+    rows = [
+        {"date": f"{bucket['month']}-{day}", "status": status}
+        for day, status in sorted(bucket.get('days', {}).items())
+    ]
+    return [row for row in rows if since is None or row['date'] >= since]
+
+async def migrate_attendance_buckets() -> int:
+    # Fold legacy per-day attendance_records into monthly buckets. Days already
+    # present in a bucket were written after the cut-over and win over legacy rows.
+    await db.attendance_records.aggregate([
+        {"$group": {
+            "_id": {"subscription_id": "$subscription_id", "month": {"$substrBytes": ["$date", 0, 7]}},
+            "days": {"$push": {"k": {"$substrBytes": ["$date", 8, 2]}, "v": "$status"}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "subscription_id": "$_id.subscription_id",
+            "month": "$_id.month",
+            "days": {"$arrayToObject": "$days"},
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }},
+        {"$set": ATTENDANCE_BUCKET_COUNTS},
+        {"$merge": {
+            "into": "attendance_buckets",
+            "on": ["subscription_id", "month"],
+            "whenMatched": [
+                {"$set": {"days": {"$mergeObjects": ["$$new.days", "$days"]}}},
+                {"$set": ATTENDANCE_BUCKET_COUNTS}
+            ],
+            "whenNotMatched": "insert"
+        }}
+    ]).to_list(None)
+    return await db.attendance_buckets.count_documents({})
+
+# Parent portal
+# The whole portal view is one aggregation rooted at the student profile. Attendance
+# days are limited to a recent window (the summary sums every bucket's counts), and
+# the assembled snapshot is cached per parent code until a write to anything it
+# shows invalidates it: the student's user or profile, their subscriptions, fees and
+# attendance, or the user or profile of one of their tutors.
+PARENT_ATTENDANCE_WINDOW_DAYS = int(os.environ.get('PARENT_ATTENDANCE_WINDOW_DAYS', '90'))
+parent_snapshot_cache = TTLCache(
+    maxsize=int(os.environ.get('PARENT_SNAPSHOT_CACHE_SIZE', '5000')),
+    ttl=float(os.environ.get('PARENT_SNAPSHOT_CACHE_TTL', '300'))
+)
+
+def parent_snapshot_pipeline(parent_code: str, since: str) -> List[dict]:
+    public_user = [{"$project": {"_id": 0, "password_hash": 0}}]
+    return [
+        {"$match": {"parent_code": parent_code}},
+        {"$limit": 1},
+        {"$project": {"_id": 0}},
+        {"$lookup": {
+            "from": "users", "localField": "user_id", "foreignField": "id",
+            "pipeline": public_user, "as": "student"
+        }},
+        {"$lookup": {
+            "from": "subscriptions", "localField": "user_id", "foreignField": "student_id",
+            "pipeline": [
+                {"$match": {"status": SubscriptionStatus.ACTIVE}},
+                {"$project": {"_id": 0}},
+                {"$lookup": {
+                    "from": "users", "localField": "tutor_id", "foreignField": "id",
+                    "pipeline": public_user, "as": "tutor"
+                }},
+                {"$lookup": {
+                    "from": "tutor_profiles", "localField": "tutor_id", "foreignField": "user_id",
+                    "pipeline": [{"$project": {"_id": 0, **{field: 0 for field in PRIVATE_TUTOR_FIELDS}}}],
+                    "as": "tutor_profile"
+                }},
+                {"$lookup": {
+                    "from": "fee_records", "localField": "id", "foreignField": "subscription_id",
+                    "pipeline": [{"$sort": {"year": -1, "month": -1}}, {"$project": {"_id": 0}}], "as": "fees"
+                }},
+                {"$lookup": {
+                    "from": "attendance_buckets", "localField": "id", "foreignField": "subscription_id",
+                    "pipeline": [{"$match": {"month": {"$gte": since[:7]}}}, {"$sort": {"month": 1}}, {"$project": {"_id": 0}}],
+                    "as": "attendance"
+                }},
+                {"$lookup": {
+                    "from": "attendance_buckets", "localField": "id", "foreignField": "subscription_id",
+                    "pipeline": ATTENDANCE_TOTALS,
+                    "as": "attendance_totals"
+                }},
+                {"$set": {"tutor": {"$first": "$tutor"}, "tutor_profile": {"$first": "$tutor_profile"}}}
+            ],
+            "as": "subscriptions"
+        }},
+        {"$set": {"student": {"$first": "$student"}}}
+    ]
+
+def attendance_summary(present: int, absent: int) -> dict:
+    total = present + absent
+    return {
+        "present": present,
+        "absent": absent,
+        "total": total,
+        "percentage": round(present * 100 / total, 1) if total else 0
+    }
+
+async def load_parent_snapshot(parent_code: str) -> Optional[dict]:
+    since = (datetime.now(timezone.utc) - timedelta(days=PARENT_ATTENDANCE_WINDOW_DAYS)).date().isoformat()
+    docs = await db.student_profiles.aggregate(parent_snapshot_pipeline(parent_code, since)).to_list(1)
+    if not docs:
+        return None
     
-    # Fetch fees and attendance for each subscription
-    subscription_details = []
-    for sub in subscriptions:
-        # Get tutor info
-        tutor = await db.users.find_one({"id": sub['tutor_id']}, {"_id": 0, "password_hash": 0})
-        tutor_profile = await db.tutor_profiles.find_one({"user_id": sub['tutor_id']}, {"_id": 0})
-        
-        # Get fees
-        fees = await db.fee_records.find({"subscription_id": sub['id']}, {"_id": 0}).to_list(1000)
-        
-        # Get attendance
-        attendance = await db.attendance_records.find({"subscription_id": sub['id']}, {"_id": 0}).to_list(1000)
-        
-        subscription_details.append({
-            **sub,
-            "tutor": tutor,
-            "tutor_profile": tutor_profile,
-            "fees": fees,
-            "attendance": attendance
-        })
+    doc = docs[0]
+    for sub in doc['subscriptions']:
+        sub['attendance'] = [row for bucket in sub['attendance'] for row in bucket_days(bucket, since)]
+        totals = sub.pop('attendance_totals')
+        totals = totals[0] if totals else {}
+        sub['attendance_summary'] = attendance_summary(totals.get('present', 0), totals.get('absent', 0))
     
     return {
-        "student": student,
-        "student_profile": student_profile,
-        "subscriptions": subscription_details
+        "student": doc.pop('student'),
+        "subscriptions": doc.pop('subscriptions'),
+        "student_profile": doc,
+        "attendance_window_days": PARENT_ATTENDANCE_WINDOW_DAYS
     }
 
+async def invalidate_parent_snapshot(student_id: str):
+    profile = await db.student_profiles.find_one({"user_id": student_id}, {"_id": 0, "parent_code": 1})
+    if profile:
+        parent_snapshot_cache.invalidate(profile['parent_code'])
+
+async def invalidate_parent_snapshots(student_ids: List[str]):
+    profiles = await db.student_profiles.find(
+        {"user_id": {"$in": student_ids}}, {"_id": 0, "parent_code": 1}
+    ).to_list(len(student_ids))
+    for profile in profiles:
+        parent_snapshot_cache.invalidate(profile['parent_code'])
+
+async def invalidate_tutor_parent_snapshots(tutor_id: str):
+    # A tutor's name, picture and profile appear in each active student's snapshot
+    student_ids = await db.subscriptions.distinct(
+        "student_id", {"tutor_id": tutor_id, "status": SubscriptionStatus.ACTIVE}
+    )
+    if student_ids:
+        await invalidate_parent_snapshots(student_ids)
+
+@api_router.post("/parents/login")
+async def parent_login(credentials: ParentLogin):
+    snapshot = parent_snapshot_cache.get(credentials.parent_code)
+    if snapshot is None:
+        generation = parent_snapshot_cache.generation()
+        snapshot = await load_parent_snapshot(credentials.parent_code)
+        if snapshot is None:
+            raise HTTPException(status_code=401, detail="Invalid parent code")
+        parent_snapshot_cache.set(credentials.parent_code, snapshot, generation)
+    
+    return snapshot
+
 @api_router.post("/tutors/banner")
 async def upload_banner(banner_data: dict, current_user: dict = Depends(get_current_user)):
     if current_user['role'] != UserRole.TUTOR:
@@ -265,23 +2100,25 @@ async def upload_banner(banner_data: dict, current_user: dict = Depends(get_curr
     
     await db.tutor_profiles.update_one(
         {"user_id": current_user['id']},
-        {"$set": {"verification_banner": banner_data.get('banner')}}
+        {"$set": {"verification_banner": await store_image(banner_data.get('banner'))}}
     )
+    await refresh_tutor_card(current_user['id'])
+    await invalidate_tutor_parent_snapshots(current_user['id'])
     
     return {"message": "Banner uploaded successfully"}
 
 @api_router.get("/banners")
-async def get_banners():
+async def get_banners(request: Request, loaders: Loaders = Depends(get_loaders)):
     # Get all verified tutors with banners
     profiles = await db.tutor_profiles.find(
         {"is_verified": True, "verification_banner": {"$exists": True, "$ne": None}},
         {"_id": 0, "verification_banner": 1, "user_id": 1}
     ).to_list(100)
     
-    # Get user info for each
+    # Get user info for all of them in one query
+    users = await loaders.users.load_many([profile['user_id'] for profile in profiles])
     result = []
-    for profile in profiles:
-        user = await db.users.find_one({"id": profile['user_id']}, {"_id": 0, "name": 1})
+    for profile, user in zip(profiles, users):
         if user and profile.get('verification_banner'):
             result.append({
                 "banner": profile['verification_banner'],
@@ -289,7 +2126,25 @@ async def get_banners():
                 "tutor_id": profile['user_id']
             })
     
-    return result
+    return json_etag_response(request, result)
+
+# Media Routes
+@api_router.get("/media/{media_hash}")
+async def get_media(media_hash: str, request: Request):
+    media = await db.media.find_one({"hash": media_hash}, {"_id": 0})
+    # Records stored before types were checked may hold anything; never serve those
+    if not media or media.get('private') or media.get('content_type') not in MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    etag = f'"{media_hash}"'
+    headers = {"Cache-Control": MEDIA_CACHE_CONTROL, "ETag": etag, **MEDIA_SECURITY_HEADERS}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    data = await blob_store.get(media_hash)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return Response(content=data, media_type=media['content_type'], headers=headers)
 
 # Auth Routes
 @api_router.post("/auth/register")
@@ -304,20 +2159,30 @@ async def register(user_data: UserRegister):
         email=user_data.email,
         name=user_data.name,
         role=user_data.role,
-        profile_picture=user_data.profile_picture
+        **await image_updates("profile_picture", user_data.profile_picture)
     )
     
     user_dict = user.model_dump()
-    user_dict['password_hash'] = hash_password(user_data.password)
+    user_dict['password_hash'] = await password_hasher.hash(user_data.password)
     user_dict['created_at'] = user_dict['created_at'].isoformat()
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration for the same email
+        raise HTTPException(status_code=400, detail="Email already registered")
+    deltas = {"total_users": 1}
+    role_field = role_stat_field(user.role)
+    if role_field:
+        deltas[role_field] = 1
+    await bump_stats(**deltas)
     
     # Create tutor profile if role is tutor
     if user_data.role == UserRole.TUTOR:
         profile = TutorProfile(user_id=user.id)
         profile_dict = profile.model_dump()
         await db.tutor_profiles.insert_one(profile_dict)
+        await refresh_tutor_card(user.id)
     
     # Create student profile if role is student
     if user_data.role == UserRole.STUDENT:
@@ -336,7 +2201,7 @@ async def register(user_data: UserRegister):
 @api_router.post("/auth/login")
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user['password_hash']):
+    if not user or not await password_hasher.verify(credentials.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_access_token({"sub": user['id'], "role": user['role']})
@@ -362,9 +2227,10 @@ async def admin_login(credentials: AdminLogin):
             role=UserRole.ADMIN
         )
         admin_dict = admin_user.model_dump()
-        admin_dict['password_hash'] = hash_password("653165")
+        admin_dict['password_hash'] = await password_hasher.hash("653165")
         admin_dict['created_at'] = admin_dict['created_at'].isoformat()
         await db.users.insert_one(admin_dict)
+        await bump_stats(total_users=1)
         admin = admin_dict
     
     token = create_access_token({"sub": admin['id'], "role": admin['role']})
@@ -404,7 +2270,7 @@ async def update_student_profile(profile_data: StudentProfileUpdate, current_use
     # Update user fields
     user_updates = {}
     if profile_data.profile_picture:
-        user_updates["profile_picture"] = profile_data.profile_picture
+        user_updates.update(await image_updates("profile_picture", profile_data.profile_picture))
     if profile_data.name:
         user_updates["name"] = profile_data.name
     
@@ -413,6 +2279,7 @@ async def update_student_profile(profile_data: StudentProfileUpdate, current_use
             {"id": current_user['id']},
             {"$set": user_updates}
         )
+        principal_cache.invalidate(current_user['id'])
     
     # Update or create student profile
     profile_updates = {}
@@ -436,6 +2303,9 @@ async def update_student_profile(profile_data: StudentProfileUpdate, current_use
             new_profile = StudentProfile(user_id=current_user['id'], **profile_updates)
             await db.student_profiles.insert_one(new_profile.model_dump())
     
+    if user_updates or profile_updates:
+        await invalidate_parent_snapshot(current_user['id'])
+    
     return {"message": "Profile updated successfully"}
 
 @api_router.get("/students/profile/{user_id}")
@@ -443,66 +2313,443 @@ async def get_student_profile(user_id: str):
     profile = await db.student_profiles.find_one({"user_id": user_id}, {"_id": 0})
     return profile or {}
 
-# Tutor Routes
-@api_router.get("/tutors")
-async def get_tutors(subject: Optional[str] = None):
-    query = {}
-    if subject:
-        query["subjects"] = {"$in": [subject]}
-    
-    profiles = await db.tutor_profiles.find(query, {"_id": 0}).to_list(1000)
+# Sparse fieldsets
+# Tutor routes return a named preset of fields or an explicit ?fields= list, and the
+# selection becomes the Mongo projection on tutor_cards, so unselected fields are
+# neither read nor decoded. Verification evidence is only selectable by admins and
+# by the tutor it belongs to. Reviews are joined only when selected and only on the
+# single-tutor route, which embeds the newest page; the rest is paged separately.
+PRIVATE_TUTOR_FIELDS = ["verification_proof", "verification_phone"]
+TUTOR_CARD_FIELDS = [
+    "user_id", "subjects", "monthly_fee", "boards", "is_verified",
+    "user", "classes_taught", "class_levels", "review_count", "avg_rating"
+]
+TUTOR_DETAIL_FIELDS = TUTOR_CARD_FIELDS + [
+    "bio", "education", "coaching_address", "contact_number", "coaching_photo",
+    "coaching_photo_variants", "teaching_days", "hours_per_day", "verification_status",
+    "verification_banner", "reach_count", "rating_sum", "rating_histogram", "reviews"
+]
+TUTOR_FIELD_PRESETS = {
+    "card": TUTOR_CARD_FIELDS,
+    "detail": TUTOR_DETAIL_FIELDS,
+    "admin": TUTOR_DETAIL_FIELDS + ["id", "subscriber_count"] + PRIVATE_TUTOR_FIELDS
+}
+# Not stored on the card; filled in by get_tutor
+JOINED_TUTOR_FIELDS = {"reviews"}
+TUTOR_DETAIL_REVIEWS = int(os.environ.get('TUTOR_DETAIL_REVIEWS', '20'))
+
+def select_tutor_fields(
+    preset: str,
+    fields: Optional[str],
+    current_user: Optional[dict],
+    owner_id: Optional[str] = None,
+    joined: bool = True
+) -> List[str]:
+    is_admin = bool(current_user) and current_user['role'] == UserRole.ADMIN
+    if preset == "admin" and not is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Get user data for each tutor
-    result = []
-    for profile in profiles:
-        user = await db.users.find_one({"id": profile['user_id']}, {"_id": 0, "password_hash": 0})
-        if user:
-            # Get classes taught
-            classes = await db.classes_taught.find({"tutor_id": profile['user_id']}, {"_id": 0}).to_list(100)
-            # Get reviews
-            reviews = await db.reviews.find({"tutor_id": profile['user_id']}, {"_id": 0}).to_list(100)
-            avg_rating = sum([r['rating'] for r in reviews]) / len(reviews) if reviews else 0
-            
-            result.append({
-                **profile,
-                "user": user,
-                "classes_taught": classes,
-                "reviews": reviews,
-                "avg_rating": avg_rating
-            })
+    # An explicit field list replaces the preset; routes that join nothing leave the
+    # joined fields out of the presets and refuse them by name
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+    else:
+        selected = [f for f in TUTOR_FIELD_PRESETS[preset] if joined or f not in JOINED_TUTOR_FIELDS]
+    unknown = set(selected) - set(TUTOR_FIELD_PRESETS["admin"])
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    unavailable = set(selected) & JOINED_TUTOR_FIELDS if not joined else set()
+    if unavailable:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Not available on this route: {', '.join(sorted(unavailable))}; see /tutors/{{tutor_id}}"
+        )
+    is_owner = bool(current_user) and current_user['id'] == owner_id
+    if set(selected) & set(PRIVATE_TUTOR_FIELDS) and not (is_admin or is_owner):
+        raise HTTPException(status_code=403, detail="Verification fields are restricted")
+    return selected
+
+def tutor_projection(selected: List[str]) -> dict:
+    # user_id is always kept: it is the list sort key and cursor value
+    projection = {"_id": 0, "user_id": 1}
+    projection.update({field: 1 for field in selected if field not in JOINED_TUTOR_FIELDS})
+    return projection
+
+# Catalog search
+# Every catalog filter runs in Mongo against tutor_cards. The filter dependency is
+# shared by the search route and anything that must agree with it (facets, the
+# benchmark), and each sort ends in user_id so it is a complete keyset.
+TUTOR_SORTS = {
+    "default": [("user_id", 1)],
+    "rating": [("avg_rating", -1), ("user_id", 1)],
+    "fee": [("monthly_fee", 1), ("user_id", 1)],
+    "reach": [("reach_count", -1), ("user_id", 1)],
+}
+
+def tutor_search_query(
+    subject: Optional[str] = None,
+    boards: Optional[List[str]] = None,
+    min_fee: Optional[float] = None,
+    max_fee: Optional[float] = None,
+    verified_only: bool = False,
+    class_level: Optional[int] = None
+) -> dict:
+    if min_fee is not None and max_fee is not None and min_fee > max_fee:
+        raise HTTPException(status_code=400, detail="min_fee cannot exceed max_fee")
     
-    return result
+    query = {}
+    subject = normalize_term(subject)
+    if subject and class_level is not None:
+        # Class and subject together must hold for the same class entry, not just
+        # somewhere on the card: "teaches Physics to class 11", not "teaches Physics,
+        # and teaches class 11"
+        query["subject_classes"] = subject_class_key(subject, class_level)
+    elif subject:
+        query["subject_keys"] = subject
+    elif class_level is not None:
+        query["class_levels"] = class_level
+    if boards:
+        # Sorted and deduplicated so equivalent filters produce identical queries (and cache keys)
+        query["boards"] = {"$in": sorted(set(boards))}
+    if min_fee is not None or max_fee is not None:
+        query["monthly_fee"] = {}
+        if min_fee is not None:
+            query["monthly_fee"]["$gte"] = min_fee
+        if max_fee is not None:
+            query["monthly_fee"]["$lte"] = max_fee
+    if verified_only:
+        query["is_verified"] = True
+    return query
+
+# Each search has candidate indexes led by the first of these it filters on (most
+# selective first). One follows the requested sort, so a page never needs a sort over
+# an unbounded set. With a fee range, a second bounds the scan to that range. Mongo's
+# planner races the candidates and caches the winner per shape, replanning when it
+# degrades. A selective or empty fee range then reads only the cards in range, and a
+# broad one walks the sort order until the page is full. boards and is_verified have
+# a handful of values each, too coarse to earn indexes of their own, so they are
+# checked on whichever candidate wins.
+TUTOR_SEARCH_LEADS = ["subject_classes", "subject_keys", "class_levels"]
+
+def tutor_search_indexes(query: dict, order: List[tuple]) -> List[List[tuple]]:
+    lead = next((field for field in TUTOR_SEARCH_LEADS if field in query), None)
+    prefix = [(lead, 1)] if lead else []
+    indexes = [prefix + order]
+    if "monthly_fee" in query and order != TUTOR_SORTS["fee"]:
+        indexes.append(prefix + TUTOR_SORTS["fee"])
+    return indexes
+
+# One value per catalog filter; every subset is a combination the Find Tutors page can send
+TUTOR_SEARCH_SAMPLES = {
+    "subject": "Physics",
+    "boards": ["ICSE"],
+    "min_fee": 1000.0,
+    "max_fee": 3000.0,
+    "verified_only": True,
+    "class_level": 9,
+}
+
+def tutor_search_combinations() -> List[dict]:
+    names = list(TUTOR_SEARCH_SAMPLES)
+    return [
+        {name: TUTOR_SEARCH_SAMPLES[name] for name in subset}
+        for size in range(len(names) + 1)
+        for subset in itertools.combinations(names, size)
+    ]
+
+def tutor_search_shapes() -> List[tuple]:
+    shapes = []
+    for filters in tutor_search_combinations():
+        query = tutor_search_query(**filters)
+        for order in TUTOR_SORTS.values():
+            for index in tutor_search_indexes(query, order):
+                shape = ("get_tutors", "tutor_cards", [field for field, _ in index])
+                if shape not in shapes:
+                    shapes.append(shape)
+    return shapes
+
+QUERY_SHAPES.extend(tutor_search_shapes())
+
+async def tutor_search_filters(
+    subject: Optional[str] = None,
+    boards: Optional[List[str]] = Query(None),
+    min_fee: Optional[float] = Query(None, ge=0),
+    max_fee: Optional[float] = Query(None, ge=0),
+    verified_only: bool = False,
+    class_level: Optional[int] = Query(None, ge=MIN_CLASS, le=MAX_CLASS)
+) -> dict:
+    return tutor_search_query(subject, boards, min_fee, max_fee, verified_only, class_level)
 
-@api_router.get("/tutors/{tutor_id}")
-async def get_tutor(tutor_id: str):
-    profile = await db.tutor_profiles.find_one({"user_id": tutor_id}, {"_id": 0})
-    if not profile:
-        raise HTTPException(status_code=404, detail="Tutor not found")
-    
-    user = await db.users.find_one({"id": tutor_id}, {"_id": 0, "password_hash": 0})
-    classes = await db.classes_taught.find({"tutor_id": tutor_id}, {"_id": 0}).to_list(100)
-    reviews = await db.reviews.find({"tutor_id": tutor_id}, {"_id": 0}).to_list(100)
-    
+# Tutor Routes
+@api_router.get("/tutors")
+async def get_tutors(
+    request: Request,
+    query: dict = Depends(tutor_search_filters),
+    sort: Literal["default", "rating", "fee", "reach"] = "default",
+    preset: Literal["card", "detail", "admin"] = "card",
+    fields: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Optional[dict] = Depends(get_optional_user)
+):
+    selected = select_tutor_fields(preset, fields, current_user, joined=False)
+    order = TUTOR_SORTS[sort]
+    projection = tutor_projection(selected)
+    # The cursor is built from the sort keys, so they are always returned
+    projection.update({field: 1 for field, _ in order})
+    
+    # Cards are pre-joined with user, classes and rating totals
+    page = await paginate(db.tutor_cards, query, order, limit, cursor, projection=projection)
+    return json_etag_response(request, page, vary="Authorization")
+
+# Declared before /tutors/{tutor_id} so "autocomplete" is not taken as an id
+@api_router.get("/tutors/autocomplete")
+async def autocomplete_tutors(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=AUTOCOMPLETE_MAX_LIMIT)
+):
+    # Served entirely from memory
+    return {"query": q, "suggestions": autocomplete_index.suggest(q, limit)}
+
+# Facet counts for the catalog filter sidebar: one $facet aggregation over the cards
+# matching the current filters, cached briefly per normalized filter
+FEE_BANDS = [0, 500, 1000, 2000, 3000, 5000]
+FACET_LIMIT = 50
+tutor_facets_cache = TTLCache(
+    maxsize=int(os.environ.get('TUTOR_FACETS_CACHE_SIZE', '1000')),
+    ttl=float(os.environ.get('TUTOR_FACETS_CACHE_TTL', '60'))
+)
+
+def value_counts(field: str) -> List[dict]:
+    return [
+        {"$unwind": f"${field}"},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": FACET_LIMIT}
+    ]
+
+async def load_tutor_facets(query: dict) -> dict:
+    docs = await db.tutor_cards.aggregate([
+        {"$match": query},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "subjects": value_counts("subject_keys"),
+            "boards": value_counts("boards"),
+            "fee_bands": [{"$bucket": {
+                "groupBy": "$monthly_fee",
+                "boundaries": FEE_BANDS,
+                "default": FEE_BANDS[-1],
+                "output": {"count": {"$sum": 1}}
+            }}],
+            "verified": [{"$group": {"_id": "$is_verified", "count": {"$sum": 1}}}]
+        }}
+    ]).to_list(1)
+    facets = docs[0]
+    
+    # Fees at or above the last boundary land in the default bucket, keyed by that boundary
+    fee_counts = {}
+    for band in facets['fee_bands']:
+        fee_counts[band['_id']] = fee_counts.get(band['_id'], 0) + band['count']
+    upper_bounds = FEE_BANDS[1:] + [None]
+    verified = {bool(v['_id']): v['count'] for v in facets['verified']}
+    return {
+        "total": facets['total'][0]['count'] if facets['total'] else 0,
+        # Counted per normalized key and shown in its most common spelling, which the
+        # subject filter normalizes back to the same key
+        "subjects": [
+            {"value": autocomplete_index.subject_label(s['_id']), "count": s['count']}
+            for s in facets['subjects']
+        ],
+        "boards": [{"value": b['_id'], "count": b['count']} for b in facets['boards']],
+        "fee_bands": [
+            {"min": low, "max": high, "count": fee_counts.get(low, 0)}
+            for low, high in zip(FEE_BANDS, upper_bounds)
+        ],
+        "verified": {"true": verified.get(True, 0), "false": verified.get(False, 0)}
+    }
+
+# Declared before /tutors/{tutor_id} so "facets" is not taken as an id
+@api_router.get("/tutors/facets")
+async def get_tutor_facets(request: Request, query: dict = Depends(tutor_search_filters)):
+    key = json.dumps(query, sort_keys=True, default=str)
+    facets = tutor_facets_cache.get(key)
+    if facets is None:
+        facets = await load_tutor_facets(query)
+        tutor_facets_cache.set(key, facets)
+    return json_etag_response(request, facets)
+
+# Top tutors
+# Ranked by Bayesian average: each tutor's ratings plus TOP_TUTORS_PRIOR_WEIGHT phantom
+# reviews at the catalog-wide mean, so one 5-star review does not outrank a long record
+# of 4.8s. Rankings per normalized subject (and "" for the whole catalog) are precomputed
+# into top_tutors. Rating changes mark the ranking dirty and the next refresh tick
+# recomputes it; rating changes on other workers are picked up within TOP_TUTORS_MAX_AGE.
+TOP_TUTORS_PRIOR_WEIGHT = float(os.environ.get('TOP_TUTORS_PRIOR_WEIGHT', '10'))
+TOP_TUTORS_SIZE = 50
+TOP_TUTORS_REFRESH_INTERVAL = float(os.environ.get('TOP_TUTORS_REFRESH_INTERVAL', '60'))
+TOP_TUTORS_MAX_AGE = float(os.environ.get('TOP_TUTORS_MAX_AGE', '900'))
+
+def bayesian_rating(rating_sum: float, review_count: int, prior_mean: float) -> float:
+    return (TOP_TUTORS_PRIOR_WEIGHT * prior_mean + rating_sum) / (TOP_TUTORS_PRIOR_WEIGHT + review_count)
+
+def rank_top_tutors(rated: List[dict]) -> Dict[str, dict]:
+    # Normalized subject ("" for the whole catalog) -> ranking document, from the rated cards
+    total_count = sum(card['review_count'] for card in rated)
+    total_sum = sum(card['rating_sum'] for card in rated)
+    prior_mean = total_sum / total_count if total_count else 0
+    
+    candidates = {"": []}
+    spellings = {}
+    for card in rated:
+        score = bayesian_rating(card['rating_sum'], card['review_count'], prior_mean)
+        entry = (score, card['review_count'], card['user_id'])
+        candidates[""].append(entry)
+        # A tutor listing "Maths" and "maths " is ranked once under that subject
+        for key, spelling in {normalize_term(subject): subject for subject in card.get('subjects') or []}.items():
+            if key:
+                candidates.setdefault(key, []).append(entry)
+                spellings.setdefault(key, Counter())[spelling.strip()] += 1
+    return {
+        key: {
+            "label": spellings[key].most_common(1)[0][0] if key else None,
+            "tutors": [
+                {"user_id": user_id, "bayesian_rating": round(score, 4)}
+                for score, _, user_id in heapq.nlargest(TOP_TUTORS_SIZE, entries)
+            ],
+            "prior_mean": prior_mean,
+            "prior_weight": TOP_TUTORS_PRIOR_WEIGHT
+        }
+        for key, entries in candidates.items()
+    }
+
+class TopTutorsRanking:
+    def __init__(self):
+        self.dirty = True
+        self.refreshed_at = None
+        self.refresh_ms = 0.0
+        self.subjects = 0
+    
+    def mark_dirty(self):
+        self.dirty = True
+    
+    async def refresh_if_stale(self):
+        stale = self.refreshed_at is None or time.monotonic() - self.refreshed_at >= TOP_TUTORS_MAX_AGE
+        if self.dirty or stale:
+            await self.refresh()
+    
+    async def refresh(self) -> int:
+        # Cleared first so a rating change during the refresh triggers another one
+        self.dirty = False
+        try:
+            return await self._refresh()
+        except Exception:
+            # Nothing new was published; keep the ranking due for the next tick
+            self.dirty = True
+            raise
+    
+    async def _refresh(self) -> int:
+        started = time.perf_counter()
+        rated = []
+        cursor = db.tutor_cards.find({}, {"_id": 0, "user_id": 1, "subjects": 1, "review_count": 1, "rating_sum": 1})
+        async for card in cursor.batch_size(1000):
+            if card.get('review_count'):
+                rated.append(card)
+        rankings = rank_top_tutors(rated)
+        
+        now = datetime.now(timezone.utc).isoformat()
+        await db.top_tutors.bulk_write([
+            ReplaceOne({"subject": key}, {**ranking, "subject": key, "updated_at": now}, upsert=True)
+            for key, ranking in rankings.items()
+        ], ordered=False)
+        await db.top_tutors.delete_many({"subject": {"$nin": list(rankings)}})
+        
+        self.refreshed_at = time.monotonic()
+        self.refresh_ms = (time.perf_counter() - started) * 1000
+        self.subjects = len(rankings) - 1
+        return len(rated)
+    
+    def metrics(self) -> dict:
+        return {
+            "dirty": self.dirty,
+            "subjects": self.subjects,
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at is not None else None,
+            "refresh_ms": round(self.refresh_ms, 2)
+        }
+
+top_tutors_ranking = TopTutorsRanking()
+
+# Declared before /tutors/{tutor_id} so "top" is not taken as an id
+@api_router.get("/tutors/top")
+async def get_top_tutors(
+    request: Request,
+    subject: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=TOP_TUTORS_SIZE)
+):
+    ranking = await db.top_tutors.find_one({"subject": normalize_term(subject or "")}, {"_id": 0})
+    if not ranking:
+        return json_etag_response(request, {"subject": subject, "tutors": []})
+    
+    ranked = ranking['tutors'][:limit]
+    projection = tutor_projection(TUTOR_CARD_FIELDS)
+    cards = await db.tutor_cards.find(
+        {"user_id": {"$in": [entry['user_id'] for entry in ranked]}}, projection
+    ).to_list(None)
+    cards = {card['user_id']: card for card in cards}
+    # Tutors deleted since the last refresh are skipped
+    tutors = [
+        {**cards[entry['user_id']], "bayesian_rating": entry['bayesian_rating']}
+        for entry in ranked if entry['user_id'] in cards
+    ]
+    return json_etag_response(request, {
+        "subject": ranking['label'] or subject,
+        "prior_mean": ranking['prior_mean'],
+        "prior_weight": ranking['prior_weight'],
+        "updated_at": ranking['updated_at'],
+        "tutors": tutors
+    })
+
+async def review_page(tutor_id: str, limit: int, cursor: Optional[str], loaders: Loaders) -> dict:
+    # Newest first; id breaks ties between reviews created in the same instant
+    page = await paginate(db.reviews, {"tutor_id": tutor_id}, [("created_at", -1), ("id", 1)], limit, cursor)
     # Get student info for reviews
-    for review in reviews:
-        student = await db.users.find_one({"id": review['student_id']}, {"_id": 0, "password_hash": 0})
+    students = await loaders.users.load_many([review['student_id'] for review in page['items']])
+    for review, student in zip(page['items'], students):
         review['student'] = student
+    return page
+
+@api_router.get("/tutors/{tutor_id}")
+async def get_tutor(
+    tutor_id: str,
+    request: Request,
+    preset: Literal["card", "detail", "admin"] = "detail",
+    fields: Optional[str] = None,
+    loaders: Loaders = Depends(get_loaders),
+    current_user: Optional[dict] = Depends(get_optional_user)
+):
+    selected = select_tutor_fields(preset, fields, current_user, owner_id=tutor_id)
+    tutor = await db.tutor_cards.find_one({"user_id": tutor_id}, tutor_projection(selected))
+    if not tutor:
+        raise HTTPException(status_code=404, detail="Tutor not found")
     
-    avg_rating = sum([r['rating'] for r in reviews]) / len(reviews) if reviews else 0
+    if "reviews" in selected:
+        # Only the newest page is embedded; review_count is the total
+        page = await review_page(tutor_id, TUTOR_DETAIL_REVIEWS, None, loaders)
+        tutor['reviews'] = page['items']
+        tutor['reviews_next_cursor'] = page['next_cursor']
     
-    # Increment reach count
-    await db.tutor_profiles.update_one(
-        {"user_id": tutor_id},
-        {"$inc": {"reach_count": 1}}
-    )
+    # Increment reach count (buffered, written in the background); a 304 is still a view
+    view_counters.record(tutor_id)
     
-    return {
-        **profile,
-        "user": user,
-        "classes_taught": classes,
-        "reviews": reviews,
-        "avg_rating": avg_rating
-    }
+    return json_etag_response(request, tutor, vary="Authorization")
+
+@api_router.get("/tutors/{tutor_id}/reviews")
+async def get_tutor_reviews(
+    tutor_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    loaders: Loaders = Depends(get_loaders)
+):
+    return await review_page(tutor_id, limit, cursor, loaders)
 
 class ProfileUpdateWithPicture(TutorProfileUpdate):
     profile_picture: Optional[str] = None
@@ -517,8 +2764,9 @@ async def update_tutor_profile(profile_data: ProfileUpdateWithPicture, current_u
     # Update user fields (profile picture and name) in users collection
     user_updates = {}
     if update_data.get('profile_picture'):
-        user_updates["profile_picture"] = update_data['profile_picture']
-        del update_data['profile_picture']
+        user_updates.update(await image_updates("profile_picture", update_data.pop('profile_picture')))
+    if update_data.get('coaching_photo'):
+        update_data.update(await image_updates("coaching_photo", update_data['coaching_photo']))
     if update_data.get('name'):
         user_updates["name"] = update_data['name']
         del update_data['name']
@@ -528,6 +2776,7 @@ async def update_tutor_profile(profile_data: ProfileUpdateWithPicture, current_u
             {"id": current_user['id']},
             {"$set": user_updates}
         )
+        principal_cache.invalidate(current_user['id'])
     
     if update_data:
         await db.tutor_profiles.update_one(
@@ -535,6 +2784,9 @@ async def update_tutor_profile(profile_data: ProfileUpdateWithPicture, current_u
             {"$set": update_data}
         )
     
+    await refresh_tutor_card(current_user['id'])
+    await invalidate_tutor_parent_snapshots(current_user['id'])
+    
     profile = await db.tutor_profiles.find_one({"user_id": current_user['id']}, {"_id": 0})
     return profile
 
@@ -543,14 +2795,19 @@ async def submit_verification(proof: VerificationProof, current_user: dict = Dep
     if current_user['role'] != UserRole.TUTOR:
         raise HTTPException(status_code=403, detail="Only tutors can submit verification")
     
-    await db.tutor_profiles.update_one(
+    previous = await db.tutor_profiles.find_one_and_update(
         {"user_id": current_user['id']},
         {"$set": {
-            "verification_proof": proof.proof_image,
+            "verification_proof": await store_image(proof.proof_image, private=True),
             "verification_phone": proof.phone_number,
             "verification_status": VerificationStatus.PENDING
-        }}
+        }},
+        projection={"_id": 0, "verification_status": 1}
     )
+    if previous and previous.get('verification_status') != VerificationStatus.PENDING:
+        await bump_stats(pending_verifications=1)
+    await refresh_tutor_card(current_user['id'])
+    await invalidate_tutor_parent_snapshots(current_user['id'])
     
     return {"message": "Verification submitted successfully. Admin will review within 24-48 hours."}
 
@@ -606,7 +2863,7 @@ async def create_subscription(sub_data: SubscriptionCreate, current_user: dict =
     )
     notif_dict = notification.model_dump()
     notif_dict['created_at'] = notif_dict['created_at'].isoformat()
-    await db.notifications.insert_one(notif_dict)
+    await notification_dispatcher.enqueue(notif_dict)
     
     return subscription
 
@@ -619,19 +2876,28 @@ async def accept_subscription(subscription_id: str, current_user: dict = Depends
     if not subscription or subscription['tutor_id'] != current_user['id']:
         raise HTTPException(status_code=404, detail="Subscription not found")
     
-    await db.subscriptions.update_one(
-        {"id": subscription_id},
+    # Only the pending/rejected -> active transition counts towards active subscriptions
+    result = await db.subscriptions.update_one(
+        {"id": subscription_id, "status": {"$ne": SubscriptionStatus.ACTIVE}},
         {"$set": {
             "status": SubscriptionStatus.ACTIVE,
             "approved_at": datetime.now(timezone.utc).isoformat()
         }}
     )
+    if result.modified_count:
+        await bump_stats(total_subscriptions=1)
+    
+    await invalidate_parent_snapshot(subscription['student_id'])
     
     # Update subscriber count
     await db.tutor_profiles.update_one(
         {"user_id": current_user['id']},
         {"$inc": {"subscriber_count": 1}}
     )
+    await db.tutor_cards.update_one(
+        {"user_id": current_user['id']},
+        {"$inc": {"subscriber_count": 1}}
+    )
     
     # Create notification for student
     notification = Notification(
@@ -641,7 +2907,7 @@ async def accept_subscription(subscription_id: str, current_user: dict = Depends
     )
     notif_dict = notification.model_dump()
     notif_dict['created_at'] = notif_dict['created_at'].isoformat()
-    await db.notifications.insert_one(notif_dict)
+    await notification_dispatcher.enqueue(notif_dict)
     
     return {"message": "Subscription accepted"}
 
@@ -654,10 +2920,14 @@ async def reject_subscription(subscription_id: str, current_user: dict = Depends
     if not subscription or subscription['tutor_id'] != current_user['id']:
         raise HTTPException(status_code=404, detail="Subscription not found")
     
-    await db.subscriptions.update_one(
+    previous = await db.subscriptions.find_one_and_update(
         {"id": subscription_id},
-        {"$set": {"status": SubscriptionStatus.REJECTED}}
+        {"$set": {"status": SubscriptionStatus.REJECTED}},
+        projection={"_id": 0, "status": 1}
     )
+    if previous and previous['status'] == SubscriptionStatus.ACTIVE:
+        await bump_stats(total_subscriptions=-1)
+    await invalidate_parent_snapshot(subscription['student_id'])
     
     # Create notification for student
     notification = Notification(
@@ -667,28 +2937,39 @@ async def reject_subscription(subscription_id: str, current_user: dict = Depends
     )
     notif_dict = notification.model_dump()
     notif_dict['created_at'] = notif_dict['created_at'].isoformat()
-    await db.notifications.insert_one(notif_dict)
+    await notification_dispatcher.enqueue(notif_dict)
     
     return {"message": "Subscription rejected"}
 
 @api_router.get("/subscriptions/my")
-async def get_my_subscriptions(current_user: dict = Depends(get_current_user)):
+async def get_my_subscriptions(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    loaders: Loaders = Depends(get_loaders)
+):
+    sort = [("created_at", -1), ("id", 1)]
     if current_user['role'] == UserRole.TUTOR:
-        subscriptions = await db.subscriptions.find({"tutor_id": current_user['id']}, {"_id": 0}).to_list(1000)
+        page = await paginate(db.subscriptions, {"tutor_id": current_user['id']}, sort, limit, cursor)
+        subscriptions = page['items']
         # Get student info
-        for sub in subscriptions:
-            student = await db.users.find_one({"id": sub['student_id']}, {"_id": 0, "password_hash": 0})
+        students = await loaders.users.load_many([sub['student_id'] for sub in subscriptions])
+        for sub, student in zip(subscriptions, students):
             sub['student'] = student
     else:
-        subscriptions = await db.subscriptions.find({"student_id": current_user['id']}, {"_id": 0}).to_list(1000)
+        page = await paginate(db.subscriptions, {"student_id": current_user['id']}, sort, limit, cursor)
+        subscriptions = page['items']
         # Get tutor info
-        for sub in subscriptions:
-            tutor = await db.users.find_one({"id": sub['tutor_id']}, {"_id": 0, "password_hash": 0})
-            profile = await db.tutor_profiles.find_one({"user_id": sub['tutor_id']}, {"_id": 0})
+        tutor_ids = [sub['tutor_id'] for sub in subscriptions]
+        tutors, profiles = await asyncio.gather(
+            loaders.users.load_many(tutor_ids),
+            loaders.tutor_profiles.load_many(tutor_ids)
+        )
+        for sub, tutor, profile in zip(subscriptions, tutors, profiles):
             sub['tutor'] = tutor
             sub['tutor_profile'] = profile
     
-    return subscriptions
+    return page
 
 # Review Routes
 @api_router.post("/reviews")
@@ -715,6 +2996,8 @@ async def create_review(review_data: ReviewCreate, current_user: dict = Depends(
     review_dict = review.model_dump()
     review_dict['created_at'] = review_dict['created_at'].isoformat()
     await db.reviews.insert_one(review_dict)
+    await apply_rating_change(review_data.tutor_id, review.rating, 1)
+    await refresh_tutor_card(review_data.tutor_id)
     
     return review
 
@@ -727,12 +3010,20 @@ async def delete_review(review_id: str, current_user: dict = Depends(get_current
     if review['student_id'] != current_user['id']:
         raise HTTPException(status_code=403, detail="You can only delete your own reviews")
     
-    await db.reviews.delete_one({"id": review_id})
+    # Only the request that actually deletes the review takes it out of the totals
+    if await db.reviews.find_one_and_delete({"id": review_id}, projection={"_id": 1}):
+        await apply_rating_change(review['tutor_id'], review['rating'], -1)
+        await refresh_tutor_card(review['tutor_id'])
     return {"message": "Review deleted successfully"}
 
 # Fee & Attendance Routes
 @api_router.get("/fees/{subscription_id}")
-async def get_fees(subscription_id: str, current_user: dict = Depends(get_current_user)):
+async def get_fees(
+    subscription_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     subscription = await db.subscriptions.find_one({"id": subscription_id})
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
@@ -743,8 +3034,101 @@ async def get_fees(subscription_id: str, current_user: dict = Depends(get_curren
     if current_user['role'] == UserRole.TUTOR and subscription['tutor_id'] != current_user['id']:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    fees = await db.fee_records.find({"subscription_id": subscription_id}, {"_id": 0}).to_list(1000)
-    return fees
+    # (year, month) is unique per subscription, so it is a complete sort key
+    return await paginate(db.fee_records, {"subscription_id": subscription_id}, [("year", -1), ("month", -1)], limit, cursor)
+
+async def load_owned_subscriptions(tutor_id: str, subscription_ids: List[str]) -> dict:
+    # subscription id -> student id for the given ids that belong to the tutor, in one $in
+    ids = list(set(subscription_ids))
+    owned = await db.subscriptions.find(
+        {"id": {"$in": ids}, "tutor_id": tutor_id},
+        {"_id": 0, "id": 1, "student_id": 1}
+    ).to_list(len(ids))
+    return {sub['id']: sub['student_id'] for sub in owned}
+
+async def apply_owned_bulk(tutor_id: str, items: list, collection, operation_for, applied: str) -> tuple:
+    # Shared by the bulk fee and attendance routes: one ownership query, one unordered
+    # bulk_write of operation_for(item) per owned, first-seen subscription, and a
+    # per-item result (applied, not_found, duplicate or error) in request order.
+    # Returns (results, subscription id -> student id).
+    student_by_subscription = await load_owned_subscriptions(tutor_id, [item.subscription_id for item in items])
+    results = []
+    operations = []
+    positions = []
+    seen = set()
+    for item in items:
+        result = {"subscription_id": item.subscription_id, "status": item.status}
+        if item.subscription_id not in student_by_subscription:
+            result["result"] = "not_found"
+        elif item.subscription_id in seen:
+            result["result"] = "duplicate"
+        else:
+            seen.add(item.subscription_id)
+            result["result"] = applied
+            positions.append(len(results))
+            operations.append(operation_for(item))
+        results.append(result)
+    
+    if operations:
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                results[positions[error['index']]]["result"] = "error"
+        await invalidate_parent_snapshots(list({student_by_subscription[sid] for sid in seen}))
+    return results, student_by_subscription
+
+class BulkFeeItem(BaseModel):
+    subscription_id: str
+    status: FeeStatus
+
+class BulkFeeRequest(BaseModel):
+    month: int = Field(ge=1, le=12)
+    year: int
+    items: List[BulkFeeItem] = Field(max_length=MAX_PAGE_SIZE)
+
+# Declared before /fees/{subscription_id} so "bulk" is not taken as an id
+@api_router.put("/fees/bulk")
+async def update_fees_bulk(request: BulkFeeRequest, current_user: dict = Depends(get_current_user)):
+    if current_user['role'] != UserRole.TUTOR:
+        raise HTTPException(status_code=403, detail="Only tutors can update fees")
+    
+    # Month-end marking: one ownership query and one bulk_write for the whole roster
+    marked_at = datetime.now(timezone.utc).isoformat()
+    results, student_by_subscription = await apply_owned_bulk(
+        current_user['id'],
+        request.items,
+        db.fee_records,
+        lambda item: UpdateOne(
+            {"subscription_id": item.subscription_id, "month": request.month, "year": request.year},
+            {
+                "$set": {"status": item.status, "marked_at": marked_at},
+                "$setOnInsert": {"id": str(uuid.uuid4())}
+            },
+            upsert=True
+        ),
+        "updated"
+    )
+    
+    for result in results:
+        if result["result"] == "updated" and result["status"] == FeeStatus.UNPAID:
+            notification = Notification(
+                user_id=student_by_subscription[result["subscription_id"]],
+                type="fee_unpaid",
+                message=f"Your fee for {request.month}/{request.year} has been marked as unpaid by {current_user['name']}"
+            )
+            notif_dict = notification.model_dump()
+            notif_dict['created_at'] = notif_dict['created_at'].isoformat()
+            # Queued, so a notification failure cannot fail fee writes that already committed;
+            # the dispatcher still writes them in batches
+            await notification_dispatcher.enqueue(notif_dict)
+    
+    return {
+        "month": request.month,
+        "year": request.year,
+        "updated": sum(1 for r in results if r["result"] == "updated"),
+        "results": results
+    }
 
 @api_router.put("/fees/{subscription_id}")
 async def update_fee(subscription_id: str, month: int, year: int, fee_status: FeeStatus, current_user: dict = Depends(get_current_user)):
@@ -755,28 +3139,22 @@ async def update_fee(subscription_id: str, month: int, year: int, fee_status: Fe
     if not subscription or subscription['tutor_id'] != current_user['id']:
         raise HTTPException(status_code=404, detail="Subscription not found")
     
-    # Check if fee record exists
-    existing = await db.fee_records.find_one({
-        "subscription_id": subscription_id,
-        "month": month,
-        "year": year
-    })
-    
-    if existing:
-        await db.fee_records.update_one(
-            {"id": existing['id']},
-            {"$set": {"status": fee_status, "marked_at": datetime.now(timezone.utc).isoformat()}}
-        )
-    else:
-        fee_record = FeeRecord(
-            subscription_id=subscription_id,
-            month=month,
-            year=year,
-            status=fee_status
-        )
-        fee_dict = fee_record.model_dump()
-        fee_dict['marked_at'] = fee_dict['marked_at'].isoformat()
-        await db.fee_records.insert_one(fee_dict)
+    # Upsert on (subscription_id, month, year), which the unique index keeps to one record
+    fee_record = FeeRecord(
+        subscription_id=subscription_id,
+        month=month,
+        year=year,
+        status=fee_status
+    )
+    await db.fee_records.update_one(
+        {"subscription_id": subscription_id, "month": month, "year": year},
+        {
+            "$set": {"status": fee_status, "marked_at": fee_record.marked_at.isoformat()},
+            "$setOnInsert": {"id": fee_record.id}
+        },
+        upsert=True
+    )
+    await invalidate_parent_snapshot(subscription['student_id'])
     
     # Create notification if unpaid
     if fee_status == FeeStatus.UNPAID:
@@ -787,12 +3165,48 @@ async def update_fee(subscription_id: str, month: int, year: int, fee_status: Fe
         )
         notif_dict = notification.model_dump()
         notif_dict['created_at'] = notif_dict['created_at'].isoformat()
-        await db.notifications.insert_one(notif_dict)
+        await notification_dispatcher.enqueue(notif_dict)
     
     return {"message": "Fee status updated"}
 
+class BulkAttendanceItem(BaseModel):
+    subscription_id: str
+    status: AttendanceStatus
+
+class BulkAttendanceRequest(BaseModel):
+    date: str  # YYYY-MM-DD
+    items: List[BulkAttendanceItem] = Field(max_length=MAX_PAGE_SIZE)
+
+# Declared before /attendance/{subscription_id} so "bulk" is not taken as an id
+@api_router.post("/attendance/bulk")
+async def mark_attendance_bulk(request: BulkAttendanceRequest, current_user: dict = Depends(get_current_user)):
+    if current_user['role'] != UserRole.TUTOR:
+        raise HTTPException(status_code=403, detail="Only tutors can mark attendance")
+    
+    parse_attendance_date(request.date)
+    # One roll call: ownership in a single $in, every record in a single unordered bulk_write
+    results, _ = await apply_owned_bulk(
+        current_user['id'],
+        request.items,
+        db.attendance_buckets,
+        lambda item: attendance_bucket_update(item.subscription_id, request.date, item.status),
+        "marked"
+    )
+    
+    return {
+        "date": request.date,
+        "marked": sum(1 for r in results if r["result"] == "marked"),
+        "results": results
+    }
+
 @api_router.get("/attendance/{subscription_id}")
-async def get_attendance(subscription_id: str, current_user: dict = Depends(get_current_user)):
+async def get_attendance(
+    subscription_id: str,
+    view: Literal["days", "summary"] = "days",
+    limit: int = Query(12, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     subscription = await db.subscriptions.find_one({"id": subscription_id})
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
@@ -803,8 +3217,20 @@ async def get_attendance(subscription_id: str, current_user: dict = Depends(get_
     if current_user['role'] == UserRole.TUTOR and subscription['tutor_id'] != current_user['id']:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    attendance = await db.attendance_records.find({"subscription_id": subscription_id}, {"_id": 0}).to_list(1000)
-    return attendance
+    if view == "summary":
+        # Counts only: no day maps leave the database
+        months = await db.attendance_buckets.find(
+            {"subscription_id": subscription_id},
+            {"_id": 0, "month": 1, "present": 1, "absent": 1}
+        ).sort("month", -1).to_list(1000)
+        return {
+            "subscription_id": subscription_id,
+            "months": [{"month": m['month'], **attendance_summary(m['present'], m['absent'])} for m in months],
+            "summary": attendance_summary(sum(m['present'] for m in months), sum(m['absent'] for m in months))
+        }
+    
+    # One item per month, newest first; month is unique per subscription, so it is a complete sort key
+    return await paginate(db.attendance_buckets, {"subscription_id": subscription_id}, [("month", -1)], limit, cursor)
 
 @api_router.post("/attendance/{subscription_id}")
 async def mark_attendance(subscription_id: str, date: str, attendance_status: AttendanceStatus, current_user: dict = Depends(get_current_user)):
@@ -815,47 +3241,40 @@ async def mark_attendance(subscription_id: str, date: str, attendance_status: At
     if not subscription or subscription['tutor_id'] != current_user['id']:
         raise HTTPException(status_code=404, detail="Subscription not found")
     
-    # Check if attendance exists for date
-    existing = await db.attendance_records.find_one({
-        "subscription_id": subscription_id,
-        "date": date
-    })
-    
-    if existing:
-        await db.attendance_records.update_one(
-            {"id": existing['id']},
-            {"$set": {"status": attendance_status, "marked_at": datetime.now(timezone.utc).isoformat()}}
-        )
-    else:
-        attendance = AttendanceRecord(
-            subscription_id=subscription_id,
-            date=date,
-            status=attendance_status
-        )
-        att_dict = attendance.model_dump()
-        att_dict['marked_at'] = att_dict['marked_at'].isoformat()
-        await db.attendance_records.insert_one(att_dict)
+    # Upsert into the month bucket, which the unique index keeps to one document
+    await db.attendance_buckets.bulk_write([attendance_bucket_update(subscription_id, date, attendance_status)])
+    await invalidate_parent_snapshot(subscription['student_id'])
     
     return {"message": "Attendance marked"}
 
 # Classes Taught Routes
 @api_router.get("/classes/{tutor_id}")
-async def get_classes(tutor_id: str):
+async def get_classes(tutor_id: str, request: Request):
     classes = await db.classes_taught.find({"tutor_id": tutor_id}, {"_id": 0}).to_list(100)
-    return classes
+    return json_etag_response(request, classes)
 
 @api_router.post("/classes")
 async def add_class(class_range: str, subjects: List[str], current_user: dict = Depends(get_current_user)):
     if current_user['role'] != UserRole.TUTOR:
         raise HTTPException(status_code=403, detail="Only tutors can add classes")
     
+    bounds = parse_class_range(class_range)
+    if not bounds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Class range must be a class or range between {MIN_CLASS} and {MAX_CLASS}, e.g. 7 or 7-8"
+        )
+    
     class_taught = ClassTaught(
         tutor_id=current_user['id'],
-        class_range=class_range,
-        subjects=subjects
+        class_range=class_range.strip(),
+        subjects=subjects,
+        min_class=bounds[0],
+        max_class=bounds[1]
     )
     
     await db.classes_taught.insert_one(class_taught.model_dump())
+    await refresh_tutor_card(current_user['id'])
     return class_taught
 
 @api_router.delete("/classes/{class_id}")
@@ -864,63 +3283,181 @@ async def delete_class(class_id: str, current_user: dict = Depends(get_current_u
         raise HTTPException(status_code=403, detail="Only tutors can delete classes")
     
     await db.classes_taught.delete_one({"id": class_id, "tutor_id": current_user['id']})
+    await refresh_tutor_card(current_user['id'])
     return {"message": "Class deleted"}
 
 # Notification Routes
 @api_router.get("/notifications")
-async def get_notifications(current_user: dict = Depends(get_current_user)):
-    notifications = await db.notifications.find(
+async def get_notifications(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    return await paginate(
+        db.notifications,
         {"user_id": current_user['id']},
-        {"_id": 0}
-    ).sort("created_at", -1).to_list(100)
-    return notifications
+        [("created_at", -1), ("id", 1)],
+        limit,
+        cursor
+    )
+
+@api_router.post("/notifications/stream-token")
+async def create_stream_token(current_user: dict = Depends(get_current_user)):
+    token = create_access_token(
+        {"sub": current_user['id'], "scope": "stream"}, timedelta(seconds=STREAM_TOKEN_TTL)
+    )
+    return {"token": token, "expires_in": STREAM_TOKEN_TTL}
+
+@api_router.get("/notifications/stream")
+async def stream_notifications(current_user: dict = Depends(get_stream_user)):
+    user_id = current_user['id']
+    
+    async def events():
+        queue = notification_hub.subscribe(user_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        finally:
+            notification_hub.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class NotificationReadRequest(BaseModel):
+    ids: List[str]
+
+async def mark_notifications_read(user_id: str, ids: Optional[List[str]] = None) -> dict:
+    query = {"user_id": user_id, "read": False}
+    if ids is not None:
+        query["id"] = {"$in": ids}
+    result = await db.notifications.update_many(query, {"$set": {"read": True, "read_at": datetime.now(timezone.utc)}})
+    if result.modified_count:
+        count = await decrement_unread(user_id, result.modified_count)
+    else:
+        count = await get_unread_total(user_id)
+    return {"modified": result.modified_count, "count": count}
+
+async def get_unread_total(user_id: str) -> int:
+    counter = await db.notification_counters.find_one({"user_id": user_id}, {"_id": 0, "unread": 1, "seeded": 1})
+    if not unread_counter_usable(counter):
+        # No counter yet, one started by an increment, or a drifted one: seed it from the collection
+        return await seed_unread_counter(user_id)
+    return counter['unread']
+
+@api_router.put("/notifications/read")
+async def mark_notifications_read_bulk(request: NotificationReadRequest, current_user: dict = Depends(get_current_user)):
+    return await mark_notifications_read(current_user['id'], request.ids)
+
+@api_router.put("/notifications/read-all")
+async def mark_all_notifications_read(current_user: dict = Depends(get_current_user)):
+    return await mark_notifications_read(current_user['id'])
 
 @api_router.put("/notifications/{notification_id}/read")
 async def mark_notification_read(notification_id: str, current_user: dict = Depends(get_current_user)):
-    await db.notifications.update_one(
-        {"id": notification_id, "user_id": current_user['id']},
-        {"$set": {"read": True}}
+    result = await mark_notifications_read(current_user['id'], [notification_id])
+    return {"message": "Notification marked as read", "count": result['count']}
+
+@api_router.get("/notifications/archive")
+async def get_notification_archive(
+    limit: int = Query(12, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    # One item per archived month, newest first
+    page = await paginate(
+        db.notification_archives,
+        {"user_id": current_user['id']},
+        [("month", -1)],
+        limit,
+        cursor
     )
-    return {"message": "Notification marked as read"}
+    for archive in page['items']:
+        # Stored keyed by notification id; returned in the order they were sent
+        archive['items'] = sorted(archive.get('items', {}).values(), key=lambda item: item['created_at'])
+    return page
 
 @api_router.get("/notifications/unread/count")
 async def get_unread_count(current_user: dict = Depends(get_current_user)):
-    count = await db.notifications.count_documents({
-        "user_id": current_user['id'],
-        "read": False
-    })
-    return {"count": count}
+    return {"count": await get_unread_total(current_user['id'])}
 
 # Admin Routes
 @api_router.get("/admin/verifications")
-async def get_pending_verifications(current_user: dict = Depends(get_current_user)):
+async def get_pending_verifications(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    loaders: Loaders = Depends(get_loaders)
+):
     if current_user['role'] != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    profiles = await db.tutor_profiles.find(
+    page = await paginate(
+        db.tutor_profiles,
         {"verification_status": VerificationStatus.PENDING},
-        {"_id": 0}
-    ).to_list(1000)
+        [("user_id", 1)],
+        limit,
+        cursor
+    )
     
     # Get user info for each
-    for profile in profiles:
-        user = await db.users.find_one({"id": profile['user_id']}, {"_id": 0, "password_hash": 0})
+    users = await loaders.users.load_many([profile['user_id'] for profile in page['items']])
+    for profile, user in zip(page['items'], users):
         profile['user'] = user
     
-    return profiles
+    return page
+
+@api_router.get("/admin/verifications/{user_id}/proof")
+async def get_verification_proof(user_id: str, current_user: dict = Depends(get_current_user)):
+    if current_user['role'] != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    profile = await db.tutor_profiles.find_one({"user_id": user_id}, {"_id": 0, "verification_proof": 1})
+    value = (profile or {}).get('verification_proof')
+    media_hash = media_hash_of(value)
+    if media_hash:
+        media = await db.media.find_one({"hash": media_hash}, {"_id": 0, "content_type": 1})
+        data = await blob_store.get(media_hash) if media else None
+        content_type = media['content_type'] if media else None
+    elif value and value.startswith("data:"):
+        # Not yet moved by migrate-media
+        content_type, data = decode_data_url(value)
+    else:
+        data = None
+    if data is None or content_type not in MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Verification proof not found")
+    # Identity documents: never stored by browsers or shared caches
+    return Response(
+        content=data, media_type=content_type,
+        headers={"Cache-Control": "private, no-store", **MEDIA_SECURITY_HEADERS}
+    )
 
 @api_router.put("/admin/verifications/{user_id}/approve")
 async def approve_verification(user_id: str, current_user: dict = Depends(get_current_user)):
     if current_user['role'] != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    await db.tutor_profiles.update_one(
+    previous = await db.tutor_profiles.find_one_and_update(
         {"user_id": user_id},
         {"$set": {
             "is_verified": True,
             "verification_status": VerificationStatus.APPROVED
-        }}
+        }},
+        projection={"_id": 0, "verification_status": 1}
     )
+    if previous and previous.get('verification_status') == VerificationStatus.PENDING:
+        await bump_stats(pending_verifications=-1)
+    await refresh_tutor_card(user_id)
+    await invalidate_tutor_parent_snapshots(user_id)
     
     # Create notification for tutor
     notification = Notification(
@@ -930,7 +3467,7 @@ async def approve_verification(user_id: str, current_user: dict = Depends(get_cu
     )
     notif_dict = notification.model_dump()
     notif_dict['created_at'] = notif_dict['created_at'].isoformat()
-    await db.notifications.insert_one(notif_dict)
+    await notification_dispatcher.enqueue(notif_dict)
     
     return {"message": "Verification approved"}
 
@@ -939,10 +3476,15 @@ async def reject_verification(user_id: str, current_user: dict = Depends(get_cur
     if current_user['role'] != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    await db.tutor_profiles.update_one(
+    previous = await db.tutor_profiles.find_one_and_update(
         {"user_id": user_id},
-        {"$set": {"verification_status": VerificationStatus.REJECTED}}
+        {"$set": {"verification_status": VerificationStatus.REJECTED}},
+        projection={"_id": 0, "verification_status": 1}
     )
+    if previous and previous.get('verification_status') == VerificationStatus.PENDING:
+        await bump_stats(pending_verifications=-1)
+    await refresh_tutor_card(user_id)
+    await invalidate_tutor_parent_snapshots(user_id)
     
     # Create notification for tutor
     notification = Notification(
@@ -952,7 +3494,7 @@ async def reject_verification(user_id: str, current_user: dict = Depends(get_cur
     )
     notif_dict = notification.model_dump()
     notif_dict['created_at'] = notif_dict['created_at'].isoformat()
-    await db.notifications.insert_one(notif_dict)
+    await notification_dispatcher.enqueue(notif_dict)
     
     return {"message": "Verification rejected"}
 
@@ -961,14 +3503,51 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
     if current_user['role'] != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    # Tutors this user reviewed lose those reviews, so their cards need new rating totals
+    reviewed_tutor_ids = await db.reviews.distinct("tutor_id", {"student_id": user_id})
+    user_subscriptions = {"$or": [{"student_id": user_id}, {"tutor_id": user_id}]}
+    # Students of a deleted tutor must stop seeing them in the parent portal
+    taught_student_ids = await db.subscriptions.distinct(
+        "student_id", {"tutor_id": user_id, "status": SubscriptionStatus.ACTIVE}
+    )
+    
     # Delete user and related data
-    await db.users.delete_one({"id": user_id})
-    await db.tutor_profiles.delete_one({"user_id": user_id})
-    await db.subscriptions.delete_many({"$or": [{"student_id": user_id}, {"tutor_id": user_id}]})
+    user = await db.users.find_one_and_delete({"id": user_id}, projection={"_id": 0, "role": 1})
+    principal_cache.invalidate(user_id)
+    profile = await db.tutor_profiles.find_one_and_delete({"user_id": user_id}, projection={"_id": 0, "verification_status": 1})
+    await db.tutor_cards.delete_one({"user_id": user_id})
+    autocomplete_index.remove_tutor(user_id)
+    # Deleting the student profile retires the parent code along with the cached snapshot
+    student_profile = await db.student_profiles.find_one_and_delete(
+        {"user_id": user_id}, projection={"_id": 0, "parent_code": 1}
+    )
+    if student_profile:
+        parent_snapshot_cache.invalidate(student_profile['parent_code'])
+    active_subscriptions = await db.subscriptions.count_documents({**user_subscriptions, "status": SubscriptionStatus.ACTIVE})
+    await db.subscriptions.delete_many(user_subscriptions)
     await db.reviews.delete_many({"$or": [{"student_id": user_id}, {"tutor_id": user_id}]})
     await db.notifications.delete_many({"user_id": user_id})
+    await db.notification_counters.delete_one({"user_id": user_id})
+    await db.notification_archives.delete_many({"user_id": user_id})
     await db.classes_taught.delete_many({"tutor_id": user_id})
     
+    await recompute_rating_aggregates(reviewed_tutor_ids)
+    await asyncio.gather(*(refresh_tutor_card(tutor_id) for tutor_id in reviewed_tutor_ids))
+    if taught_student_ids:
+        await invalidate_parent_snapshots(taught_student_ids)
+    if profile:
+        top_tutors_ranking.mark_dirty()
+    
+    deltas = {"total_subscriptions": -active_subscriptions}
+    if user:
+        deltas["total_users"] = -1
+        role_field = role_stat_field(user['role'])
+        if role_field:
+            deltas[role_field] = -1
+    if profile and profile.get('verification_status') == VerificationStatus.PENDING:
+        deltas["pending_verifications"] = -1
+    await bump_stats(**deltas)
+    
     return {"message": "User deleted successfully"}
 
 @api_router.get("/admin/stats")
@@ -976,50 +3555,141 @@ async def get_admin_stats(current_user: dict = Depends(get_current_user)):
     if current_user['role'] != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    total_users = await db.users.count_documents({})
-    total_tutors = await db.users.count_documents({"role": UserRole.TUTOR})
-    total_students = await db.users.count_documents({"role": UserRole.STUDENT})
-    total_subscriptions = await db.subscriptions.count_documents({"status": SubscriptionStatus.ACTIVE})
-    pending_verifications = await db.tutor_profiles.count_documents({"verification_status": VerificationStatus.PENDING})
-    
-    # Get all active subscriptions with fee and attendance info
-    subscriptions = await db.subscriptions.find({"status": SubscriptionStatus.ACTIVE}, {"_id": 0}).to_list(1000)
-    subscription_details = []
-    
-    for sub in subscriptions:
-        student = await db.users.find_one({"id": sub['student_id']}, {"_id": 0, "password_hash": 0})
-        tutor = await db.users.find_one({"id": sub['tutor_id']}, {"_id": 0, "password_hash": 0})
-        fees = await db.fee_records.find({"subscription_id": sub['id']}, {"_id": 0}).to_list(100)
-        attendance = await db.attendance_records.find({"subscription_id": sub['id']}, {"_id": 0}).to_list(1000)
-        
-        subscription_details.append({
-            **sub,
-            "student": student,
-            "tutor": tutor,
-            "fees": fees,
-            "attendance": attendance
-        })
+    stats = await db.platform_stats.find_one({"_id": PLATFORM_STATS_ID}, {"_id": 0})
+    # bump_stats upserts, so a document can exist holding only the deltas since deploy
+    if stats is None or not stats.get('reconciled_at'):
+        stats = await reconcile_platform_stats()
+    
+    return {
+        **{field: stats.get(field, 0) for field in PLATFORM_STAT_FIELDS},
+        "reconciled_at": stats.get('reconciled_at')
+    }
+
+@api_router.get("/admin/subscriptions")
+async def get_admin_subscriptions(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user['role'] != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    public_user = [{"$project": {"_id": 0, "password_hash": 0}}]
+    fee_counts = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    page = await paginate(
+        db.subscriptions,
+        {"status": SubscriptionStatus.ACTIVE},
+        [("created_at", -1), ("id", 1)],
+        limit,
+        cursor,
+        pipeline=[
+            {"$project": {"_id": 0}},
+            {"$lookup": {"from": "users", "localField": "student_id", "foreignField": "id", "pipeline": public_user, "as": "student"}},
+            {"$lookup": {"from": "users", "localField": "tutor_id", "foreignField": "id", "pipeline": public_user, "as": "tutor"}},
+            {"$lookup": {"from": "fee_records", "localField": "id", "foreignField": "subscription_id", "pipeline": fee_counts, "as": "fee_counts"}},
+            {"$lookup": {"from": "attendance_buckets", "localField": "id", "foreignField": "subscription_id", "pipeline": ATTENDANCE_TOTALS, "as": "attendance_totals"}},
+            {"$set": {"student": {"$first": "$student"}, "tutor": {"$first": "$tutor"}}}
+        ]
+    )
+    
+    for sub in page['items']:
+        fees = {c['_id']: c['count'] for c in sub.pop('fee_counts')}
+        attendance = sub.pop('attendance_totals')
+        attendance = attendance[0] if attendance else {}
+        sub['fee_summary'] = {
+            "paid": fees.get(FeeStatus.PAID.value, 0),
+            "unpaid": fees.get(FeeStatus.UNPAID.value, 0)
+        }
+        sub['attendance_summary'] = attendance_summary(attendance.get('present', 0), attendance.get('absent', 0))
+    
+    return page
+
+@api_router.get("/admin/metrics")
+async def get_metrics(current_user: dict = Depends(get_current_user)):
+    if current_user['role'] != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
     
     return {
-        "total_users": total_users,
-        "total_tutors": total_tutors,
-        "total_students": total_students,
-        "total_subscriptions": total_subscriptions,
-        "pending_verifications": pending_verifications,
-        "subscription_details": subscription_details
+        "password_hashing": password_hasher.metrics(),
+        "principal_cache": principal_cache.metrics(),
+        "parent_snapshot_cache": parent_snapshot_cache.metrics(),
+        "tutor_facets_cache": tutor_facets_cache.metrics(),
+        "autocomplete": autocomplete_index.metrics(),
+        "top_tutors": top_tutors_ranking.metrics(),
+        "view_counters": view_counters.metrics(),
+        "notifications": notification_dispatcher.metrics(),
+        "notification_push": notification_hub.metrics()
     }
 
 @api_router.get("/admin/users")
-async def get_all_users(current_user: dict = Depends(get_current_user)):
+async def get_all_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     if current_user['role'] != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
-    return users
+    return await paginate(
+        db.users,
+        {},
+        [("created_at", -1), ("id", 1)],
+        limit,
+        cursor,
+        projection={"_id": 0, "password_hash": 0}
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    uncovered = uncovered_query_shapes()
+    if uncovered:
+        raise RuntimeError(f"Query shapes without a supporting index: {uncovered}")
+    if notification_archive_margin() <= 0:
+        raise RuntimeError(
+            "NOTIFICATION_ARCHIVE_AFTER_DAYS plus one NOTIFICATION_ARCHIVE_INTERVAL must stay below "
+            "NOTIFICATION_READ_RETENTION_DAYS, or read notifications expire before they are archived"
+        )
+    await ensure_indexes()
+    backfilled = await backfill_rating_aggregates()
+    if backfilled:
+        logger.info(f"Backfilled rating aggregates for {backfilled} tutors")
+    refreshed = await refresh_outdated_tutor_cards()
+    if refreshed:
+        logger.info(f"Rebuilt {refreshed} tutor cards missing newer fields")
+    # Counters are only deltas until the first reconcile, and the periodic one waits an interval
+    await reconcile_platform_stats()
+    await autocomplete_index.rebuild()
+    notification_dispatcher.start()
+    tasks = [
+        asyncio.create_task(run_periodically(AUTOCOMPLETE_REBUILD_INTERVAL, autocomplete_index.rebuild, "rebuild_autocomplete")),
+        asyncio.create_task(run_periodically(TOP_TUTORS_REFRESH_INTERVAL, top_tutors_ranking.refresh_if_stale, "refresh_top_tutors")),
+        asyncio.create_task(run_periodically(STATS_RECONCILE_INTERVAL, reconcile_platform_stats, "reconcile_platform_stats")),
+        asyncio.create_task(run_periodically(VIEW_FLUSH_INTERVAL, view_counters.flush, "flush_view_counters")),
+        asyncio.create_task(run_periodically(NOTIFICATION_ARCHIVE_INTERVAL, archive_notifications, "archive_notifications"))
+    ]
+    if NOTIFICATION_PUSH_SOURCE == "changestream":
+        tasks.append(asyncio.create_task(watch_notification_inserts()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        await view_counters.flush()
+    except Exception:
+        logger.exception("Final view counter flush failed")
+    await notification_dispatcher.stop()
+    password_hasher.shutdown()
+    shutdown_thumbnail_pool()
+    client.close()
+
+# Create the main app
+app = FastAPI(lifespan=lifespan)
 
 # Include router
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -1033,7 +3703,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
@@ -0,0 +1,28 @@
+import io
+
+# Kept out of server.py so process-pool workers import only Pillow, not the app
+from PIL import Image, ImageOps, features
+
+WEBP_SUPPORTED = features.check("webp")
+
+def render_thumbnails(data: bytes, sizes: dict) -> dict:
+    # {name: (px, square)} -> {name: (content_type, bytes)}; WebP when Pillow has it, else JPEG
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if WEBP_SUPPORTED else "RGB")
+
+        variants = {}
+        for name, (px, square) in sizes.items():
+            if square:
+                thumb = ImageOps.fit(image, (px, px), Image.LANCZOS)
+            else:
+                thumb = image.copy()
+                thumb.thumbnail((px, px), Image.LANCZOS)
+            out = io.BytesIO()
+            if WEBP_SUPPORTED:
+                thumb.save(out, "WEBP", quality=80, method=4)
+                variants[name] = ("image/webp", out.getvalue())
+            else:
+                thumb.save(out, "JPEG", quality=82, optimize=True, progressive=True)
+                variants[name] = ("image/jpeg", out.getvalue())
+        return variants
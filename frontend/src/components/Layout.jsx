@@ -3,20 +3,59 @@ import { Link, useLocation } from 'react-router-dom';
 import axios from 'axios';
 import { Home, Search, HelpCircle, Settings, Bell } from 'lucide-react';
 import { Badge } from './ui/badge';
+import { UNREAD_COUNT_EVENT } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const STREAM_RETRY_MS = 5000;
 
 export default function Layout({ children, user, showBottomNav = true }) {
   const location = useLocation();
   const [unreadCount, setUnreadCount] = useState(0);
 
   useEffect(() => {
-    if (user) {
-      fetchUnreadCount();
-      const interval = setInterval(fetchUnreadCount, 10000); // Poll every 10s
-      return () => clearInterval(interval);
-    }
+    if (!user) return undefined;
+    let source = null;
+    let retry = null;
+    let closed = false;
+
+    // New notifications are pushed over SSE instead of polling. EventSource cannot send
+    // headers, so each connection uses a short-lived stream token in its URL; the
+    // browser's own retry would reuse an expired one, so errors reconnect with a fresh
+    // token and refetch the count to cover anything missed while disconnected.
+    const connect = async () => {
+      try {
+        const response = await axios.post(`${API}/notifications/stream-token`);
+        if (closed) return;
+        source = new EventSource(`${API}/notifications/stream?token=${encodeURIComponent(response.data.token)}`);
+        source.addEventListener('notification', () => setUnreadCount((count) => count + 1));
+        source.onerror = () => {
+          source.close();
+          scheduleReconnect();
+        };
+      } catch (error) {
+        console.error('Error opening notification stream:', error);
+        scheduleReconnect();
+      }
+    };
+    const scheduleReconnect = () => {
+      if (closed) return;
+      retry = setTimeout(() => {
+        fetchUnreadCount();
+        connect();
+      }, STREAM_RETRY_MS);
+    };
+    const onUnreadCount = (event) => setUnreadCount(event.detail);
+
+    fetchUnreadCount();
+    connect();
+    window.addEventListener(UNREAD_COUNT_EVENT, onUnreadCount);
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      if (source) source.close();
+      window.removeEventListener(UNREAD_COUNT_EVENT, onUnreadCount);
+    };
   }, [user]);
 
   const fetchUnreadCount = async () => {
@@ -1,6 +1,49 @@
+import axios from "axios";
 import { clsx } from "clsx";
 import { twMerge } from "tailwind-merge"
 
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+// Follow next_cursor until a paginated list endpoint is exhausted
+export async function fetchAllPages(url, params = {}) {
+  const items = [];
+  let cursor;
+  do {
+    const response = await axios.get(url, { params: { ...params, cursor } });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor || undefined;
+  } while (cursor);
+  return items;
+}
+
+// Expand monthly attendance buckets into per-day records, oldest first
+export function flattenAttendance(buckets) {
+  return buckets
+    .flatMap(bucket => Object.entries(bucket.days || {}).map(([day, status]) => ({
+      id: `${bucket.subscription_id}-${bucket.month}-${day}`,
+      date: `${bucket.month}-${day}`,
+      status
+    })))
+    .sort((a, b) => a.date.localeCompare(b.date));
+}
+
+// Stored media references are paths on the backend ("/api/media/<hash>"), which may
+// not share the frontend's origin; data URLs and absolute URLs pass through
+export function mediaSrc(url) {
+  return url && url.startsWith('/') ? `${process.env.REACT_APP_BACKEND_URL}${url}` : url;
+}
+
+// Smallest stored variant of a user's profile picture, falling back to the original
+export function avatarSrc(user) {
+  return mediaSrc(user?.profile_picture_variants?.avatar || user?.profile_picture);
+}
+
+// Pages that mark notifications read announce the server's new unread count so the
+// layout's badge follows without refetching
+export const UNREAD_COUNT_EVENT = 'notifications:unread-count';
+
+export function announceUnreadCount(count) {
+  window.dispatchEvent(new CustomEvent(UNREAD_COUNT_EVENT, { detail: count }));
+}
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { fetchAllPages, avatarSrc } from '../lib/utils';
 import { toast } from 'sonner';
 import Layout from '../components/Layout';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
@@ -13,10 +14,34 @@ import { Users, GraduationCap, BookOpen, AlertCircle } from 'lucide-react';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Proofs are identity documents served only to admins, so they are fetched with the
+// auth header and shown from an object URL rather than linked directly
+function ProofImage({ userId }) {
+  const [src, setSrc] = useState(null);
+
+  useEffect(() => {
+    let objectUrl;
+    axios.get(`${API}/admin/verifications/${userId}/proof`, { responseType: 'blob' })
+      .then(response => {
+        objectUrl = URL.createObjectURL(response.data);
+        setSrc(objectUrl);
+      })
+      .catch(() => setSrc(null));
+    return () => {
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [userId]);
+
+  if (!src) return <p className="text-sm text-gray-500">Proof unavailable</p>;
+  return <img src={src} alt="Proof" className="w-32 h-32 object-cover rounded-lg border" />;
+}
+
 export default function AdminDashboard({ user, logout }) {
   const [stats, setStats] = useState(null);
   const [verifications, setVerifications] = useState([]);
   const [users, setUsers] = useState([]);
+  const [subscriptionDetails, setSubscriptionDetails] = useState([]);
+  const [subscriptionsCursor, setSubscriptionsCursor] = useState(null);
 
   useEffect(() => {
     fetchData();
@@ -24,19 +49,32 @@ export default function AdminDashboard({ user, logout }) {
 
   const fetchData = async () => {
     try {
-      const [statsRes, verificationsRes, usersRes] = await Promise.all([
+      const [statsRes, verifications, users, subscriptionsRes] = await Promise.all([
         axios.get(`${API}/admin/stats`),
-        axios.get(`${API}/admin/verifications`),
-        axios.get(`${API}/admin/users`)
+        fetchAllPages(`${API}/admin/verifications`),
+        fetchAllPages(`${API}/admin/users`),
+        axios.get(`${API}/admin/subscriptions`)
       ]);
       setStats(statsRes.data);
-      setVerifications(verificationsRes.data);
-      setUsers(usersRes.data);
+      setVerifications(verifications);
+      setUsers(users);
+      setSubscriptionDetails(subscriptionsRes.data.items);
+      setSubscriptionsCursor(subscriptionsRes.data.next_cursor);
     } catch (error) {
       toast.error('Error fetching data');
     }
   };
 
+  const loadMoreSubscriptions = async () => {
+    try {
+      const response = await axios.get(`${API}/admin/subscriptions`, { params: { cursor: subscriptionsCursor } });
+      setSubscriptionDetails([...subscriptionDetails, ...response.data.items]);
+      setSubscriptionsCursor(response.data.next_cursor);
+    } catch (error) {
+      toast.error('Error fetching subscriptions');
+    }
+  };
+
   const handleApproveVerification = async (userId) => {
     try {
       await axios.put(`${API}/admin/verifications/${userId}/approve`);
@@ -145,7 +183,7 @@ export default function AdminDashboard({ user, logout }) {
                         <div className="flex items-start justify-between">
                           <div className="flex items-center space-x-4">
                             <Avatar>
-                              <AvatarImage src={verification.user?.profile_picture} />
+                              <AvatarImage src={avatarSrc(verification.user)} />
                               <AvatarFallback>{verification.user?.name[0]}</AvatarFallback>
                             </Avatar>
                             <div>
@@ -174,11 +212,7 @@ export default function AdminDashboard({ user, logout }) {
                         {verification.verification_proof && (
                           <div className="mt-4">
                             <p className="text-sm font-medium mb-2">Payment Proof:</p>
-                            <img
-                              src={verification.verification_proof}
-                              alt="Proof"
-                              className="w-32 h-32 object-cover rounded-lg border"
-                            />
+                            <ProofImage userId={verification.user_id} />
                           </div>
                         )}
                       </div>
@@ -202,7 +236,7 @@ export default function AdminDashboard({ user, logout }) {
                     <div key={u.id} className="flex items-center justify-between p-4 bg-gray-50 rounded-lg" data-testid={`user-${u.id}`}>
                       <div className="flex items-center space-x-4">
                         <Avatar>
-                          <AvatarImage src={u.profile_picture} />
+                          <AvatarImage src={avatarSrc(u)} />
                           <AvatarFallback>{u.name[0]}</AvatarFallback>
                         </Avatar>
                         <div>
@@ -245,9 +279,9 @@ export default function AdminDashboard({ user, logout }) {
                 <CardTitle>Active Subscriptions</CardTitle>
               </CardHeader>
               <CardContent>
-                {stats.subscription_details.length > 0 ? (
+                {subscriptionDetails.length > 0 ? (
                   <div className="space-y-4">
-                    {stats.subscription_details.map((sub) => (
+                    {subscriptionDetails.map((sub) => (
                       <div key={sub.id} className="p-4 bg-gray-50 rounded-lg" data-testid={`admin-subscription-${sub.id}`}>
                         <div className="flex items-center justify-between mb-3">
                           <div className="flex items-center space-x-4">
@@ -262,20 +296,25 @@ export default function AdminDashboard({ user, logout }) {
                           <div>
                             <p className="text-gray-600">Fees Status:</p>
                             <p className="font-medium">
-                              {sub.fees.filter(f => f.status === 'paid').length} paid /{' '}
-                              {sub.fees.filter(f => f.status === 'unpaid').length} unpaid
+                              {sub.fee_summary.paid} paid /{' '}
+                              {sub.fee_summary.unpaid} unpaid
                             </p>
                           </div>
                           <div>
                             <p className="text-gray-600">Attendance:</p>
                             <p className="font-medium">
-                              {sub.attendance.filter(a => a.status === 'present').length} present /{' '}
-                              {sub.attendance.filter(a => a.status === 'absent').length} absent
+                              {sub.attendance_summary.present} present /{' '}
+                              {sub.attendance_summary.absent} absent
                             </p>
                           </div>
                         </div>
                       </div>
                     ))}
+                    {subscriptionsCursor && (
+                      <Button variant="outline" className="w-full" onClick={loadMoreSubscriptions}>
+                        Load more
+                      </Button>
+                    )}
                   </div>
                 ) : (
                   <p className="text-gray-600 text-center py-8">No active subscriptions</p>
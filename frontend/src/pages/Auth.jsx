@@ -226,7 +226,7 @@ export default function Auth({ setUser }) {
                     <input
                       id="profile-upload"
                       type="file"
-                      accept="image/*"
+                      accept="image/png,image/jpeg,image/webp,image/gif"
                       className="hidden"
                       data-testid="profile-upload-input"
                       onChange={(e) => handleImageUpload(e, 'register')}
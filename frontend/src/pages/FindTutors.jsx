@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
-import { Link } from 'react-router-dom';
+import { Link, useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { avatarSrc } from '../lib/utils';
 import Layout from '../components/Layout';
 import { Card, CardContent } from '../components/ui/card';
 import { Input } from '../components/ui/input';
@@ -12,30 +13,121 @@ import { Search, CheckCircle, Star } from 'lucide-react';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+const BOARDS = ['CBSE', 'ICSE', 'STATE BOARD', 'NIOS'];
+const SORTS = [
+  { value: 'default', label: 'Default' },
+  { value: 'rating', label: 'Top rated' },
+  { value: 'fee', label: 'Lowest fee' },
+  { value: 'reach', label: 'Most viewed' }
+];
+const EMPTY_FILTERS = { boards: [], minFee: '', maxFee: '', classLevel: '', verifiedOnly: false, sort: 'default' };
+
 export default function FindTutors({ user, logout }) {
   const [tutors, setTutors] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const [subject, setSubject] = useState('');
+  const [filters, setFilters] = useState(EMPTY_FILTERS);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [facets, setFacets] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [suggestions, setSuggestions] = useState([]);
+  const navigate = useNavigate();
+
+  useEffect(() => {
+    // Debounced so typing a fee or class does not fire a request per keystroke
+    const timer = setTimeout(() => {
+      fetchTutors();
+      fetchFacets();
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [subject, filters]);
 
   useEffect(() => {
-    fetchTutors();
-  }, []);
+    const term = searchTerm.trim();
+    if (!term || term === subject) {
+      setSuggestions([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API}/tutors/autocomplete`, { params: { q: term, limit: 8 } });
+        setSuggestions(response.data.suggestions);
+      } catch (error) {
+        setSuggestions([]);
+      }
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [searchTerm, subject]);
+
+  const pickSuggestion = (suggestion) => {
+    setSuggestions([]);
+    if (suggestion.type === 'tutor') {
+      navigate(`/tutor/${suggestion.id}`);
+      return;
+    }
+    setSearchTerm(suggestion.label);
+    setSubject(suggestion.label);
+  };
+
+  // Filters run on the server; repeated params (boards=A&boards=B) need URLSearchParams
+  const buildParams = (cursor) => {
+    const params = new URLSearchParams();
+    if (subject) params.append('subject', subject);
+    filters.boards.forEach(board => params.append('boards', board));
+    if (filters.minFee !== '') params.append('min_fee', filters.minFee);
+    if (filters.maxFee !== '') params.append('max_fee', filters.maxFee);
+    if (filters.classLevel !== '') params.append('class_level', filters.classLevel);
+    if (filters.verifiedOnly) params.append('verified_only', 'true');
+    params.append('sort', filters.sort);
+    if (cursor) params.append('cursor', cursor);
+    return params;
+  };
 
-  const fetchTutors = async (subject = '') => {
-    setLoading(true);
+  const fetchTutors = async (cursor = null) => {
+    if (!cursor) setLoading(true);
     try {
-      const url = subject ? `${API}/tutors?subject=${encodeURIComponent(subject)}` : `${API}/tutors`;
-      const response = await axios.get(url);
-      setTutors(response.data);
+      const response = await axios.get(`${API}/tutors`, { params: buildParams(cursor) });
+      setTutors(prev => (cursor ? [...prev, ...response.data.items] : response.data.items));
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error fetching tutors:', error);
     }
     setLoading(false);
   };
 
+  const fetchFacets = async () => {
+    try {
+      const params = buildParams();
+      params.delete('sort');
+      const response = await axios.get(`${API}/tutors/facets`, { params });
+      setFacets(response.data);
+    } catch (error) {
+      console.error('Error fetching filter counts:', error);
+    }
+  };
+
+  const facetCount = (facet, value) => facets?.[facet]?.find(f => f.value === value)?.count ?? 0;
+
   const handleSearch = (e) => {
     e.preventDefault();
-    fetchTutors(searchTerm);
+    setSuggestions([]);
+    setSubject(searchTerm.trim());
+  };
+
+  const updateFilter = (key, value) => {
+    setFilters(prev => ({ ...prev, [key]: value }));
+  };
+
+  const toggleBoard = (board) => {
+    updateFilter('boards', filters.boards.includes(board)
+      ? filters.boards.filter(b => b !== board)
+      : [...filters.boards, board]);
+  };
+
+  const clearAll = () => {
+    setSearchTerm('');
+    setSubject('');
+    setFilters(EMPTY_FILTERS);
   };
 
   return (
@@ -54,9 +146,107 @@ export default function FindTutors({ user, logout }) {
                 className="pl-10"
                 data-testid="search-input"
               />
+              {suggestions.length > 0 && (
+                <div className="absolute z-10 mt-1 w-full bg-white border rounded-md shadow-lg" data-testid="search-suggestions">
+                  {suggestions.map(suggestion => (
+                    <button
+                      key={`${suggestion.type}-${suggestion.id || suggestion.label}`}
+                      type="button"
+                      className="w-full flex justify-between px-3 py-2 text-left text-sm hover:bg-gray-100"
+                      onClick={() => pickSuggestion(suggestion)}
+                    >
+                      <span>{suggestion.label}</span>
+                      <span className="text-gray-400">
+                        {suggestion.type === 'tutor' ? 'Tutor' : `${suggestion.tutor_count} tutors`}
+                      </span>
+                    </button>
+                  ))}
+                </div>
+              )}
             </div>
             <Button type="submit" data-testid="search-btn">Search</Button>
           </form>
+          <div className="mt-4 space-y-3" data-testid="tutor-filters">
+            {!subject && facets?.subjects.length > 0 && (
+              <div className="flex flex-wrap gap-1" data-testid="subject-facets">
+                {facets.subjects.slice(0, 12).map(facet => (
+                  <Badge
+                    key={facet.value}
+                    variant="secondary"
+                    className="cursor-pointer"
+                    onClick={() => { setSearchTerm(facet.value); setSubject(facet.value); }}
+                  >
+                    {facet.value} ({facet.count})
+                  </Badge>
+                ))}
+              </div>
+            )}
+            <div className="flex flex-wrap items-center gap-2">
+              {BOARDS.map(board => (
+                <Button
+                  key={board}
+                  type="button"
+                  size="sm"
+                  variant={filters.boards.includes(board) ? 'default' : 'outline'}
+                  onClick={() => toggleBoard(board)}
+                  data-testid={`filter-board-${board.toLowerCase().replace(' ', '-')}-btn`}
+                >
+                  {board}{facets && ` (${facetCount('boards', board)})`}
+                </Button>
+              ))}
+              <Button
+                type="button"
+                size="sm"
+                variant={filters.verifiedOnly ? 'default' : 'outline'}
+                onClick={() => updateFilter('verifiedOnly', !filters.verifiedOnly)}
+                data-testid="filter-verified-btn"
+              >
+                <CheckCircle className="w-4 h-4 mr-1" /> Verified only{facets && ` (${facets.verified.true})`}
+              </Button>
+            </div>
+            <div className="flex flex-wrap items-center gap-2">
+              <Input
+                type="number"
+                min="0"
+                placeholder="Min fee"
+                value={filters.minFee}
+                onChange={(e) => updateFilter('minFee', e.target.value)}
+                className="w-28"
+                data-testid="filter-min-fee-input"
+              />
+              <Input
+                type="number"
+                min="0"
+                placeholder="Max fee"
+                value={filters.maxFee}
+                onChange={(e) => updateFilter('maxFee', e.target.value)}
+                className="w-28"
+                data-testid="filter-max-fee-input"
+              />
+              <Input
+                type="number"
+                min="1"
+                max="12"
+                placeholder="Class"
+                value={filters.classLevel}
+                onChange={(e) => updateFilter('classLevel', e.target.value)}
+                className="w-24"
+                data-testid="filter-class-input"
+              />
+              {SORTS.map(option => (
+                <Button
+                  key={option.value}
+                  type="button"
+                  size="sm"
+                  variant={filters.sort === option.value ? 'secondary' : 'ghost'}
+                  onClick={() => updateFilter('sort', option.value)}
+                  data-testid={`sort-${option.value}-btn`}
+                >
+                  {option.label}
+                </Button>
+              ))}
+            </div>
+          </div>
         </div>
 
         {loading ? (
@@ -71,7 +261,7 @@ export default function FindTutors({ user, logout }) {
                   <CardContent className="pt-6">
                     <div className="flex items-start space-x-4">
                       <Avatar className="h-16 w-16">
-                        <AvatarImage src={tutor.user?.profile_picture} />
+                        <AvatarImage src={avatarSrc(tutor.user)} />
                         <AvatarFallback>{tutor.user?.name[0]}</AvatarFallback>
                       </Avatar>
                       <div className="flex-1">
@@ -85,7 +275,7 @@ export default function FindTutors({ user, logout }) {
                           <div className="flex items-center space-x-1 mb-2">
                             <Star className="w-4 h-4 fill-yellow-400 text-yellow-400" />
                             <span className="text-sm font-medium">{tutor.avg_rating.toFixed(1)}</span>
-                            <span className="text-sm text-gray-600">({tutor.reviews.length} reviews)</span>
+                            <span className="text-sm text-gray-600">({tutor.review_count} reviews)</span>
                           </div>
                         )}
                         <div className="flex flex-wrap gap-1 mb-3">
@@ -121,13 +311,20 @@ export default function FindTutors({ user, logout }) {
         ) : (
           <div className="text-center py-12">
             <p className="text-gray-600 text-lg">No tutors found</p>
-            {searchTerm && (
-              <Button onClick={() => { setSearchTerm(''); fetchTutors(); }} className="mt-4" data-testid="clear-search-btn">
+            {(subject || filters !== EMPTY_FILTERS) && (
+              <Button onClick={clearAll} className="mt-4" data-testid="clear-search-btn">
                 Clear Search
               </Button>
             )}
           </div>
         )}
+        {!loading && nextCursor && (
+          <div className="text-center mt-8">
+            <Button variant="outline" onClick={() => fetchTutors(nextCursor)} data-testid="load-more-tutors-btn">
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
     </Layout>
   );
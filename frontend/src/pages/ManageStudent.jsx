@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useParams, Link, useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages, flattenAttendance, avatarSrc } from '../lib/utils';
 import { toast } from 'sonner';
 import Layout from '../components/Layout';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
@@ -37,13 +38,13 @@ export default function ManageStudent({ user, logout }) {
 
   const fetchData = async () => {
     try {
-      const [subsRes, feesRes, attendanceRes] = await Promise.all([
-        axios.get(`${API}/subscriptions/my`),
-        axios.get(`${API}/fees/${subscriptionId}`),
-        axios.get(`${API}/attendance/${subscriptionId}`)
+      const [subs, fees, attendance] = await Promise.all([
+        fetchAllPages(`${API}/subscriptions/my`),
+        fetchAllPages(`${API}/fees/${subscriptionId}`),
+        fetchAllPages(`${API}/attendance/${subscriptionId}`).then(flattenAttendance)
       ]);
       
-      const sub = subsRes.data.find(s => s.id === subscriptionId);
+      const sub = subs.find(s => s.id === subscriptionId);
       if (!sub || sub.tutor_id !== user.id) {
         toast.error('Subscription not found');
         navigate('/dashboard');
@@ -51,8 +52,8 @@ export default function ManageStudent({ user, logout }) {
       }
       
       setSubscription(sub);
-      setFees(feesRes.data);
-      setAttendance(attendanceRes.data);
+      setFees(fees);
+      setAttendance(attendance);
     } catch (error) {
       toast.error('Error fetching data');
     }
@@ -115,7 +116,7 @@ export default function ManageStudent({ user, logout }) {
           <CardContent>
             <div className="flex items-center space-x-4">
               <Avatar className="h-16 w-16">
-                <AvatarImage src={subscription.student?.profile_picture} />
+                <AvatarImage src={avatarSrc(subscription.student)} />
                 <AvatarFallback>{subscription.student?.name[0]}</AvatarFallback>
               </Avatar>
               <div>
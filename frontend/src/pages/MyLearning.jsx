@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import axios from 'axios';
+import { fetchAllPages, flattenAttendance, avatarSrc } from '../lib/utils';
 import Layout from '../components/Layout';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Avatar, AvatarFallback, AvatarImage } from '../components/ui/avatar';
@@ -21,20 +21,20 @@ export default function MyLearning({ user, logout }) {
 
   const fetchData = async () => {
     try {
-      const subsRes = await axios.get(`${API}/subscriptions/my`);
-      const activeSubs = subsRes.data.filter(s => s.status === 'active');
+      const subs = await fetchAllPages(`${API}/subscriptions/my`);
+      const activeSubs = subs.filter(s => s.status === 'active');
       
       // Fetch fees and attendance for each subscription
       const subsWithData = await Promise.all(
         activeSubs.map(async (sub) => {
-          const [feesRes, attendanceRes] = await Promise.all([
-            axios.get(`${API}/fees/${sub.id}`),
-            axios.get(`${API}/attendance/${sub.id}`)
+          const [fees, attendance] = await Promise.all([
+            fetchAllPages(`${API}/fees/${sub.id}`),
+            fetchAllPages(`${API}/attendance/${sub.id}`).then(flattenAttendance)
           ]);
           return {
             ...sub,
-            fees: feesRes.data,
-            attendance: attendanceRes.data
+            fees,
+            attendance
           };
         })
       );
@@ -73,7 +73,7 @@ export default function MyLearning({ user, logout }) {
                 <CardHeader>
                   <div className="flex items-center space-x-4">
                     <Avatar className="h-16 w-16">
-                      <AvatarImage src={sub.tutor?.profile_picture} />
+                      <AvatarImage src={avatarSrc(sub.tutor)} />
                       <AvatarFallback>{sub.tutor?.name[0]}</AvatarFallback>
                     </Avatar>
                     <div>
@@ -7,6 +7,7 @@ import { Badge } from '../components/ui/badge';
 import { Button } from '../components/ui/button';
 import { ArrowLeft, Bell, BellOff } from 'lucide-react';
 import { formatDistanceToNow } from 'date-fns';
+import { announceUnreadCount } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -22,7 +23,7 @@ export default function Notifications({ user, logout }) {
   const fetchNotifications = async () => {
     try {
       const response = await axios.get(`${API}/notifications`);
-      setNotifications(response.data);
+      setNotifications(response.data.items);
     } catch (error) {
       console.error('Error fetching notifications:', error);
     }
@@ -31,7 +32,8 @@ export default function Notifications({ user, logout }) {
 
   const markAsRead = async (id) => {
     try {
-      await axios.put(`${API}/notifications/${id}/read`);
+      const response = await axios.put(`${API}/notifications/${id}/read`);
+      announceUnreadCount(response.data.count);
       setNotifications(notifications.map(n => 
         n.id === id ? { ...n, read: true } : n
       ));
@@ -40,6 +42,16 @@ export default function Notifications({ user, logout }) {
     }
   };
 
+  const markAllAsRead = async () => {
+    try {
+      const response = await axios.put(`${API}/notifications/read-all`);
+      announceUnreadCount(response.data.count);
+      setNotifications(notifications.map(n => ({ ...n, read: true })));
+    } catch (error) {
+      console.error('Error marking notifications as read:', error);
+    }
+  };
+
   const getNotificationIcon = (type) => {
     switch (type) {
       case 'subscription_request':
@@ -72,9 +84,14 @@ export default function Notifications({ user, logout }) {
                 <span>Notifications</span>
               </CardTitle>
               {notifications.filter(n => !n.read).length > 0 && (
-                <Badge data-testid="unread-count">
-                  {notifications.filter(n => !n.read).length} unread
-                </Badge>
+                <div className="flex items-center space-x-2">
+                  <Badge data-testid="unread-count">
+                    {notifications.filter(n => !n.read).length} unread
+                  </Badge>
+                  <Button variant="outline" size="sm" onClick={markAllAsRead} data-testid="mark-all-read">
+                    Mark all as read
+                  </Button>
+                </div>
               )}
             </div>
           </CardHeader>
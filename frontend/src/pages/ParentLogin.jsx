@@ -176,10 +176,15 @@ function ParentDashboard({ data, onLogout }) {
                         <span className="text-blue-600 mr-2">📅</span>
                         Attendance
                       </h4>
+                      {sub.attendance_summary?.total > 0 && (
+                        <p className="text-sm text-gray-600 mb-3">
+                          {sub.attendance_summary.percentage}% present ({sub.attendance_summary.present}/{sub.attendance_summary.total} classes)
+                        </p>
+                      )}
                       {sub.attendance && sub.attendance.length > 0 ? (
                         <div className="space-y-2 max-h-64 overflow-y-auto">
                           {sub.attendance.slice(-10).reverse().map((att) => (
-                            <div key={att.id} className="flex items-center justify-between p-2 bg-gray-50 rounded">
+                            <div key={att.date} className="flex items-center justify-between p-2 bg-gray-50 rounded">
                               <span className="text-sm font-medium">
                                 {new Date(att.date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' })}
                               </span>
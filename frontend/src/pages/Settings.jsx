@@ -1,6 +1,7 @@
 import { Link } from 'react-router-dom';
 import { useNavigate } from 'react-router-dom';
 import Layout from '../components/Layout';
+import { mediaSrc } from '../lib/utils';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Avatar, AvatarFallback, AvatarImage } from '../components/ui/avatar';
@@ -36,7 +37,7 @@ export default function Settings({ user, logout }) {
           <CardContent>
             <div className="flex items-center space-x-4">
               <Avatar className="h-16 w-16">
-                <AvatarImage src={user.profile_picture} />
+                <AvatarImage src={mediaSrc(user.profile_picture)} />
                 <AvatarFallback className="text-xl">{user.name[0]}</AvatarFallback>
               </Avatar>
               <div>
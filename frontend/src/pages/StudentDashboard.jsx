@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages, avatarSrc, mediaSrc } from '../lib/utils';
 import { toast } from 'sonner';
 import Layout from '../components/Layout';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
@@ -36,8 +37,7 @@ export default function StudentDashboard({ user, logout }) {
 
   const fetchSubscriptions = async () => {
     try {
-      const response = await axios.get(`${API}/subscriptions/my`);
-      setSubscriptions(response.data);
+      setSubscriptions(await fetchAllPages(`${API}/subscriptions/my`));
     } catch (error) {
       console.error('Error fetching subscriptions:', error);
     }
@@ -145,7 +145,7 @@ export default function StudentDashboard({ user, logout }) {
                   <Card className="overflow-hidden hover:shadow-2xl transition-all cursor-pointer group">
                     <div className="relative h-40 md:h-48">
                       <img 
-                        src={banner.banner} 
+                        src={mediaSrc(banner.banner)} 
                         alt={`${banner.tutor_name}'s Banner`}
                         className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
                       />
@@ -169,7 +169,7 @@ export default function StudentDashboard({ user, logout }) {
         <div className="flex flex-col sm:flex-row items-center sm:justify-between gap-4 mb-6 md:mb-8">
           <div className="flex items-center space-x-3 md:space-x-4">
             <Avatar className="h-12 w-12 md:h-16 md:w-16">
-              <AvatarImage src={user.profile_picture} />
+              <AvatarImage src={mediaSrc(user.profile_picture)} />
               <AvatarFallback>{user.name[0]}</AvatarFallback>
             </Avatar>
             <div>
@@ -191,7 +191,7 @@ export default function StudentDashboard({ user, logout }) {
                   <p className="text-sm text-gray-600 mb-3">Upload your photo</p>
                   <div className="flex flex-col md:flex-row items-center space-y-4 md:space-y-0 md:space-x-4">
                     <Avatar className="h-24 w-24">
-                      <AvatarImage src={formData.profile_picture} />
+                      <AvatarImage src={mediaSrc(formData.profile_picture)} />
                       <AvatarFallback className="text-2xl">{user.name[0]}</AvatarFallback>
                     </Avatar>
                     <div className="flex-1 w-full">
@@ -207,7 +207,7 @@ export default function StudentDashboard({ user, logout }) {
                       <input
                         id="student-profile-picture"
                         type="file"
-                        accept="image/*"
+                        accept="image/png,image/jpeg,image/webp,image/gif"
                         className="hidden"
                         data-testid="student-profile-picture-input"
                         onChange={handleImageUpload}
@@ -329,7 +329,7 @@ export default function StudentDashboard({ user, logout }) {
                   <div key={sub.id} className="flex flex-col sm:flex-row items-start sm:items-center justify-between p-3 md:p-4 bg-gray-50 rounded-lg gap-3" data-testid={`subscription-${sub.id}`}>
                     <div className="flex items-center space-x-3 md:space-x-4 flex-1">
                       <Avatar className="h-12 w-12 md:h-auto md:w-auto">
-                        <AvatarImage src={sub.tutor?.profile_picture} />
+                        <AvatarImage src={avatarSrc(sub.tutor)} />
                         <AvatarFallback>{sub.tutor?.name[0]}</AvatarFallback>
                       </Avatar>
                       <div className="flex-1 min-w-0">
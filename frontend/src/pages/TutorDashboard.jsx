@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages, avatarSrc, mediaSrc } from '../lib/utils';
 import { toast } from 'sonner';
 import Layout from '../components/Layout';
 import { Button } from '../components/ui/button';
@@ -15,6 +16,8 @@ import { Users, TrendingUp, Clock, DollarSign, Upload, CheckCircle, X, Award } f
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+// Matches the server's MAX_PAGE_SIZE cap on bulk items
+const BULK_BATCH_SIZE = 200;
 
 export default function TutorDashboard({ user, logout }) {
   const [stats, setStats] = useState(null);
@@ -46,14 +49,14 @@ export default function TutorDashboard({ user, logout }) {
 
   const fetchData = async () => {
     try {
-      const [statsRes, subsRes, profileRes, classesRes] = await Promise.all([
+      const [statsRes, subs, profileRes, classesRes] = await Promise.all([
         axios.get(`${API}/tutors/stats/me`),
-        axios.get(`${API}/subscriptions/my`),
+        fetchAllPages(`${API}/subscriptions/my`),
         axios.get(`${API}/tutors/${user.id}`),
         axios.get(`${API}/classes/${user.id}`)
       ]);
       setStats(statsRes.data);
-      setSubscriptions(subsRes.data);
+      setSubscriptions(subs);
       setProfile(profileRes.data);
       setClasses(classesRes.data);
       
@@ -130,22 +133,49 @@ export default function TutorDashboard({ user, logout }) {
     }
   };
 
+  const handleBulkFees = async (status) => {
+    const active = subscriptions.filter(sub => sub.status === 'active');
+    if (active.length === 0) {
+      toast.error('No active students');
+      return;
+    }
+    const now = new Date();
+    try {
+      // The API takes at most BULK_BATCH_SIZE items per request
+      let updated = 0;
+      for (let i = 0; i < active.length; i += BULK_BATCH_SIZE) {
+        const res = await axios.put(`${API}/fees/bulk`, {
+          month: now.getMonth() + 1,
+          year: now.getFullYear(),
+          items: active.slice(i, i + BULK_BATCH_SIZE).map(sub => ({ subscription_id: sub.id, status }))
+        });
+        updated += res.data.updated;
+      }
+      toast.success(`Fee marked ${status} for ${updated} students`);
+    } catch (error) {
+      toast.error('Error updating fees');
+    }
+  };
+
   const handleAddClass = async () => {
     if (!newClass.class_range || !newClass.subjects) {
       toast.error('Please fill all fields');
       return;
     }
     try {
-      await axios.post(`${API}/classes`, {
-        class_range: newClass.class_range,
-        subjects: newClass.subjects.split(',').map(s => s.trim()).filter(Boolean)
-      });
+      // The API takes class_range as a query parameter and the subjects list as the body
+      await axios.post(
+        `${API}/classes`,
+        newClass.subjects.split(',').map(s => s.trim()).filter(Boolean),
+        { params: { class_range: newClass.class_range } }
+      );
       toast.success('Class added successfully');
       setClassDialogOpen(false);
       setNewClass({ class_range: '', subjects: '' });
       fetchData();
     } catch (error) {
-      toast.error('This feature will come soon');
+      const detail = error.response?.data?.detail;
+      toast.error(typeof detail === 'string' ? detail : 'Error adding class');
     }
   };
 
@@ -177,7 +207,7 @@ export default function TutorDashboard({ user, logout }) {
         <div className="flex flex-col md:flex-row md:items-center md:justify-between mb-8 space-y-4 md:space-y-0">
           <div className="flex items-center space-x-4">
             <Avatar className="h-16 w-16">
-              <AvatarImage src={user.profile_picture} />
+              <AvatarImage src={mediaSrc(user.profile_picture)} />
               <AvatarFallback>{user.name[0]}</AvatarFallback>
             </Avatar>
             <div>
@@ -215,7 +245,7 @@ export default function TutorDashboard({ user, logout }) {
                     <p className="text-sm text-gray-600 mb-3">Upload your professional photo</p>
                     <div className="flex flex-col md:flex-row items-center space-y-4 md:space-y-0 md:space-x-4">
                       <Avatar className="h-24 w-24">
-                        <AvatarImage src={formData.profile_picture || user.profile_picture} />
+                        <AvatarImage src={mediaSrc(formData.profile_picture || user.profile_picture)} />
                         <AvatarFallback className="text-2xl">{user.name[0]}</AvatarFallback>
                       </Avatar>
                       <div className="flex-1">
@@ -231,7 +261,7 @@ export default function TutorDashboard({ user, logout }) {
                         <input
                           id="profile-picture-upload"
                           type="file"
-                          accept="image/*"
+                          accept="image/png,image/jpeg,image/webp,image/gif"
                           className="hidden"
                           data-testid="profile-picture-upload-input"
                           onChange={(e) => handleImageUpload(e, 'profile_picture')}
@@ -357,7 +387,7 @@ export default function TutorDashboard({ user, logout }) {
                         <div className="border-2 border-dashed border-blue-300 rounded-lg p-6 text-center hover:border-blue-500 hover:bg-blue-50 transition-all">
                           {formData.coaching_photo ? (
                             <div className="space-y-3">
-                              <img src={formData.coaching_photo} alt="Coaching Centre" className="w-full max-w-md h-48 mx-auto object-cover rounded-lg shadow-md" />
+                              <img src={mediaSrc(formData.coaching_photo)} alt="Coaching Centre" className="w-full max-w-md h-48 mx-auto object-cover rounded-lg shadow-md" />
                               <p className="text-sm text-blue-600 font-medium">Click to change photo</p>
                             </div>
                           ) : (
@@ -374,7 +404,7 @@ export default function TutorDashboard({ user, logout }) {
                       <input
                         id="coaching-photo"
                         type="file"
-                        accept="image/*"
+                        accept="image/png,image/jpeg,image/webp,image/gif"
                         className="hidden"
                         data-testid="coaching-photo-input"
                         onChange={(e) => handleImageUpload(e, 'coaching_photo')}
@@ -474,7 +504,7 @@ export default function TutorDashboard({ user, logout }) {
             </CardHeader>
             <CardContent>
               <img 
-                src={profile.coaching_photo} 
+                src={mediaSrc(profile.coaching_photo)} 
                 alt="Coaching Centre" 
                 className="w-full h-64 object-cover rounded-lg"
               />
@@ -499,7 +529,7 @@ export default function TutorDashboard({ user, logout }) {
             <CardContent>
               {profile.verification_banner ? (
                 <div className="space-y-4">
-                  <img src={profile.verification_banner} alt="Banner" className="w-full h-48 object-cover rounded-xl shadow-lg" />
+                  <img src={mediaSrc(profile.verification_banner)} alt="Banner" className="w-full h-48 object-cover rounded-xl shadow-lg" />
                   <label htmlFor="banner-upload" className="cursor-pointer">
                     <Button type="button" variant="outline" className="w-full" asChild>
                       <span>Change Banner</span>
@@ -508,7 +538,7 @@ export default function TutorDashboard({ user, logout }) {
                   <input
                     id="banner-upload"
                     type="file"
-                    accept="image/*"
+                    accept="image/png,image/jpeg,image/webp,image/gif"
                     className="hidden"
                     onChange={async (e) => {
                       const file = e.target.files[0];
@@ -540,7 +570,7 @@ export default function TutorDashboard({ user, logout }) {
                   <input
                     id="banner-upload-initial"
                     type="file"
-                    accept="image/*"
+                    accept="image/png,image/jpeg,image/webp,image/gif"
                     className="hidden"
                     onChange={async (e) => {
                       const file = e.target.files[0];
@@ -626,7 +656,19 @@ export default function TutorDashboard({ user, logout }) {
         {/* Subscription Requests */}
         <Card>
           <CardHeader>
-            <CardTitle>Subscription Requests</CardTitle>
+            <div className="flex items-center justify-between">
+              <CardTitle>Subscription Requests</CardTitle>
+              {subscriptions.some(sub => sub.status === 'active') && (
+                <div className="flex space-x-2">
+                  <Button size="sm" onClick={() => handleBulkFees('paid')} data-testid="bulk-fees-paid-btn">
+                    Mark this month paid
+                  </Button>
+                  <Button size="sm" variant="outline" onClick={() => handleBulkFees('unpaid')} data-testid="bulk-fees-unpaid-btn">
+                    Mark this month unpaid
+                  </Button>
+                </div>
+              )}
+            </div>
           </CardHeader>
           <CardContent>
             {subscriptions.length > 0 ? (
@@ -635,7 +677,7 @@ export default function TutorDashboard({ user, logout }) {
                   <div key={sub.id} className="flex items-center justify-between p-4 bg-gray-50 rounded-lg" data-testid={`subscription-${sub.id}`}>
                     <div className="flex items-center space-x-4">
                       <Avatar>
-                        <AvatarImage src={sub.student?.profile_picture} />
+                        <AvatarImage src={avatarSrc(sub.student)} />
                         <AvatarFallback>{sub.student?.name[0]}</AvatarFallback>
                       </Avatar>
                       <div>
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages, avatarSrc, mediaSrc } from '../lib/utils';
 import { toast } from 'sonner';
 import Layout from '../components/Layout';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
@@ -36,8 +37,8 @@ export default function TutorDetail({ user, logout }) {
       
       // Check if already subscribed
       if (user.role === 'student') {
-        const subsRes = await axios.get(`${API}/subscriptions/my`);
-        const hasSub = subsRes.data.some(s => s.tutor_id === id);
+        const subs = await fetchAllPages(`${API}/subscriptions/my`);
+        const hasSub = subs.some(s => s.tutor_id === id);
         setSubscribed(hasSub);
       }
     } catch (error) {
@@ -77,6 +78,22 @@ export default function TutorDetail({ user, logout }) {
     }
   };
 
+  // The tutor response embeds only the newest reviews; older ones are paged in on demand
+  const loadMoreReviews = async () => {
+    try {
+      const response = await axios.get(`${API}/tutors/${id}/reviews`, {
+        params: { cursor: tutor.reviews_next_cursor }
+      });
+      setTutor({
+        ...tutor,
+        reviews: [...tutor.reviews, ...response.data.items],
+        reviews_next_cursor: response.data.next_cursor
+      });
+    } catch (error) {
+      toast.error('Error loading reviews');
+    }
+  };
+
   const handleDeleteReview = async (reviewId) => {
     try {
       await axios.delete(`${API}/reviews/${reviewId}`);
@@ -120,7 +137,7 @@ export default function TutorDetail({ user, logout }) {
           <CardContent className="pt-6">
             <div className="flex flex-col md:flex-row md:items-start md:space-x-6">
               <Avatar className="h-24 w-24 mx-auto md:mx-0 mb-4 md:mb-0">
-                <AvatarImage src={tutor.user?.profile_picture} />
+                <AvatarImage src={mediaSrc(tutor.user?.profile_picture)} />
                 <AvatarFallback className="text-2xl">{tutor.user?.name[0]}</AvatarFallback>
               </Avatar>
               <div className="flex-1 text-center md:text-left">
@@ -134,7 +151,7 @@ export default function TutorDetail({ user, logout }) {
                   <div className="flex items-center justify-center md:justify-start space-x-1 mb-3">
                     <Star className="w-5 h-5 fill-yellow-400 text-yellow-400" />
                     <span className="font-medium">{tutor.avg_rating.toFixed(1)}</span>
-                    <span className="text-gray-600">({tutor.reviews?.length} reviews)</span>
+                    <span className="text-gray-600">({tutor.review_count || 0} reviews)</span>
                   </div>
                 )}
                 {tutor.bio && <p className="text-gray-600 mb-4">{tutor.bio}</p>}
@@ -256,7 +273,7 @@ export default function TutorDetail({ user, logout }) {
               <CardTitle>Coaching Centre</CardTitle>
             </CardHeader>
             <CardContent>
-              <img src={tutor.coaching_photo} alt="Coaching Centre" className="w-full h-64 object-cover rounded-lg" />
+              <img src={mediaSrc(tutor.coaching_photo)} alt="Coaching Centre" className="w-full h-64 object-cover rounded-lg" />
             </CardContent>
           </Card>
         )}
@@ -265,7 +282,7 @@ export default function TutorDetail({ user, logout }) {
         <Card>
           <CardHeader>
             <div className="flex items-center justify-between">
-              <CardTitle>Reviews ({tutor.reviews?.length || 0})</CardTitle>
+              <CardTitle>Reviews ({tutor.review_count || 0})</CardTitle>
               {user.role === 'student' && subscribed && (
                 <Dialog open={reviewDialogOpen} onOpenChange={setReviewDialogOpen}>
                   <DialogTrigger asChild>
@@ -317,7 +334,7 @@ export default function TutorDetail({ user, logout }) {
                   <div key={review.id} className="p-4 bg-gray-50 rounded-lg" data-testid={`review-${review.id}`}>
                     <div className="flex items-start space-x-3 mb-2">
                       <Avatar className="h-10 w-10">
-                        <AvatarImage src={review.student?.profile_picture} />
+                        <AvatarImage src={avatarSrc(review.student)} />
                         <AvatarFallback>{review.student?.name[0]}</AvatarFallback>
                       </Avatar>
                       <div className="flex-1">
@@ -346,6 +363,11 @@ export default function TutorDetail({ user, logout }) {
                     </div>
                   </div>
                 ))}
+                {tutor.reviews_next_cursor && (
+                  <Button variant="outline" className="w-full" onClick={loadMoreReviews} data-testid="more-reviews-btn">
+                    Show more reviews
+                  </Button>
+                )}
               </div>
             ) : (
               <p className="text-gray-600 text-center py-4">No reviews yet</p>
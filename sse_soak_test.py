@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import json
+import resource
+import ssl
+import sys
+import time
+import urllib.request
+from urllib.parse import quote, urlsplit
+
+
+class SSESoakTester:
+    """Hold many idle notification streams open and check that none are dropped"""
+
+    def __init__(self, base_url, token, connections, duration, ramp_per_second, heartbeat_interval):
+        self.base_url = base_url
+        self.token = token
+        self.stream_token = None
+        self.stream_token_expires = 0
+        self.connections = connections
+        self.duration = duration
+        self.ramp_per_second = ramp_per_second
+        self.heartbeat_interval = heartbeat_interval
+        self.opened = 0
+        self.failed = 0
+        self.dropped = 0
+        self.heartbeats = 0
+        self.connect_times = []
+        self.errors = {}
+
+    def record_error(self, error):
+        key = type(error).__name__ if isinstance(error, Exception) else str(error)
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def fetch_stream_token(self):
+        """Exchange the access token for a short-lived stream token, as the frontend does"""
+        request = urllib.request.Request(
+            f"{self.base_url.rstrip('/')}/api/notifications/stream-token",
+            method="POST",
+            headers={"Authorization": f"Bearer {self.token}"}
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            body = json.loads(response.read())
+        return body["token"], time.monotonic() + body["expires_in"]
+
+    async def refresh_stream_token(self):
+        # Streams only check the token when they open; renew it well before it expires
+        if time.monotonic() > self.stream_token_expires - 20:
+            self.stream_token, self.stream_token_expires = await asyncio.to_thread(self.fetch_stream_token)
+
+    async def open_stream(self, deadline):
+        """Open one stream and read it until the deadline"""
+        parts = urlsplit(self.base_url)
+        secure = parts.scheme == "https"
+        port = parts.port or (443 if secure else 80)
+        path = f"{parts.path.rstrip('/')}/api/notifications/stream?token={quote(self.stream_token)}"
+
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(
+                parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+            )
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                f"Accept: text/event-stream\r\nConnection: keep-alive\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), timeout=30)
+        except Exception as e:
+            self.failed += 1
+            self.record_error(e)
+            return
+
+        if b" 200 " not in status_line:
+            self.failed += 1
+            self.record_error(status_line.decode(errors="replace").strip() or "empty response")
+            writer.close()
+            return
+
+        self.opened += 1
+        self.connect_times.append(time.perf_counter() - started)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # An idle stream must still see a heartbeat every interval
+                timeout = min(remaining, self.heartbeat_interval * 2 + 5)
+                try:
+                    line = await asyncio.wait_for(reader.readline(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if deadline - time.monotonic() <= 0:
+                        break
+                    self.dropped += 1
+                    self.record_error("heartbeat timeout")
+                    return
+                if not line:
+                    self.dropped += 1
+                    self.record_error("connection closed by server")
+                    return
+                if line.startswith(b": keep-alive"):
+                    self.heartbeats += 1
+        except Exception as e:
+            self.dropped += 1
+            self.record_error(e)
+        finally:
+            writer.close()
+
+    async def run(self):
+        await self.refresh_stream_token()
+        deadline = time.monotonic() + self.duration
+        tasks = []
+        for i in range(self.connections):
+            await self.refresh_stream_token()
+            tasks.append(asyncio.create_task(self.open_stream(deadline)))
+            if self.ramp_per_second and (i + 1) % self.ramp_per_second == 0:
+                await asyncio.sleep(1)
+                print(f"   {i + 1} streams started, {self.opened} open, {self.failed} failed")
+        await asyncio.gather(*tasks)
+
+    def report(self):
+        print("\n📊 SSE soak results")
+        print(f"   Streams requested: {self.connections}")
+        print(f"   Streams opened:    {self.opened}")
+        print(f"   Failed to open:    {self.failed}")
+        print(f"   Dropped mid-soak:  {self.dropped}")
+        print(f"   Heartbeats seen:   {self.heartbeats}")
+        if self.connect_times:
+            times = sorted(self.connect_times)
+            p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+            print(f"   Connect p50/p99:   {times[len(times) // 2] * 1000:.1f} ms / {p99 * 1000:.1f} ms")
+        for error, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            print(f"   {count} × {error}")
+
+        success = self.opened == self.connections and self.dropped == 0
+        print("✅ All streams stayed open" if success else "❌ Some streams failed or dropped")
+        return success
+
+
+def raise_fd_limit(connections):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, connections + 1024)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    if wanted < connections + 64:
+        print(f"⚠️  File descriptor limit {hard} is too low for {connections} streams")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test for /api/notifications/stream")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--token", required=True, help="Access token of any user; streams use stream tokens issued for it")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--duration", type=float, default=120, help="Seconds to hold the streams open")
+    parser.add_argument("--ramp", type=int, default=500, help="New streams per second")
+    parser.add_argument("--heartbeat-interval", type=float, default=15, help="Server SSE_HEARTBEAT_INTERVAL")
+    args = parser.parse_args()
+
+    raise_fd_limit(args.connections)
+    tester = SSESoakTester(
+        args.base_url, args.token, args.connections, args.duration, args.ramp, args.heartbeat_interval
+    )
+    print(f"🚀 Opening {args.connections} idle streams against {args.base_url} for {args.duration:.0f}s")
+    asyncio.run(tester.run())
+    return 0 if tester.report() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import asyncio
+
+import server
+from server import AutocompleteIndex, normalize_term
+
+
+def card(tutor_id, name, subjects, reach=0):
+    return {"user_id": tutor_id, "user": {"name": name}, "subjects": subjects, "reach_count": reach}
+
+
+def labels(suggestions):
+    return [s["label"] for s in suggestions]
+
+
+def test_normalize_term_folds_case_accents_and_spacing():
+    assert normalize_term("  Français   Avancé ") == "francais avance"
+    assert normalize_term(None) == ""
+
+
+def test_subject_variants_merge_into_one_suggestion():
+    index = AutocompleteIndex()
+    index.upsert_tutor(card("t1", "Asha Rao", ["Physics"], reach=5))
+    index.upsert_tutor(card("t2", "Vikram Shah", ["physics "], reach=1))
+    index.upsert_tutor(card("t3", "Meera Iyer", ["Physics"], reach=1))
+    suggestions = [s for s in index.suggest("ph") if s["type"] == "subject"]
+    assert suggestions == [{"type": "subject", "label": "Physics", "tutor_count": 3}]
+
+
+def test_names_match_from_any_word_and_rank_by_reach():
+    index = AutocompleteIndex()
+    index.upsert_tutor(card("t1", "Rahul Sharma", [], reach=1))
+    index.upsert_tutor(card("t2", "Sharad Kumar", [], reach=9))
+    assert labels(index.suggest("shar")) == ["Sharad Kumar", "Rahul Sharma"]
+    assert labels(index.suggest("shar", limit=1)) == ["Sharad Kumar"]
+
+
+def test_writes_forget_only_the_memoized_prefixes_they_touch():
+    index = AutocompleteIndex()
+    index.upsert_tutor(card("t1", "Asha Rao", ["Physics"]))
+    index.upsert_tutor(card("t2", "Kiran Das", ["Biology"]))
+    index.suggest("ph")
+    index.suggest("ki")
+    index.upsert_tutor(card("t1", "Asha Rao", ["Physics", "Chemistry"]))
+    assert "ki" in index.memo
+    assert "ph" not in index.memo
+    index.remove_tutor("t2")
+    assert "ki" not in index.memo
+    assert index.suggest("bi") == []
+
+
+class FakeCursor:
+    def __init__(self, cards, during):
+        self.cards = cards
+        self.during = during
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for position, item in enumerate(self.cards):
+            if position == 1:
+                self.during()
+            yield item
+
+
+def test_rebuild_replays_writes_made_while_it_reads(monkeypatch):
+    index = AutocompleteIndex()
+    stale = [card("t1", "Asha Rao", ["Physics"]), card("t2", "Kiran Das", ["Biology"])]
+
+    def concurrent_writes():
+        index.upsert_tutor(card("t1", "Asha Rao", ["Chemistry"]))
+        index.remove_tutor("t2")
+
+    class FakeCards:
+        def find(self, query, projection):
+            return FakeCursor(stale, concurrent_writes)
+
+    class FakeDb:
+        tutor_cards = FakeCards()
+
+    monkeypatch.setattr(server, "db", FakeDb())
+    assert asyncio.run(index.rebuild()) == 1
+    assert labels(index.suggest("chem")) == ["Chemistry"]
+    assert index.suggest("phys") == []
+    assert index.suggest("kiran") == []
+    assert index.journals == []
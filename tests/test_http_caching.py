@@ -0,0 +1,77 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from server import CompressionMiddleware, accepted_encodings, etag_matches, json_etag_response
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", W/"abc" ', True),
+    ("*", True),
+    ('"abcd"', False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", set()),
+    ("gzip, deflate, br", {"gzip", "deflate", "br"}),
+    ("GZIP;q=0.5, br;q=0", {"gzip"}),
+    ("br;q=bogus, identity", {"identity"}),
+])
+def test_accepted_encodings(header, expected):
+    assert accepted_encodings(header) == expected
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/json")
+    async def json_route(request: Request):
+        return json_etag_response(request, {"items": ["x" * 50] * 10}, vary="Authorization")
+
+    @app.get("/small")
+    async def small_route():
+        return PlainTextResponse("tiny")
+
+    return TestClient(app)
+
+
+def test_json_etag_response_revalidates_with_304():
+    client = make_client()
+    first = client.get("/json", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+    second = client.get("/json", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_compressed_response_weakens_etag_and_still_revalidates():
+    client = make_client()
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith("W/")
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert client.get("/json", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_small_bodies_are_not_compressed():
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "tiny"
+
+
+def test_compressed_body_decodes_to_the_original():
+    client = make_client()
+    # httpx decodes gzip transparently
+    compressed = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/json", headers={"Accept-Encoding": "identity"})
+    assert compressed.content == plain.content
@@ -0,0 +1,41 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_data_url, sniff_image_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+WEBP = b"RIFF\x10\x00\x00\x00WEBPVP8 " + b"\x00" * 8
+
+
+def data_url(content_type, data):
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
+
+
+@pytest.mark.parametrize("data, content_type", [
+    (PNG, "image/png"),
+    (b"\xff\xd8\xff\xe0" + b"\x00" * 8, "image/jpeg"),
+    (b"GIF89a" + b"\x00" * 8, "image/gif"),
+    (WEBP, "image/webp"),
+    (b"<svg xmlns='http://www.w3.org/2000/svg'><script>alert(1)</script></svg>", None),
+    (b"RIFF\x10\x00\x00\x00WAVEfmt ", None),
+])
+def test_sniff_image_type(data, content_type):
+    assert sniff_image_type(data) == content_type
+
+
+def test_type_comes_from_the_bytes_not_the_claim():
+    assert decode_data_url(data_url("image/gif", PNG)) == ("image/png", PNG)
+
+
+@pytest.mark.parametrize("value", [
+    data_url("image/svg+xml", b"<svg><script>alert(1)</script></svg>"),
+    data_url("image/png", b"<html><script>alert(1)</script></html>"),
+    "data:image/png,not-base64",
+    "data:image/png;base64,!!!",
+])
+def test_scriptable_or_malformed_images_are_rejected(value):
+    with pytest.raises(HTTPException) as e:
+        decode_data_url(value)
+    assert e.value.status_code == 400
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from pymongo.errors import DuplicateKeyError
+
+import server
+from server import (
+    STREAM_TOKEN_TTL, authenticate_token, create_access_token, get_stream_user, notification_archive_margin
+)
+
+
+def test_default_archive_threshold_runs_ahead_of_the_ttl():
+    assert notification_archive_margin() > 0
+
+
+def test_archive_threshold_past_the_retention_is_refused(monkeypatch):
+    monkeypatch.setattr(server, "NOTIFICATION_ARCHIVE_AFTER_DAYS", 90)
+    assert notification_archive_margin() < 0
+    # One interval short of the TTL still loses whatever becomes due just after a run
+    monkeypatch.setattr(server, "NOTIFICATION_ARCHIVE_AFTER_DAYS", server.NOTIFICATION_READ_RETENTION_DAYS)
+    assert notification_archive_margin() < 0
+
+
+class FakeUsers:
+    async def find_one(self, query, projection):
+        return {"id": query["id"], "role": "student"}
+
+
+class FakeDb:
+    users = FakeUsers()
+
+
+def stream_user(token=None, bearer=None):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=bearer) if bearer else None
+    return asyncio.run(get_stream_user(token, credentials))
+
+
+def test_stream_query_accepts_only_stream_tokens(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDb())
+    access = create_access_token({"sub": "stream-user"})
+    stream = create_access_token({"sub": "stream-user", "scope": "stream"}, timedelta(seconds=STREAM_TOKEN_TTL))
+    assert stream_user(token=stream)["id"] == "stream-user"
+    assert stream_user(bearer=access)["id"] == "stream-user"
+    for token, bearer in [(access, None), (None, stream), (None, None)]:
+        with pytest.raises(HTTPException) as e:
+            stream_user(token, bearer)
+        assert e.value.status_code == 401
+    with pytest.raises(HTTPException):
+        asyncio.run(authenticate_token(stream))
+
+
+def test_expired_stream_token_is_refused(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDb())
+    expired = create_access_token({"sub": "stream-user", "scope": "stream"}, timedelta(seconds=-1))
+    with pytest.raises(HTTPException) as e:
+        stream_user(token=expired)
+    assert e.value.detail == "Token expired"
+
+
+class FakeCounters:
+    def __init__(self, counters):
+        self.counters = counters
+
+    async def find_one(self, query, projection):
+        counter = self.counters.get(query["user_id"])
+        return dict(counter) if counter else None
+
+    async def insert_one(self, doc):
+        if doc["user_id"] in self.counters:
+            raise DuplicateKeyError("duplicate user_id")
+        self.counters[doc["user_id"]] = dict(doc)
+
+    async def update_one(self, query, update):
+        counter = self.counters.get(query["user_id"])
+        matched = counter is not None and counter["unread"] == query["unread"]
+        if matched:
+            counter.update(update["$set"])
+        return type("Result", (), {"matched_count": int(matched)})()
+
+
+class FakeNotifications:
+    def __init__(self, unread, counters, arrivals):
+        self.unread = unread
+        self.counters = counters
+        self.arrivals = arrivals
+
+    async def count_documents(self, query):
+        count = self.unread
+        if self.arrivals:
+            # A notification lands after this count, before the seed writes it back
+            self.arrivals -= 1
+            self.unread += 1
+            self.counters.counters.setdefault("u1", {"unread": 0, "seeded": False})["unread"] += 1
+        return count
+
+
+def seeding_db(counters, unread, arrivals):
+    class SeedingDb:
+        notification_counters = FakeCounters(counters)
+        notifications = FakeNotifications(unread, notification_counters, arrivals)
+    return SeedingDb()
+
+
+@pytest.mark.parametrize("counters", [{}, {"u1": {"unread": 2, "seeded": False}}])
+def test_seed_does_not_lose_a_notification_written_while_counting(monkeypatch, counters):
+    fake = seeding_db(counters, unread=3, arrivals=1)
+    monkeypatch.setattr(server, "db", fake)
+    assert asyncio.run(server.get_unread_total("u1")) == 4
+    assert fake.notification_counters.counters["u1"] == {"unread": 4, "seeded": True}
+
+
+def test_seeded_counters_are_read_as_is(monkeypatch):
+    fake = seeding_db({"u1": {"unread": 7}}, unread=3, arrivals=0)
+    monkeypatch.setattr(server, "db", fake)
+    assert asyncio.run(server.get_unread_total("u1")) == 7
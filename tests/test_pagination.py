@@ -0,0 +1,98 @@
+import asyncio
+import itertools
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_cursor, encode_cursor, keyset_filter, paginate
+
+
+def matches(doc, clause):
+    for field, condition in clause.items():
+        if isinstance(condition, dict):
+            (op, value), = condition.items()
+            if not (doc[field] > value if op == "$gt" else doc[field] < value):
+                return False
+        elif doc[field] != condition:
+            return False
+    return True
+
+
+def sort_key(sort):
+    return lambda doc: tuple(doc[field] * direction for field, direction in sort)
+
+
+def test_cursor_round_trips_and_rejects_tampering():
+    assert decode_cursor(encode_cursor([4.5, "tutor-1"]), 2) == [4.5, "tutor-1"]
+    for cursor in ["not base64!", encode_cursor([1]), encode_cursor({"a": 1})]:
+        with pytest.raises(HTTPException) as e:
+            decode_cursor(cursor, 2)
+        assert e.value.status_code == 400
+
+
+def test_keyset_filter_shape():
+    assert keyset_filter([("avg_rating", -1), ("user_id", 1)], [4.5, "t2"]) == {"$or": [
+        {"avg_rating": {"$lt": 4.5}},
+        {"avg_rating": 4.5, "user_id": {"$gt": "t2"}},
+    ]}
+
+
+@pytest.mark.parametrize("sort", [
+    [("year", -1), ("month", -1)],
+    [("fee", 1), ("id", 1)],
+    [("rating", -1), ("fee", 1), ("id", 1)],
+])
+def test_keyset_filter_selects_exactly_the_documents_after_the_cursor(sort):
+    docs = [
+        dict(zip([field for field, _ in sort], values))
+        for values in itertools.product(*[range(3)] * len(sort))
+    ]
+    ordered = sorted(docs, key=sort_key(sort))
+    for position, last in enumerate(ordered):
+        clause = keyset_filter(sort, [last[field] for field, _ in sort])
+        after = [doc for doc in ordered if any(matches(doc, c) for c in clause["$or"])]
+        assert after == ordered[position + 1:]
+
+
+class FakeCursor:
+    def __init__(self, docs, calls):
+        self.docs = docs
+        self.calls = calls
+
+    def sort(self, sort):
+        self.docs = sorted(self.docs, key=sort_key(sort))
+        return self
+
+    def limit(self, limit):
+        self.calls["limit"] = limit
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = {}
+
+    def find(self, query, projection):
+        self.calls["query"] = query
+        docs = [doc for doc in self.docs if "$and" not in query or any(
+            matches(doc, clause) for clause in query["$and"][1]["$or"]
+        )]
+        return FakeCursor(docs, self.calls)
+
+
+def test_paginate_walks_every_page_once():
+    sort = [("fee", 1), ("id", 1)]
+    collection = FakeCollection([{"fee": fee, "id": i} for i, fee in enumerate([3, 1, 2, 1, 3])])
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(paginate(collection, {}, sort, 2, cursor))
+        seen += [doc["id"] for doc in page["items"]]
+        assert collection.calls["limit"] == 3
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [1, 3, 2, 0, 4]
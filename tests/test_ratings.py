@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+import server
+from server import TOP_TUTORS_PRIOR_WEIGHT, TopTutorsRanking, bayesian_rating, rank_top_tutors, rating_totals
+
+
+def test_rating_totals_fill_missing_stars():
+    totals = rating_totals({"5": 2, "3": 1})
+    assert totals["rating_histogram"] == {"1": 0, "2": 0, "3": 1, "4": 0, "5": 2}
+    assert (totals["review_count"], totals["rating_sum"]) == (3, 13)
+    assert totals["avg_rating"] == pytest.approx(13 / 3)
+
+
+def test_rating_totals_without_reviews():
+    assert rating_totals({}) == {
+        "review_count": 0, "rating_sum": 0, "avg_rating": 0,
+        "rating_histogram": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
+    }
+
+
+def test_bayesian_rating_pulls_few_reviews_toward_the_mean():
+    assert bayesian_rating(5, 1, 4.0) == pytest.approx((TOP_TUTORS_PRIOR_WEIGHT * 4.0 + 5) / (TOP_TUTORS_PRIOR_WEIGHT + 1))
+    assert bayesian_rating(0, 0, 4.0) == pytest.approx(4.0)
+
+
+def test_long_record_outranks_a_single_perfect_review():
+    rated = [
+        {"user_id": "one-review", "subjects": ["Physics"], "review_count": 1, "rating_sum": 5},
+        {"user_id": "veteran", "subjects": ["physics ", "Maths"], "review_count": 50, "rating_sum": 240},
+        {"user_id": "weak", "subjects": ["Maths"], "review_count": 20, "rating_sum": 60},
+    ]
+    rankings = rank_top_tutors(rated)
+    assert rankings[""]["prior_mean"] == pytest.approx(305 / 71)
+    assert [t["user_id"] for t in rankings[""]["tutors"]] == ["veteran", "one-review", "weak"]
+    assert set(rankings) == {"", "physics", "maths"}
+    assert rankings["physics"]["label"] in {"Physics", "physics"}
+    assert [t["user_id"] for t in rankings["maths"]["tutors"]] == ["veteran", "weak"]
+
+
+def test_failed_refresh_leaves_the_ranking_dirty(monkeypatch):
+    class FailingCards:
+        def find(self, query, projection):
+            raise RuntimeError("connection reset")
+
+    class FakeDb:
+        tutor_cards = FailingCards()
+
+    monkeypatch.setattr(server, "db", FakeDb())
+    ranking = TopTutorsRanking()
+    ranking.dirty = True
+    with pytest.raises(RuntimeError):
+        asyncio.run(ranking.refresh())
+    assert ranking.dirty
@@ -0,0 +1,57 @@
+import server
+from server import TTLCache
+
+
+def test_get_returns_value_until_ttl_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 61
+    assert cache.get("a") is None
+    assert cache.metrics()["size"] == 0
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_metrics_count_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_load_started_before_invalidate_is_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation()
+    cache.invalidate("user")
+    cache.set("user", {"name": "stale"}, generation)
+    assert cache.get("user") is None
+
+
+def test_load_started_after_invalidate_is_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.invalidate("user")
+    generation = cache.generation()
+    cache.set("user", {"name": "fresh"}, generation)
+    assert cache.get("user") == {"name": "fresh"}
+
+
+def test_invalidating_one_key_does_not_block_others():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation()
+    cache.invalidate("other")
+    cache.set("user", 1, generation)
+    assert cache.get("user") == 1
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+from server import (
+    JOINED_TUTOR_FIELDS, PRIVATE_TUTOR_FIELDS, TUTOR_CARD_FIELDS, TUTOR_DETAIL_FIELDS, get_optional_user,
+    review_page, select_tutor_fields, tutor_projection
+)
+
+ADMIN = {"id": "admin-1", "role": "admin"}
+TUTOR = {"id": "tutor-1", "role": "tutor"}
+STUDENT = {"id": "student-1", "role": "student"}
+
+
+def test_presets_default_to_their_field_lists():
+    assert select_tutor_fields("card", None, None) == TUTOR_CARD_FIELDS
+    assert select_tutor_fields("detail", None, STUDENT) == TUTOR_DETAIL_FIELDS
+
+
+def test_list_route_leaves_joined_fields_out_and_refuses_them_by_name():
+    detail = select_tutor_fields("detail", None, STUDENT, joined=False)
+    assert detail == [f for f in TUTOR_DETAIL_FIELDS if f not in JOINED_TUTOR_FIELDS]
+    with pytest.raises(HTTPException) as e:
+        select_tutor_fields("card", "bio,reviews", STUDENT, joined=False)
+    assert e.value.status_code == 400
+    assert "reviews" in e.value.detail
+
+
+def test_explicit_fields_replace_the_preset():
+    assert select_tutor_fields("card", "bio, monthly_fee,,", None) == ["bio", "monthly_fee"]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as e:
+        select_tutor_fields("card", "bio,password_hash", None)
+    assert e.value.status_code == 400
+    assert "password_hash" in e.value.detail
+
+
+def test_admin_preset_requires_admin():
+    with pytest.raises(HTTPException) as e:
+        select_tutor_fields("admin", None, TUTOR)
+    assert e.value.status_code == 403
+    assert set(PRIVATE_TUTOR_FIELDS) <= set(select_tutor_fields("admin", None, ADMIN))
+
+
+@pytest.mark.parametrize("user, owner_id, allowed", [
+    (None, "tutor-1", False),
+    (STUDENT, "tutor-1", False),
+    (TUTOR, "tutor-2", False),
+    (TUTOR, "tutor-1", True),
+    (ADMIN, "tutor-1", True),
+])
+def test_private_fields_only_for_owner_or_admin(user, owner_id, allowed):
+    if allowed:
+        assert select_tutor_fields("card", "verification_proof", user, owner_id) == ["verification_proof"]
+    else:
+        with pytest.raises(HTTPException) as e:
+            select_tutor_fields("card", "verification_proof", user, owner_id)
+        assert e.value.status_code == 403
+
+
+def test_projection_keeps_user_id_and_skips_joined_fields():
+    assert tutor_projection(["bio", "reviews"]) == {"_id": 0, "user_id": 1, "bio": 1}
+
+
+def test_invalid_token_is_anonymous_on_public_routes():
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="not-a-jwt")
+    assert asyncio.run(get_optional_user(credentials)) is None
+    assert asyncio.run(get_optional_user(None)) is None
+
+
+class FakeReviewCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, sort):
+        self.docs = sorted(self.docs, key=lambda doc: (doc["created_at"], doc["id"]), reverse=True)
+        return self
+
+    def limit(self, limit):
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeReviews:
+    def find(self, query, projection):
+        return FakeReviewCursor([
+            {"id": f"r{i}", "tutor_id": query["tutor_id"], "student_id": f"s{i}", "created_at": f"2026-01-{i + 1:02d}"}
+            for i in range(30)
+        ])
+
+
+class FakeUsers:
+    async def load_many(self, ids):
+        return [{"id": student_id} for student_id in ids]
+
+
+def test_review_page_is_capped_and_joins_students(monkeypatch):
+    class FakeDb:
+        reviews = FakeReviews()
+
+    class FakeLoaders:
+        users = FakeUsers()
+
+    monkeypatch.setattr(server, "db", FakeDb())
+    page = asyncio.run(review_page("tutor-1", 20, None, FakeLoaders()))
+    assert [review["id"] for review in page["items"]] == [f"r{i}" for i in range(29, 9, -1)]
+    assert all(review["student"]["id"] == review["student_id"] for review in page["items"])
+    assert page["next_cursor"] is not None
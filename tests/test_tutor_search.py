@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+
+from server import (
+    INDEXES, QUERY_SHAPES, TUTOR_SORTS, class_levels, parse_class_range, subject_classes, subject_keys,
+    tutor_search_combinations, tutor_search_indexes, tutor_search_query, uncovered_query_shapes
+)
+
+CARD_INDEXES = [keys for collection, keys, _ in INDEXES if collection == "tutor_cards"]
+
+
+def test_every_filter_and_sort_combination_has_its_candidate_indexes():
+    for filters in tutor_search_combinations():
+        query = tutor_search_query(**filters)
+        for sort, order in TUTOR_SORTS.items():
+            for index in tutor_search_indexes(query, order):
+                assert index in CARD_INDEXES, (filters, sort)
+
+
+def test_search_shapes_come_from_the_query_builder():
+    shapes = [fields for route, _, fields in QUERY_SHAPES if route == "get_tutors"]
+    assert ["class_levels", "reach_count", "user_id"] in shapes
+    assert not uncovered_query_shapes()
+
+
+def test_subject_and_class_must_hold_for_the_same_class_entry():
+    query = tutor_search_query(subject="Physics", class_level=9, boards=["CBSE"])
+    assert query == {"subject_classes": "physics|9", "boards": {"$in": ["CBSE"]}}
+    classes = [{"min_class": 9, "max_class": 9, "subjects": ["Chemistry"]},
+               {"class_range": "11-12", "subjects": ["Physics", "Chemistry"]}]
+    keys = subject_classes(classes)
+    assert "physics|9" not in keys
+    assert keys == ["chemistry|11", "chemistry|12", "chemistry|9", "physics|11", "physics|12"]
+
+
+def test_subject_filter_matches_case_and_accent_variants():
+    assert tutor_search_query(subject="  PHYSICS ") == {"subject_keys": "physics"}
+    assert subject_keys(["Français", "francais", "Maths", " "]) == ["francais", "maths"]
+    assert tutor_search_query(subject="   ") == {}
+
+
+def test_candidates_lead_with_the_most_selective_filter_and_follow_the_sort():
+    order = TUTOR_SORTS["rating"]
+    both = tutor_search_query(subject="Physics", class_level=9)
+    assert tutor_search_indexes(both, order) == [[("subject_classes", 1)] + order]
+    assert tutor_search_indexes(tutor_search_query(subject="Physics", boards=["CBSE"]), order) == [[("subject_keys", 1)] + order]
+    assert tutor_search_indexes(tutor_search_query(class_level=9), order) == [[("class_levels", 1)] + order]
+    assert tutor_search_indexes(tutor_search_query(verified_only=True), order) == [order]
+
+
+def test_fee_range_adds_a_candidate_bounded_by_the_range():
+    fee = TUTOR_SORTS["fee"]
+    query = tutor_search_query(verified_only=True, min_fee=100000)
+    assert tutor_search_indexes(query, TUTOR_SORTS["rating"]) == [TUTOR_SORTS["rating"], fee]
+    assert tutor_search_indexes(query, fee) == [fee]
+    subject = tutor_search_query(subject="Physics", max_fee=2000)
+    assert tutor_search_indexes(subject, TUTOR_SORTS["reach"])[1] == [("subject_keys", 1)] + fee
+
+
+def test_query_normalizes_boards_and_rejects_inverted_fee_range():
+    assert tutor_search_query(boards=["ICSE", "CBSE", "ICSE"]) == {"boards": {"$in": ["CBSE", "ICSE"]}}
+    with pytest.raises(HTTPException):
+        tutor_search_query(min_fee=3000, max_fee=1000)
+
+
+@pytest.mark.parametrize("text, bounds", [
+    ("9", (9, 9)),
+    ("6-8", (6, 8)),
+    (" 11 – 12 ", (11, 12)),
+    ("9 to 10", (9, 10)),
+    ("8-6", None),
+    ("0-3", None),
+    ("class 9", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_class_range(text, bounds):
+    assert parse_class_range(text) == bounds
+
+
+def test_class_levels_merges_parsed_and_legacy_rows():
+    classes = [{"min_class": 9, "max_class": 10}, {"class_range": "10-11"}, {"class_range": "junk"}]
+    assert class_levels(classes) == [9, 10, 11]